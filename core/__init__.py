@@ -0,0 +1 @@
+"""A főbot és a játékmodulok közös futtatókörnyezete."""
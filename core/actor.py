@@ -0,0 +1,214 @@
+import asyncio
+import random
+import time
+
+from core.log import get_logger
+
+log = get_logger("actor")
+
+# ===============================
+# Effektek
+# ===============================
+# Az állapotátmenetek (szinkron függvények) nem végeznek I/O-t, csak effekteket
+# adnak vissza; ezeket az actor az átmenet UTÁN hajtja végre sorban.
+
+
+class Say:
+    """Chat üzenet a játék csatornájába."""
+
+    __slots__ = ("text", "priority")
+
+    def __init__(self, text: str, priority: int = None):
+        self.text = text
+        self.priority = priority
+
+
+class Overlay:
+    """Overlay állapot kiírása (és opcionális refresh jelzés); None: az állapot elengedése."""
+
+    __slots__ = ("payload", "refresh")
+
+    def __init__(self, payload: dict, refresh: bool = True):
+        self.payload = payload
+        self.refresh = refresh
+
+
+class Emit:
+    """Overlay esemény (new_game, victory, devil, angel, game_over ...)."""
+
+    __slots__ = ("event",)
+
+    def __init__(self, event: str):
+        self.event = event
+
+
+class Stat:
+    """Játékos-statisztika esemény (jó/rossz tipp, győzelem, ördög ...) – a stats tárba megy."""
+
+    __slots__ = ("user", "event", "detail")
+
+    def __init__(self, user: str, event: str, detail: str = None):
+        self.user = user
+        self.event = event
+        self.detail = detail
+
+
+class Track:
+    """Játékesemény az elemzési naplóba (start, tipp, lépés, vége ...) tetszőleges mezőkkel."""
+
+    __slots__ = ("event", "data")
+
+    def __init__(self, event: str, **data):
+        self.event = event
+        self.data = data
+
+
+class After:
+    """Késleltetett üzenet a saját postafiókba. Azonos `key` esetén a korábbi időzítő törlődik."""
+
+    __slots__ = ("delay", "handler", "args", "key")
+
+    def __init__(self, delay: float, handler, *args, key: str = None):
+        self.delay = delay
+        self.handler = handler
+        self.args = args
+        self.key = key
+
+
+class Cancel:
+    """Nevesített időzítő törlése."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+
+# ===============================
+# Actor
+# ===============================
+class GameActor:
+    """Egy játékpéldány egyetlen író szála.
+
+    Minden parancs üzenetként érkezik a postafiókba, és szigorúan sorban fut le:
+    az átmenet (handler) szinkron, így két await közé semmi nem ékelődhet be.
+    Az átmenet által visszaadott effekteket a `perform` callback hajtja végre.
+    """
+
+    def __init__(self, name: str, perform, on_transition=None):
+        self.name = name
+        self._perform = perform          # callable(effect) – sync vagy async
+        self._on_transition = on_transition
+        self._mailbox = asyncio.Queue()
+        self._timers = {}                # key -> (TimerHandle, handler, args)
+        self._task = None
+        self.processed = 0
+        # megfigyelő (shadow futtatás): tap(handler, args, effektek | None hibánál, mp,
+        # a véletlengenerátor átmenet előtti állapota, falióra); None: nincs megfigyelés
+        self.tap = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def tell(self, handler, *args) -> asyncio.Future:
+        """Üzenet a postafiókba; a visszakapott future az átmenet eredményével teljesül."""
+        self.start()
+        fut = asyncio.get_event_loop().create_future()
+        self._mailbox.put_nowait((handler, args, fut))
+        return fut
+
+    async def ask(self, handler, *args):
+        return await self.tell(handler, *args)
+
+    def _schedule(self, eff: After):
+        loop = asyncio.get_event_loop()
+        if eff.key:
+            self._cancel(eff.key)
+            handle = loop.call_later(eff.delay, self._fire, eff.key, eff.handler, eff.args)
+            self._timers[eff.key] = (handle, eff.handler, eff.args)
+        else:
+            loop.call_later(eff.delay, self._fire, None, eff.handler, eff.args)
+
+    def arm(self, eff: After):
+        """Időzítő élesítése átmeneten kívülről (pl. átköltöztetett állapot visszatöltésekor)."""
+        self._schedule(eff)
+
+    def _fire(self, key, handler, args):
+        if key is not None:
+            self._timers.pop(key, None)
+        self.tell(handler, *args)
+
+    def _cancel(self, key: str):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer[0].cancel()
+
+    def timer_deadlines(self) -> dict:
+        """Élő időzítők hátralévő ideje (mp) kulcs szerint."""
+        now = asyncio.get_event_loop().time()
+        return {k: max(0.0, t[0].when() - now) for k, t in self._timers.items()}
+
+    def timer_specs(self) -> list:
+        """Élő nevesített időzítők: [(kulcs, hátralévő mp, handler, args), ...]."""
+        now = asyncio.get_event_loop().time()
+        return [(k, max(0.0, h.when() - now), handler, args)
+                for k, (h, handler, args) in self._timers.items()]
+
+    def cancel_all(self):
+        for handle, _, _ in self._timers.values():
+            handle.cancel()
+        self._timers.clear()
+
+    async def _run(self):
+        while True:
+            handler, args, fut = await self._mailbox.get()
+            tap = self.tap
+            if tap is not None:
+                rng, wall, t0 = random.getstate(), time.time(), time.perf_counter()
+            try:
+                effects = handler(*args) or ()
+            except Exception as e:
+                log.exception("[⚠️] %s: hiba az állapotátmenetben: %s", self.name, e)
+                if tap is not None:
+                    self._tapped(tap, handler, args, None, time.perf_counter() - t0, rng, wall)
+                if not fut.done():
+                    fut.set_result(())
+                continue
+            if tap is not None:
+                elapsed = time.perf_counter() - t0
+
+            self.processed += 1
+            for eff in effects:
+                try:
+                    if isinstance(eff, After):
+                        self._schedule(eff)
+                    elif isinstance(eff, Cancel):
+                        self._cancel(eff.key)
+                    else:
+                        res = self._perform(eff)
+                        if asyncio.iscoroutine(res):
+                            await res
+                except Exception as e:
+                    log.exception("[⚠️] %s: hiba az effekt végrehajtásakor: %s", self.name, e)
+            if self._on_transition:
+                self._on_transition()
+            if tap is not None:
+                self._tapped(tap, handler, args, effects, elapsed, rng, wall)
+            if not fut.done():
+                fut.set_result(effects)
+
+    def _tapped(self, tap, *event):
+        try:
+            tap(*event)
+        except Exception as e:
+            log.warning("[⚠️] %s: hiba a megfigyelőben: %s", self.name, e)
+
+    def depth(self) -> int:
+        return self._mailbox.qsize()
+
+    def stop(self):
+        self.cancel_all()
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
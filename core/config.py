@@ -0,0 +1,325 @@
+import asyncio
+import json
+import os
+from types import MappingProxyType
+
+from core.log import get_logger
+
+log = get_logger("config")
+
+# ===============================
+# Központi konfiguráció
+# ===============================
+# A config.json egyszer töltődik be; minden szekció (general, akasztofa, amoeba ...) a
+# saját sémája szerint ellenőrizve, csak olvasható pillanatképként (MappingProxyType) jut
+# el a játékokhoz. A csatornánkénti felülírások a "channels" ágban vannak:
+#
+#   "channels": {"gixing": {"akasztofa": {"ANGEL_CHANCE": 10}}}
+#
+# A !set* parancsok a memóriában módosítanak, és késleltetve, összevonva íródnak ki
+# (tmp + fsync + rename). A fájl külső szerkesztését a figyelő (stat alapú, másodpercenként)
+# veszi észre: érvényes tartalom esetén újratölt és értesíti a feliratkozókat.
+DEBOUNCE = 1.0          # ennyi ideig gyűlnek a módosítások egy kiírásig (mp)
+WATCH_INTERVAL = 1.0    # ennyi mp-enként nézzük meg, változott-e a fájl
+CHANNELS_KEY = "channels"
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def freeze(value):
+    """Mélyen csak olvasható másolat: dict -> MappingProxyType, list -> tuple."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class Field:
+    """Egy beállítás sémája: típus, alapérték, opcionális határok és saját ellenőrzés."""
+
+    __slots__ = ("kind", "default", "lo", "hi", "check")
+
+    def __init__(self, kind, default, lo=None, hi=None, check=None):
+        self.kind = kind
+        self.default = freeze(default)
+        self.lo = lo
+        self.hi = hi
+        self.check = check      # callable(value) -> value, hibánál ConfigError
+
+    def validate(self, value):
+        kind = self.kind
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        elif kind is int and isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if not isinstance(value, kind) or (kind is not bool and isinstance(value, bool)):
+            raise ConfigError(f"{kind.__name__} kell, nem {value!r}")
+        if self.lo is not None and value < self.lo:
+            raise ConfigError(f"legalább {self.lo} lehet, nem {value!r}")
+        if self.hi is not None and value > self.hi:
+            raise ConfigError(f"legfeljebb {self.hi} lehet, nem {value!r}")
+        if self.check is not None:
+            value = self.check(value)
+        return freeze(value)
+
+
+GENERAL_SCHEMA = {
+    "WS_PORT": Field(int, 8765, 1, 65535),
+    "HTTP_PORT": Field(int, 8000, 1, 65535),
+    "GAME_IDLE_UNLOAD": Field(float, 900, 0),
+    "MOD_CHANNELS": Field(list, []),
+    "STATE_STORE": Field(str, "memory"),
+    "JOURNAL_DIR": Field(str, "journal"),
+    "STATS_DB": Field(str, "stats.db"),
+    "EVENT_LOG_DIR": Field(str, "events"),
+    "EVENT_LOG_ROTATE_MB": Field(float, 64, 1),
+    "MODULE_WATCH": Field(bool, False),
+    "PROFILE_DIR": Field(str, "profiles"),
+    "DEBUG": Field(bool, False),
+    # shadow (canary) futtatás: játék -> a jelölt modul, pl. {"amoeba": "games.amoeba.bot_next"}
+    "SHADOW": Field(dict, {}),
+    # külön küldőkapcsolatok száma (a twitchio kapcsolata ilyenkor csak olvas); 0 = a twitchio küld
+    "SEND_CONNECTIONS": Field(int, 2, 0, 20),
+    # a fiók teljes üzenetkerete / 30 mp (moderátor: 100, ellenőrzött bot: több)
+    "ACCOUNT_RATE": Field(int, 100, 1),
+}
+
+
+class ConfigService:
+    """Egy config fájl memóriában tartott, sémával ellenőrzött képe.
+
+    - `register(szekció, séma)`: a játékmodulok betöltéskor adják meg a sémájukat
+    - `section(szekció, csatorna)`: gyorsítótárazott, csak olvasható pillanatkép
+    - `set(...)`: módosítás + késleltetett kiírás; `subscribe(cb)`: értesítés változáskor
+    Fájl nélkül (`path=None`) csak az alapértékekkel dolgozik (eszközök, teszt).
+    """
+
+    def __init__(self, path: str = None, debounce: float = DEBOUNCE):
+        self.path = path
+        self.debounce = debounce
+        self._raw = {}              # a fájl tartalma (JSON-ként kiírható)
+        self._schemas = {"general": GENERAL_SCHEMA}
+        self._sections = {}         # (szekció, csatorna) -> MappingProxyType
+        self._listeners = []
+        self._save_handle = None
+        self._saving = None
+        self._stat = None           # (mtime_ns, méret) az utolsó ismert állapotról
+        self._watch = None
+
+        self.version = 0
+        self.reloads = 0
+        self.rejected = 0
+        self.saves = 0
+
+    # --------- betöltés ---------
+    def load(self):
+        """Első betöltés: a hibás mezők helyett az alapérték marad (figyelmeztetéssel)."""
+        raw = self._read()
+        if raw is None:
+            log.warning("[⚠️] A %s nem érvényes JSON – alapértékekkel indulok.", self.path)
+            raw = {}
+        for err in self._validate(raw):
+            log.warning("[⚠️] config: %s – alapérték marad.", err)
+        self._raw = raw
+        self._changed()
+
+    def _read(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            st = os.stat(self.path)
+            self._stat = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def reload(self) -> bool:
+        """Újratöltés a fájlból; hibás tartalomnál a régi pillanatkép marad."""
+        raw = self._read()
+        if raw is None:
+            self.rejected += 1
+            log.warning("[⚠️] A %s nem érvényes JSON – a régi beállítások maradnak.", self.path)
+            return False
+        errors = self._validate(raw)
+        if errors:
+            self.rejected += 1
+            log.warning("[⚠️] config újratöltés elutasítva: %s", "; ".join(errors))
+            return False
+        if self._save_handle is not None:
+            # a még ki nem írt módosítás helyett a kézi szerkesztés nyer
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._raw = raw
+        self.reloads += 1
+        self._changed()
+        log.info("[⚙️] config újratöltve (%s).", self.path)
+        return True
+
+    # --------- séma ---------
+    def register(self, name: str, schema: dict):
+        """Szekció sémájának felvétele (a játékmodul prepare-je hívja)."""
+        self._schemas[name] = schema
+        errors = []
+        self._merge(name, self._raw, None, errors)
+        for channel in self._raw.get(CHANNELS_KEY, {}):
+            self._merge(name, self._raw, channel, errors)
+        for err in dict.fromkeys(errors):
+            log.warning("[⚠️] config: %s – alapérték marad.", err)
+        self._sections = {k: v for k, v in self._sections.items() if k[0] != name}
+
+    def _validate(self, raw: dict) -> list:
+        errors = []
+        for name in self._schemas:
+            self._merge(name, raw, None, errors)
+            for channel in raw.get(CHANNELS_KEY, {}) or {}:
+                self._merge(name, raw, channel, errors)
+        return list(dict.fromkeys(errors))
+
+    def _merge(self, name: str, raw: dict, channel, errors) -> dict:
+        """Alapértékek <- globális szekció <- a csatorna felülírása."""
+        schema = self._schemas.get(name, {})
+        out = {key: f.default for key, f in schema.items()}
+        layers = [raw.get(name)]
+        if channel:
+            layers.append(((raw.get(CHANNELS_KEY) or {}).get(channel) or {}).get(name))
+        for layer in layers:
+            if not isinstance(layer, dict):
+                continue
+            for key, value in layer.items():
+                field = schema.get(key)
+                if field is None:
+                    out[key] = freeze(value)
+                    continue
+                try:
+                    out[key] = field.validate(value)
+                except ConfigError as e:
+                    if errors is not None:
+                        errors.append(f"{name}.{key}: {e}")
+        return out
+
+    def mirror(self, source: "ConfigService"):
+        """A `source` tartalmának követése: most és minden változásakor mély másolatot vesz át.
+
+        Fájl nélküli példányon a saját módosításai (pl. egy shadow játék !set* parancsai)
+        sem ki nem íródnak, sem a forrást nem érintik.
+        """
+        def sync():
+            self._raw = json.loads(source._dump())
+            self._changed()
+        source.subscribe(sync)
+        sync()
+
+    # --------- olvasás ---------
+    def section(self, name: str, channel: str = None):
+        """Csak olvasható pillanatkép; változásig ugyanazt az objektumot adja vissza."""
+        key = (name, channel)
+        snap = self._sections.get(key)
+        if snap is None:
+            snap = self._sections[key] = MappingProxyType(self._merge(name, self._raw, channel, None))
+        return snap
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _changed(self):
+        self._sections = {}
+        self.version += 1
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                log.warning("[⚠️] config feliratkozó hiba: %s", e)
+
+    # --------- írás ---------
+    def set(self, name: str, key: str, value, channel: str = None):
+        """Egy beállítás módosítása; az új pillanatképet adja vissza. Hibás értéknél ConfigError."""
+        return self.set_many(name, {key: value}, channel)
+
+    def set_many(self, name: str, values: dict, channel: str = None):
+        schema = self._schemas.get(name, {})
+        for key, value in values.items():
+            if key in schema:
+                schema[key].validate(value)
+        if channel:
+            target = self._raw.setdefault(CHANNELS_KEY, {}).setdefault(channel, {}).setdefault(name, {})
+        else:
+            target = self._raw.setdefault(name, {})
+        target.update(values)
+        self._changed()
+        self._schedule_save()
+        return self.section(name, channel)
+
+    def _schedule_save(self):
+        if not self.path:
+            return
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or not loop.is_running():
+            self._write(self._dump())
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(self.debounce, self._save_soon)
+
+    def _save_soon(self):
+        self._save_handle = None
+        self._saving = asyncio.get_event_loop().run_in_executor(None, self._write, self._dump())
+
+    def _dump(self) -> str:
+        return json.dumps(self._raw, ensure_ascii=False, indent=2) + "\n"
+
+    def _write(self, data: str):
+        """Atomikus csere: tmp fájl + fsync + rename (félig írt config.json nem maradhat)."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._stat = (st.st_mtime_ns, st.st_size)
+        self.saves += 1
+
+    async def flush(self):
+        """A függő módosítás azonnali kiírása (leállításkor)."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_soon()
+        if self._saving is not None:
+            await self._saving
+
+    # --------- figyelés ---------
+    def watch(self, interval: float = WATCH_INTERVAL):
+        if not self.path:
+            return
+        if self._watch is None or self._watch.done():
+            self._watch = asyncio.get_event_loop().create_task(self._watch_loop(interval))
+
+    async def _watch_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.check()
+
+    def check(self) -> bool:
+        """Ha a fájl megváltozott (és nem mi írtuk), újratöltés."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig == self._stat:
+            return False
+        self._stat = sig
+        return self.reload()
+
+    def stats(self) -> dict:
+        return {"version": self.version, "reloads": self.reloads, "rejected": self.rejected,
+                "saves": self.saves}
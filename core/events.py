@@ -0,0 +1,206 @@
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+from core.log import get_logger
+
+log = get_logger("events")
+
+# ===============================
+# Játékesemény-napló (tömörített, forgatott JSON-sorok)
+# ===============================
+# A játékok `Track` effektjei (start, tipp, hint, angyal/ördög, lépés, timeout, vége)
+# egy korlátos sorba kerülnek – a loop soha nem vár: ha a sor tele, az esemény eldobódik
+# és számoljuk. Egy háttérszál kötegenként gzip-be írja őket (events/events-<idő>.jsonl.gz),
+# másodpercenként sync flush-sal (a félkész fájl is olvasható), és új fájlt kezd, ha a
+# méret vagy a nap megváltozik. Írási hibánál (pl. betelt lemez) a köteg elvész, a fájlt
+# eldobjuk, és a következő köteg új fájlt nyit – a szál nem áll le. Az elemzés offline:
+# tools/event_stats.py.
+DEFAULT_DIR = "events"
+ROTATE_BYTES = 64 * 1024 * 1024     # ennyi tömörített bájt után új fájl
+QUEUE_SIZE = 50000
+FLUSH_INTERVAL = 1.0
+RETRY_INTERVAL = 5.0                # írási hiba után ennyi ideig nem nyitunk új fájlt (mp)
+FILE_PREFIX = "events-"
+FILE_SUFFIX = ".jsonl.gz"
+
+
+class EventLog:
+    def __init__(self, directory: str, rotate_bytes: int = ROTATE_BYTES,
+                 flush_interval: float = FLUSH_INTERVAL, queue_size: int = QUEUE_SIZE, tag: str = ""):
+        self.directory = directory
+        self.tag = f"-{tag}" if tag else ""     # shard workerek közös könyvtárban
+        self.rotate_bytes = rotate_bytes
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None       # gzip.GzipFile
+        self._raw = None        # az alatta lévő fájl (a tömörített méret miatt)
+        self._day = None
+        self._thread = None
+
+        self.emitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0         # nem szerializálható vagy írási hiba miatt elveszett események
+        self.files = 0
+        self._failing = False   # a hibát egyszer naplózzuk, a helyreállást is
+        self._retry_at = 0.0
+
+    # --------- loop oldal ---------
+    def emit(self, channel: str, game: str, event: str, data: dict):
+        """Egy esemény a sorba; soha nem blokkol."""
+        record = {"t": round(time.time(), 3), "ch": channel, "g": game, "e": event}
+        record.update(data)
+        try:
+            self._queue.put_nowait(record)
+            self.emitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="events", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        """A sor kiürítése és a fájl lezárása (leállításkor)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    # --------- háttérszál ---------
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                record = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = ()
+            if record is None:
+                break
+            if record:
+                batch = [record]
+                try:
+                    while len(batch) < 1000:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                stop = None in batch
+                batch = [r for r in batch if r is not None]
+                if batch:
+                    self._guarded(self._write, batch, len(batch))
+                if stop:
+                    break
+            if time.monotonic() - last_flush >= self.flush_interval and self._file is not None:
+                self._guarded(self._file.flush, zlib.Z_SYNC_FLUSH, 0)
+                last_flush = time.monotonic()
+        try:
+            self._close_file()
+        except Exception:
+            log.exception("[⚠️] Eseménynapló: hiba a fájl lezárásakor")
+
+    def _guarded(self, step, arg, lost: int):
+        """Írási lépés a háttérszálon: hibánál naplózunk, eldobjuk a fájlt, és megyünk tovább."""
+        if self._failing and time.monotonic() < self._retry_at:
+            self.errors += lost     # ne nyissunk kötegenként új (üres) fájlt egy betelt lemezen
+            return
+        try:
+            step(arg)
+        except Exception:
+            self.errors += lost
+            self._retry_at = time.monotonic() + RETRY_INTERVAL
+            if not self._failing:
+                self._failing = True
+                log.exception("[⚠️] Eseménynapló írási hiba – a köteg elveszett, %.0f mp múlva új fájllal "
+                              "próbálkozunk", RETRY_INTERVAL)
+            self._drop_file()
+            return
+        if self._failing and step == self._write:
+            self._failing = False
+            log.info("[📝] Eseménynapló: az írás helyreállt")
+
+    def _write(self, batch: list):
+        day = time.strftime("%Y%m%d", time.gmtime(batch[0]["t"]))
+        if self._file is None or day != self._day or self._raw.tell() >= self.rotate_bytes:
+            self._open_file(day)
+        lines = []
+        for r in batch:
+            try:
+                lines.append(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n")
+            except (TypeError, ValueError) as e:
+                # egy hibás esemény (nem szerializálható részlet) ne vigye magával a köteget
+                self.errors += 1
+                log.warning("[⚠️] Eseménynapló: nem menthető esemény (%s/%s): %s", r.get("g"), r.get("e"), e)
+        self._file.write("".join(lines).encode("utf-8"))
+        self.written += len(lines)
+
+    def _open_file(self, day: str):
+        self._close_file()
+        ms = int(time.time() * 1000)
+        while True:
+            # a név rendezve is időrend: events-20250101T120000123[-shard].jsonl.gz
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(ms // 1000)) + f"{ms % 1000:03d}"
+            path = os.path.join(self.directory, f"{FILE_PREFIX}{stamp}{self.tag}{FILE_SUFFIX}")
+            if not os.path.exists(path):
+                break
+            ms += 1
+        self._raw = open(path, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        self._day = day
+        self.files += 1
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = self._raw = None
+
+    def _drop_file(self):
+        """Hibás fájl elengedése hibatűrően (a következő köteg újat nyit)."""
+        for f in (self._file, self._raw):
+            if f is not None:
+                try:
+                    f.close()
+                except Exception:
+                    pass
+        self._file = self._raw = None
+
+    def stats(self) -> dict:
+        return {"emitted": self.emitted, "written": self.written, "dropped": self.dropped,
+                "errors": self.errors, "queued": self._queue.qsize(), "files": self.files}
+
+
+# ===============================
+# Olvasás (elemző eszközöknek)
+# ===============================
+def log_files(directory: str) -> list:
+    """A naplófájlok időrendben (a név az első írás UTC ideje)."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, n) for n in sorted(names)
+            if n.startswith(FILE_PREFIX) and n.endswith(FILE_SUFFIX)]
+
+
+def read_events(path: str):
+    """Egy fájl eseményei sorban; a csonka végű (épp írt / összeomlott) fájlt a végéig olvassa."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except (EOFError, zlib.error):
+            return
@@ -0,0 +1,294 @@
+import asyncio
+import json
+import socket
+import time
+import uuid
+from collections import deque
+from urllib.parse import parse_qs, urlparse
+
+from core import wire
+from core.metrics import (OVERLAY_CLIENTS, OVERLAY_ENCODE_SECONDS, OVERLAY_ENCODED_BYTES, OVERLAY_MESSAGES,
+                          OVERLAY_PUSH_SECONDS, REGISTRY)
+from core.state import OVERLAY_TOPIC, overlay_key
+from core.log import get_logger
+
+log = get_logger("host")
+
+# ===============================
+# HostAPI – overlay WebSocket szerver
+# ===============================
+# Az overlay oldalak (temeto.html, amoeba.html) a ws://127.0.0.1:<WS_PORT>/ címre
+# csatlakoznak, és a refresh/victory/devil/angel/game_over eseményekre reagálnak.
+#
+# Témák: a kliens a címben adja meg, mit figyel (?game=akasztofa&channel=<csatorna>);
+# csak az ahhoz a csatornához és játékhoz tartozó eseményeket kapja. Csatorna nélkül
+# az elsődleges csatornát (ha a host tudja, melyik az), játék nélkül minden játékot.
+# A refresh esemény a játék teljes overlay állapotát is hozza ("state"; None = a játék
+# elengedte az állapotát), a feliratkozó pedig azonnal megkapja a legutolsót.
+#
+# Formátum: ?format=json (alapértelmezett) vagy ?format=bin (tömör bináris, lásd
+# core/wire.py). Minden üzenet formátumonként egyszer kódolódik, a feliratkozók
+# ugyanazt a példányt kapják.
+#
+# Egy csatornát több böngészőforrás is figyelhet (OBS, moderátori előnézet, másik
+# jelenet). Minden kliensnek saját, korlátos kimenő sora és egyetlen író taskja van,
+# így egy lassú kliens nem fogja vissza a többit:
+#   - az állapotfrissítésekből (refresh) játékonként csak a legutolsó vár a sorban
+#   - a különálló események (victory, devil, angel, game_over ...) sosem vesznek el
+#   - aki túl sok eseménnyel vagy túl régóta le van maradva, azt bontjuk (az overlay
+#     újracsatlakozik, és a téma legutolsó állapotával indul)
+DEFAULT_WS_PORT = 8765
+STATE_EVENTS = frozenset({"refresh"})   # összevonható állapotfrissítések
+MAX_CLIENT_QUEUE = 256      # ennyi várakozó esemény felett a kliens túl lassú
+MAX_CLIENT_LAG = 10.0       # ha a legrégebbi várakozó esemény ennél régebbi (mp), bontunk
+SEND_BUFFER = 64 * 1024     # kernel küldőpuffer kliensenként: a lassú kliens hamar látszik
+SLOW_CLOSE_CODE = 1013      # "try again later"
+
+
+class _Client:
+    """Egy overlay kapcsolat kimenő sora.
+
+    A sor elemei [állapotkulcs | None, üzenet, sorba állás ideje]; egy újabb
+    állapotfrissítés a régi bejegyzés üzenetét None-ra állítja (az író átugorja),
+    és a sor végére kerül – így a különálló eseményekhez képest a sorrend megmarad.
+    """
+
+    __slots__ = ("ws", "topic", "fmt", "queue", "state", "live", "wake", "task")
+
+    def __init__(self, ws, topic: tuple, fmt: str = wire.DEFAULT_FORMAT):
+        self.ws = ws
+        self.topic = topic      # (csatorna | None, játék | None) – None: bármelyik
+        self.fmt = fmt          # átviteli formátum (wire.FORMATS)
+        self.queue = deque()
+        self.state = {}         # állapotkulcs -> a sorban álló bejegyzése
+        self.live = 0           # nem felülírt bejegyzések száma
+        self.wake = asyncio.Event()
+        self.task = None
+
+
+class HostAPI:
+    def __init__(self, host: str = "0.0.0.0", port: int = DEFAULT_WS_PORT,
+                 max_queue: int = MAX_CLIENT_QUEUE, max_lag: float = MAX_CLIENT_LAG,
+                 primary_channel: str = None):
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.primary_channel = primary_channel.lower() if primary_channel else None
+        self.clients = {}       # ws -> _Client
+        self._subs = {}         # téma -> {_Client, ...}
+        self.latest = {}        # (csatorna, játék) -> {formátum: a legutolsó állapotot hozó refresh üzenet}
+        self._server = None
+        self.store = None
+        self.node = uuid.uuid4().hex[:12]   # a pub/sub-on közzétett eseményeink jele
+
+        self.encoded = {fmt: [0, 0, 0.0] for fmt in wire.FORMATS}   # formátum -> [db, bájt, mp]
+        self.sent = 0
+        self.coalesced = 0
+        self.disconnected = 0   # lemaradás miatt bontott kliensek
+        self.errors = 0
+
+    async def start(self):
+        try:
+            import websockets
+        except ImportError:
+            log.warning("[⚠️] websockets nincs telepítve – overlay események kikapcsolva.")
+            return
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        REGISTRY.add_collector(self.collect_metrics)
+        log.info("[🌐] Overlay WebSocket: ws://%s:%s/", self.host, self.port)
+
+    async def attach(self, store):
+        """Közös állapottár pub/sub csatornájára kapcsolás: minden node overlay eseménye
+        minden node overlay klienseihez eljut. A saját eseményeinket helyben kézbesítjük
+        (nem várunk a körútra, és kiesett tár mellett sem állnak meg a helyi overlayek);
+        a pub/sub-ról visszajövő saját üzeneteinket a node-jel alapján eldobjuk."""
+        self.store = store
+        await store.subscribe(OVERLAY_TOPIC, self._remote)
+
+    def _remote(self, data: str):
+        node, sep, msg = data.partition("\n")
+        if not sep or node == self.node:
+            return
+        self._deliver(msg)
+
+    def _subscription(self, path: str) -> tuple:
+        """(téma, formátum) a WebSocket cím lekérdezéséből."""
+        query = parse_qs(urlparse(path or "/").query)
+        channel = (query.get("channel") or [None])[0]
+        game = (query.get("game") or [None])[0]
+        fmt = (query.get("format") or [wire.DEFAULT_FORMAT])[0].lower()
+        topic = (channel.lower() if channel else self.primary_channel), (game.lower() if game else None)
+        return topic, (fmt if fmt in wire.FORMATS else wire.DEFAULT_FORMAT)
+
+    async def _handler(self, ws, path=None):
+        transport = getattr(ws, "transport", None)
+        sock = transport.get_extra_info("socket") if transport is not None else None
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+            except OSError:
+                pass
+        request = getattr(ws, "request", None)
+        client = _Client(ws, *self._subscription(path or getattr(request, "path", None) or getattr(ws, "path", "/")))
+        client.task = asyncio.ensure_future(self._writer(client))
+        self.clients[ws] = client
+        self._subs.setdefault(client.topic, set()).add(client)
+        try:
+            await self._send_latest(client)
+            async for _ in ws:
+                pass   # az overlay nem küld semmit, csak figyel
+        except Exception:
+            pass
+        finally:
+            self._remove(client)
+            client.task.cancel()
+
+    async def _send_latest(self, client: _Client):
+        """Feliratkozáskor a téma legutolsó állapota (más node állapotát a közös tárból olvassuk)."""
+        channel, game = client.topic
+        now = time.monotonic()
+        for (ch, g), variants in list(self.latest.items()):
+            if channel in (None, ch) and game in (None, g):
+                msg = variants.get(client.fmt)
+                if msg is None:
+                    msg = variants[client.fmt] = self._encode(json.loads(variants["json"]), client.fmt)
+                self._enqueue(client, ("refresh", ch, g), msg, now)
+        if self.store is not None and channel and game and (channel, game) not in self.latest:
+            state = await self.store.get_json(overlay_key(channel, game))
+            if state is not None and client.ws in self.clients:
+                payload = {"event": "refresh", "game": game, "channel": channel, "state": state}
+                self._enqueue(client, ("refresh", channel, game), self._encode(payload, client.fmt), time.monotonic())
+
+    def _remove(self, client: _Client) -> bool:
+        if self.clients.pop(client.ws, None) is None:
+            return False
+        subs = self._subs.get(client.topic)
+        if subs is not None:
+            subs.discard(client)
+            if not subs:
+                del self._subs[client.topic]
+        return True
+
+    def ws_broadcast(self, payload: dict):
+        """Esemény küldése minden csatlakozott overlaynek (nem blokkol)."""
+        msg = self._encode(payload, "json")
+        self._deliver(msg)
+        if self.store is not None:
+            # "<node>\n<esemény>": a JSON kódolás nem hagy nyers sortörést az üzenetben
+            self.store.publish(OVERLAY_TOPIC, f"{self.node}\n{msg}")
+
+    # --------- szétosztás ---------
+    def _deliver(self, msg: str):
+        try:
+            payload = json.loads(msg)
+            channel, game, event = payload.get("channel"), payload.get("game"), payload.get("event")
+        except (ValueError, AttributeError):
+            return
+        key = (event, channel, game) if event in STATE_EVENTS else None
+        variants = {"json": msg}     # formátum -> kódolt üzenet, frissítésenként egyszer
+        if key is not None and "state" in payload:
+            if payload["state"] is None:
+                self.latest.pop((channel, game), None)
+            else:
+                self.latest[(channel, game)] = variants
+        if not self.clients:
+            return
+        subs = self._subs
+        now = time.monotonic()
+        for topic in {(channel, game), (channel, None), (None, game), (None, None)}:
+            for client in list(subs.get(topic, ())):
+                data = variants.get(client.fmt)
+                if data is None:
+                    data = variants[client.fmt] = self._encode(payload, client.fmt)
+                self._enqueue(client, key, data, now)
+
+    def _encode(self, payload: dict, fmt: str):
+        t0 = time.perf_counter()
+        data = wire.encode(payload, fmt)
+        elapsed = time.perf_counter() - t0
+        size = len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+        counter = self.encoded[fmt]
+        counter[0] += 1
+        counter[1] += size
+        counter[2] += elapsed
+        OVERLAY_ENCODE_SECONDS.observe(elapsed, (fmt,))
+        OVERLAY_ENCODED_BYTES.observe(size, (fmt,))
+        return data
+
+    def _enqueue(self, client: _Client, key, msg, now: float):
+        entry = [key, msg, now]
+        if key is not None:
+            old = client.state.get(key)
+            if old is not None:
+                old[1] = None
+                client.live -= 1
+                self.coalesced += 1
+            client.state[key] = entry
+        queue = client.queue
+        queue.append(entry)
+        client.live += 1
+        while queue[0][1] is None:
+            queue.popleft()
+        if client.live > self.max_queue or now - queue[0][2] > self.max_lag:
+            self._drop_slow(client)
+            return
+        client.wake.set()
+
+    async def _writer(self, client: _Client):
+        ws = client.ws
+        queue = client.queue
+        while True:
+            if not queue:
+                client.wake.clear()
+                await client.wake.wait()
+                continue
+            entry = queue.popleft()
+            key, msg, _ = entry
+            if msg is None:
+                continue
+            client.live -= 1
+            if key is not None and client.state.get(key) is entry:
+                del client.state[key]
+            t0 = time.perf_counter()
+            try:
+                await ws.send(msg)
+            except Exception:
+                self.errors += 1
+                self._remove(client)
+                return
+            self.sent += 1
+            OVERLAY_PUSH_SECONDS.observe(time.perf_counter() - t0)
+
+    def _drop_slow(self, client: _Client):
+        ws = client.ws
+        if not self._remove(client):
+            return
+        self.disconnected += 1
+        client.task.cancel()
+        client.queue.clear()
+        client.state.clear()
+        log.warning("[🐢] Lassú overlay kliens bontva (%s várakozó esemény).", client.live)
+        asyncio.ensure_future(self._close(ws))
+
+    @staticmethod
+    async def _close(ws):
+        try:
+            await ws.close(SLOW_CLOSE_CODE, "túl lassú")
+        except Exception:
+            pass
+
+    # --------- állapot ---------
+    def stats(self) -> dict:
+        return {"clients": len(self.clients), "topics": len(self._subs),
+                "max_queue": max((c.live for c in self.clients.values()), default=0),
+                "sent": self.sent, "coalesced": self.coalesced, "disconnected": self.disconnected,
+                "errors": self.errors, "encoded": {
+                    fmt: {"updates": n, "avg_bytes": round(size / n, 1) if n else 0,
+                          "avg_encode_us": round(seconds / n * 1e6, 2) if n else 0}
+                    for fmt, (n, size, seconds) in self.encoded.items()}}
+
+    def collect_metrics(self):
+        OVERLAY_CLIENTS.set(len(self.clients))
+        OVERLAY_MESSAGES.replace({("sent",): self.sent, ("coalesced",): self.coalesced,
+                                  ("disconnected",): self.disconnected, ("errors",): self.errors})
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from collections import deque
+
+from core.log import get_logger
+
+log = get_logger("inbound")
+
+# ===============================
+# Bejövő parancsok ütemezése
+# ===============================
+# prioritási osztályok (kisebb = fontosabb)
+CONTROL = 0   # broadcaster / moderátor
+PLAYER = 1    # aktív játékos lépése (pl. amőba-párbaj résztvevői)
+CROWD = 2     # minden más (tömeges !tipp és társai)
+
+CLASS_NAMES = ("control", "player", "crowd")
+
+DEFAULT_LIMITS = (200, 500, 1000)   # osztályonkénti sorhossz-korlát
+DEFAULT_LAG_THRESHOLD = 0.25        # mp – e fölött a crowd osztályt dobjuk
+DEFAULT_CONCURRENCY = 8             # egyszerre futó handlerek száma
+
+
+class LoopLagMonitor:
+    """Event-loop késés mérése: egy rövid alvás túlfutásából számolja a lag-et."""
+
+    def __init__(self, interval: float = 0.1, histogram=None):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.histogram = histogram   # opcionális core.metrics.Histogram minden mintához
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - t0 - self.interval)
+            # gyorsan felfut, lassan cseng le – egy-egy tüske ne kapcsolgassa az eldobást
+            self.lag = lag if lag > self.lag else self.lag * 0.7 + lag * 0.3
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if self.histogram is not None:
+                self.histogram.observe(lag)
+
+
+class InboundScheduler:
+    """A twitchio `event_message` és a parancskezelők közé ékelt ütemező.
+
+    Az üzeneteket prioritási osztályokba sorolja, korlátos sorokban tartja, és mindig
+    a legfontosabb nem üres sorból szolgál ki. Ha az event loop késése átlépi a
+    küszöböt, először a crowd, kétszeres küszöb felett a player osztályt is dobja –
+    a moderátori parancsokat soha.
+    """
+
+    def __init__(self, handler, limits=DEFAULT_LIMITS, lag_threshold: float = DEFAULT_LAG_THRESHOLD,
+                 concurrency: int = DEFAULT_CONCURRENCY, prefix: str = "!"):
+        self._handler = handler          # async callable(message)
+        self._queues = tuple(deque() for _ in CLASS_NAMES)
+        self._limits = tuple(limits)
+        self._ready = asyncio.Event()
+        self._workers = []
+        self._player_probes = []
+        self.prefix = prefix
+        self.lag_threshold = lag_threshold
+        self.concurrency = concurrency
+        self.monitor = LoopLagMonitor()
+
+        self.accepted = [0, 0, 0]
+        self.shed = [0, 0, 0]
+        self.errors = 0
+
+    # --------- játékos-felismerés ---------
+    def add_player_probe(self, probe):
+        """probe(channel_name, user_name) -> bool; igaz, ha a user éppen aktív játékos."""
+        if probe not in self._player_probes:
+            self._player_probes.append(probe)
+
+    def remove_player_probe(self, probe):
+        if probe in self._player_probes:
+            self._player_probes.remove(probe)
+
+    def classify(self, message) -> int:
+        author = message.author
+        channel = message.channel.name.lower()
+        name = (author.name or "").lower()
+        badges = getattr(author, "badges", {}) or {}
+        if "moderator" in badges or "broadcaster" in badges or name == channel:
+            return CONTROL
+        for probe in self._player_probes:
+            try:
+                if probe(channel, name):
+                    return PLAYER
+            except Exception:
+                pass
+        return CROWD
+
+    # --------- beérkezés ---------
+    def _shed_level(self) -> int:
+        """Az első eldobandó osztály (3 = nincs eldobás)."""
+        lag = self.monitor.lag
+        if lag > self.lag_threshold * 2:
+            return PLAYER
+        if lag > self.lag_threshold:
+            return CROWD
+        return len(CLASS_NAMES)
+
+    def submit(self, message) -> bool:
+        """Üzenet besorolása; False, ha el lett dobva. Nem blokkol."""
+        content = message.content or ""
+        if not content.startswith(self.prefix):
+            return False
+
+        cls = self.classify(message)
+        level = self._shed_level()
+        if cls >= level:
+            self.shed[cls] += 1
+            self._purge(level)
+            return False
+
+        queue = self._queues[cls]
+        if len(queue) >= self._limits[cls]:
+            # tele a sor: a legrégebbi kérés esik ki (a friss tipp többet ér)
+            queue.popleft()
+            self.shed[cls] += 1
+
+        queue.append(message)
+        self.accepted[cls] += 1
+        self._ready.set()
+        return True
+
+    def _purge(self, level: int):
+        """Terhelés alatt a már sorban álló, eldobandó osztályok ürítése."""
+        for cls in range(level, len(CLASS_NAMES)):
+            queue = self._queues[cls]
+            if queue:
+                self.shed[cls] += len(queue)
+                queue.clear()
+
+    # --------- kiszolgálás ---------
+    def start(self):
+        self.monitor.start()
+        loop = asyncio.get_event_loop()
+        while len(self._workers) < self.concurrency:
+            self._workers.append(loop.create_task(self._worker()))
+
+    def _pop(self):
+        for queue in self._queues:
+            if queue:
+                return queue.popleft()
+        return None
+
+    async def _worker(self):
+        while True:
+            message = self._pop()
+            if message is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            try:
+                await self._handler(message)
+            except Exception as e:
+                self.errors += 1
+                log.exception("[⚠️] Parancskezelési hiba: %s", e)
+
+    def depth(self) -> int:
+        return sum(len(q) for q in self._queues)
+
+    def stats(self) -> dict:
+        return {
+            "lag_ms": round(self.monitor.lag * 1000, 1),
+            "depth": {name: len(q) for name, q in zip(CLASS_NAMES, self._queues)},
+            "accepted": dict(zip(CLASS_NAMES, self.accepted)),
+            "shed": dict(zip(CLASS_NAMES, self.shed)),
+            "errors": self.errors,
+        }
@@ -0,0 +1,334 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+from core.log import get_logger
+from core.metrics import IRC_SEND_CONNECTED, IRC_SEND_MESSAGES, IRC_SEND_RECONNECTS, REGISTRY
+from core.outbound import DEFAULT_PER, DEFAULT_RATE, TokenBucket
+
+log = get_logger("irc")
+
+# ===============================
+# Külön küldőkapcsolatok (IRC WebSocketen)
+# ===============================
+# A twitchio egyetlen kapcsolaton olvas és ír: egy hosszú kimenő löket (játékvégek,
+# !status, cooldown-figyelmeztetések) ugyanazon a socketen és kereten osztozik a bejövő
+# forgalommal. Küldőkészlettel a twitchio kapcsolata csak olvas, a kimenő üzenetek
+# néhány saját, hitelesített kapcsolaton mennek ki:
+#   - egy csatornának egyszerre egy küldőkapcsolata van (új csatorna a legkevesebbet
+#     kiszolgálóhoz kerül): így a csatorna üzeneteinek sorrendje megmarad, és minden
+#     csatornát csak egy küldőkapcsolat JOIN-ol (az oda érkező chatforgalmat eldobjuk)
+#   - keretek: kapcsolatonként `connection_rate`, a fióknak összesen `account_rate`
+#     üzenet / 30 mp (a csatornánkénti keretet továbbra is a ChannelOutbox tartja),
+#     JOIN-ból a fióknak JOIN_RATE / JOIN_PER mp
+#   - minden kapcsolat magától csatlakozik újra (exponenciális várakozással); a kiesett
+#     kapcsolat csatornái a következő üzenetükkel egy élő kapcsolatra költöznek
+#   - ha egyik küldőkapcsolat sem él, a ChatOutbox a twitchio kapcsolatán küld
+#   - a Twitch a küldőkapcsolatok üzeneteit az olvasó kapcsolatra is visszaküldi (a
+#     twitchio ezeket nem látja saját üzenetnek): a nemrég elküldött sorokat megjegyezzük,
+#     és csak a pontosan ezekkel egyező, a bot nevében érkező üzeneteket dobjuk el – a
+#     csatorna gazdája a bot fiókjáról továbbra is adhat parancsokat
+DEFAULT_URL = "wss://irc-ws.chat.twitch.tv:443"
+DEFAULT_CONNECTIONS = 2
+CONNECTION_RATE = DEFAULT_RATE  # üzenet / 30 mp kapcsolatonként (mint a twitchio moderátori kerete)
+JOIN_RATE = 20                  # JOIN / JOIN_PER mp a fióknak
+JOIN_PER = 10.0
+CONNECT_TIMEOUT = 10.0          # csatlakozás + bejelentkezés (001) ennyi mp-en belül
+HEARTBEAT = 30.0                # WebSocket ping (a félig halott kapcsolat így kiderül)
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 60.0
+AUTH_FAILED = ("Login authentication failed", "Improperly formatted auth")
+ECHO_WINDOW = 64                # csatornánként ennyi elküldött sort várunk vissza
+ECHO_TTL = 30.0                 # ennyi mp után egy vissza nem jött sort elfelejtünk
+
+
+class SendConnection:
+    """Egy hitelesített IRC kapcsolat, ami csak küld; saját keret és újracsatlakozás."""
+
+    def __init__(self, pool, index: int):
+        self.pool = pool
+        self.name = f"send{index}"
+        self.bucket = TokenBucket(pool.connection_rate, pool.per)
+        self.channels = set()       # az ide rendelt csatornák
+        self.joined = set()         # ahova ezen a kapcsolaton már kiment a JOIN
+        self.connected = False
+        self._ws = None
+        self._task = None
+
+        self.sent = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.rate_limited = 0       # a szerver NOTICE-ban jelezte, hogy túl gyorsan küldtünk
+        self.last_error = ""
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        await self._close()
+
+    # --------- kapcsolat ---------
+    async def _run(self):
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                await asyncio.wait_for(self._connect(), CONNECT_TIMEOUT)
+                delay = RECONNECT_MIN
+                log.info("[📤] %s: küldőkapcsolat kész (%s)", self.name, self.pool.url)
+                await self._read()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+            finally:
+                self._down()
+                await self._close()
+            self.reconnects += 1
+            wait = delay * random.uniform(0.5, 1.0)
+            log.warning("[📤] %s: a küldőkapcsolat megszakadt (%s) – újra %.1f mp múlva.",
+                        self.name, self.last_error or "bontva", wait)
+            await asyncio.sleep(wait)
+            delay = min(RECONNECT_MAX, delay * 2)
+
+    async def _connect(self):
+        session = await self.pool.session()
+        ws = self._ws = await session.ws_connect(self.pool.url, heartbeat=HEARTBEAT)
+        await ws.send_str(f"PASS oauth:{self.pool.token}\r\n")
+        await ws.send_str(f"NICK {self.pool.nick}\r\n")
+        await ws.send_str("CAP REQ :twitch.tv/tags twitch.tv/commands\r\n")
+        # bejelentkezés: 001 = kész, NOTICE = elutasítva
+        async for msg in ws:
+            if not isinstance(msg.data, str):
+                continue
+            for line in msg.data.split("\r\n"):
+                if " 001 " in line:
+                    self.connected = True
+                    self.last_error = ""
+                    return
+                if " NOTICE " in line and any(text in line for text in AUTH_FAILED):
+                    raise ConnectionError(line.rsplit(" :", 1)[-1])
+        raise ConnectionError("a szerver bontott bejelentkezés közben")
+
+    async def _read(self):
+        """A kapcsolat fenntartása: PING/PONG, RECONNECT, NOTICE; a chatforgalom eldobva."""
+        ws = self._ws
+        async for msg in ws:
+            if not isinstance(msg.data, str):
+                continue
+            for line in msg.data.split("\r\n"):
+                if line.startswith("PING"):
+                    await ws.send_str("PONG" + line[4:] + "\r\n")
+                elif " RECONNECT" in line and "PRIVMSG" not in line:
+                    self.last_error = "RECONNECT"
+                    return
+                elif " NOTICE " in line and "PRIVMSG" not in line:
+                    self._notice(line)
+
+    def _notice(self, line: str):
+        text = line.rsplit(" :", 1)[-1]
+        if "msg-id=msg_ratelimit" in line or "msg-id=msg_duplicate" in line:
+            self.rate_limited += 1
+            log.debug("%s: %s", self.name, text)
+        else:
+            log.info("[📤] %s: %s", self.name, text)
+
+    def _down(self):
+        self.connected = False
+        self.joined.clear()
+        self.pool.unroute(self)
+
+    async def _close(self):
+        ws, self._ws = self._ws, None
+        if ws is not None and not ws.closed:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    # --------- küldés ---------
+    async def privmsg(self, channel: str, text: str):
+        ws = self._ws
+        if not self.connected or ws is None:
+            raise ConnectionError("nincs kapcsolat")
+        if channel not in self.joined:
+            while not self.pool.joins.available():
+                await asyncio.sleep(self.pool.joins.wait_time())
+            self.pool.joins.take()
+            await ws.send_str(f"JOIN #{channel}\r\n")
+            self.joined.add(channel)
+        line = text.strip().replace("\r", "").replace("\n", "")    # mint a twitchio: egy sor
+        self.pool.remember(channel, line)   # előbb, mint ahogy a visszhang beérhet
+        await ws.send_str(f"PRIVMSG #{channel} :{line}\r\n")
+        self.sent += 1
+
+    async def part(self, channel: str):
+        self.channels.discard(channel)
+        if channel in self.joined:
+            self.joined.discard(channel)
+            if self.connected and self._ws is not None:
+                try:
+                    await self._ws.send_str(f"PART #{channel}\r\n")
+                except Exception:
+                    pass
+
+    def fail(self, error: Exception):
+        """Küldési hiba: a kapcsolat bontása (a _run újracsatlakozik)."""
+        self.errors += 1
+        self.last_error = str(error) or type(error).__name__
+        self._down()
+        if self._ws is not None:
+            asyncio.ensure_future(self._close())
+
+    def stats(self) -> dict:
+        return {"connected": self.connected, "channels": len(self.channels), "sent": self.sent,
+                "errors": self.errors, "reconnects": self.reconnects, "rate_limited": self.rate_limited,
+                "last_error": self.last_error}
+
+
+class SendPool:
+    """Küldőkapcsolatok készlete a ChatOutbox alatt.
+
+    `send(csatorna, szöveg)` a csatorna kapcsolatán küld, a kapcsolat és a fiók keretén
+    belül; False, ha nincs élő küldőkapcsolat (a hívó ilyenkor a twitchio kapcsolatán küld).
+    """
+
+    def __init__(self, token: str, nick: str, url: str = DEFAULT_URL, size: int = DEFAULT_CONNECTIONS,
+                 connection_rate: int = CONNECTION_RATE, account_rate: int = DEFAULT_RATE,
+                 per: float = DEFAULT_PER):
+        self.token = (token or "").removeprefix("oauth:")
+        self.nick = (nick or "").lower()
+        self.url = url
+        self.connection_rate = connection_rate
+        self.per = per
+        self.account = TokenBucket(account_rate, per)
+        self.joins = TokenBucket(JOIN_RATE, JOIN_PER)
+        self.connections = [SendConnection(self, i) for i in range(max(1, size))]
+        self.routes = {}            # csatorna -> SendConnection
+        self._echoes = {}           # csatorna -> deque[(elküldés ideje, sor)] – visszavárt üzeneteink
+        self._session = None
+
+        self.throttled = 0          # hányszor kellett a fiók / kapcsolat keretére várni
+        self.fallbacks = 0          # élő küldőkapcsolat híján a twitchio küldött
+        self.echoes = 0             # az olvasó kapcsolaton eldobott saját üzenetek
+
+    async def session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    def start(self):
+        for conn in self.connections:
+            conn.start()
+        REGISTRY.add_collector(self.collect_metrics)
+        log.info("[📤] %s küldőkapcsolat indul (fiókkeret: %s / %s mp)",
+                 len(self.connections), int(self.account.capacity), self.per)
+
+    async def close(self):
+        for conn in self.connections:
+            await conn.stop()
+        if self._session is not None:
+            await self._session.close()
+
+    def ready(self) -> bool:
+        return any(conn.connected for conn in self.connections)
+
+    # --------- csatorna -> kapcsolat ---------
+    def _route(self, channel: str):
+        conn = self.routes.get(channel)
+        if conn is not None and conn.connected:
+            return conn
+        live = [c for c in self.connections if c.connected]
+        if not live:
+            return None
+        conn = min(live, key=lambda c: len(c.channels))
+        conn.channels.add(channel)
+        self.routes[channel] = conn
+        return conn
+
+    def unroute(self, conn: SendConnection):
+        """Kiesett kapcsolat: a csatornái a következő üzenetükkel máshova kerülnek."""
+        for channel in conn.channels:
+            if self.routes.get(channel) is conn:
+                del self.routes[channel]
+        conn.channels.clear()
+
+    # --------- visszhang ---------
+    def remember(self, channel: str, line: str):
+        recent = self._echoes.get(channel)
+        if recent is None:
+            recent = self._echoes[channel] = deque(maxlen=ECHO_WINDOW)
+        recent.append((time.monotonic(), line))
+
+    def is_echo(self, author: str, channel: str, text: str) -> bool:
+        """A küldőkapcsolataink egyik üzenete jött vissza az olvasó kapcsolatra?
+
+        Csak a bot nevében érkező, nemrég elküldött sorral egyező üzenet számít; a
+        talált sort kivesszük, így egy kézzel beírt, azonos parancs nem vész el.
+        """
+        if author.lower() != self.nick:
+            return False
+        recent = self._echoes.get(channel.lower())
+        if not recent:
+            return False
+        limit = time.monotonic() - ECHO_TTL
+        while recent and recent[0][0] < limit:
+            recent.popleft()
+        text = text.strip()
+        for i, (_, line) in enumerate(recent):
+            if line == text:
+                del recent[i]
+                self.echoes += 1
+                return True
+        return False
+
+    async def part(self, channel: str):
+        self._echoes.pop(channel, None)
+        conn = self.routes.pop(channel, None)
+        if conn is not None:
+            await conn.part(channel)
+
+    # --------- küldés ---------
+    async def send(self, channel: str, text: str) -> bool:
+        failures = 0
+        while failures < len(self.connections):
+            conn = self._route(channel)
+            if conn is None:
+                break
+            delay = max(self.account.wait_time(), conn.bucket.wait_time())
+            if delay > 0:
+                self.throttled += 1
+                await asyncio.sleep(delay)
+                continue        # közben a kapcsolat kieshetett – újra választunk
+            self.account.take()
+            conn.bucket.take()
+            try:
+                await conn.privmsg(channel, text)
+                return True
+            except Exception as e:
+                failures += 1
+                log.warning("[📤] %s: küldési hiba (#%s): %s", conn.name, channel, e)
+                conn.fail(e)
+        self.fallbacks += 1
+        return False
+
+    # --------- állapot ---------
+    def stats(self) -> dict:
+        return {"connections": {c.name: c.stats() for c in self.connections},
+                "channels": len(self.routes), "throttled": self.throttled, "fallbacks": self.fallbacks,
+                "echoes": self.echoes}
+
+    def collect_metrics(self):
+        IRC_SEND_CONNECTED.replace({(c.name,): int(c.connected) for c in self.connections})
+        messages = {}
+        for c in self.connections:
+            messages[(c.name, "sent")] = c.sent
+            messages[(c.name, "errors")] = c.errors
+            messages[(c.name, "rate_limited")] = c.rate_limited
+        messages[("twitchio", "fallback")] = self.fallbacks
+        IRC_SEND_MESSAGES.replace(messages)
+        IRC_SEND_RECONNECTS.replace({(c.name,): c.reconnects for c in self.connections})
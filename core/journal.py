@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+# ===============================
+# Journal – futó játékok túlélik az újraindítást
+# ===============================
+# Csatornánként egy append-only fájl (journal/<csatorna>.log). Minden sor egy játék
+# teljes átadható állapota egy átmenet után (export_state: állapot + időzítők), így a
+# visszajátszás egyszerű: játékonként az utolsó sor nyer. Csak valódi változás kerül
+# a fájlba: ha az állapot és az időzítők (lejárati idejük szerint) megegyeznek az előző
+# sorral – pl. cooldown miatt elutasított tipp –, a bejegyzés kimarad. A sorok kötegelve, egy
+# fsync-kel kerülnek lemezre; ha egy fájl túl hosszú, tömörítjük (csak az utolsó
+# állapot marad játékonként – ez a pillanatkép), atomikus cserével.
+FSYNC_INTERVAL = 0.05       # ennyi ideig gyűlnek a sorok egy fsync-hez (mp)
+COMPACT_LINES = 500         # ennyi sor felett a csatorna fájlja tömörítésre kerül
+DEFAULT_DIR = "journal"
+
+
+class Journal:
+    def __init__(self, directory: str, fsync_interval: float = FSYNC_INTERVAL,
+                 compact_lines: int = COMPACT_LINES):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.compact_lines = compact_lines
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending = {}      # csatorna -> [sor, ...] (még nincs lemezen)
+        self._lines = {}        # csatorna -> sorok száma a fájlban (a korábbi futások sorai is)
+        self._last = {}         # (csatorna, játék) -> (állapot JSON, időzítők lejárata) – a legutóbb rögzített
+        self._files = {}        # csatorna -> nyitott fájl
+        self._flush_handle = None
+        self._writing = None    # folyamatban lévő háttér-írás (Future)
+        self._lock = threading.Lock()   # a fájlműveletek a háttérszálon és a loopon is futhatnak
+
+        self.records = 0
+        self.unchanged = 0      # kihagyott bejegyzések (nem változott semmi)
+        self.bytes = 0
+        self.fsyncs = 0
+        self.compactions = 0
+
+    def _path(self, channel: str) -> str:
+        return os.path.join(self.directory, f"{channel}.log")
+
+    # --------- írás ---------
+    def record(self, channel: str, game: str, data: dict):
+        """Egy játék állapota egy átmenet után; a következő kötegben kerül lemezre.
+
+        Változatlan állapotnál (és ugyanakkor lejáró időzítőknél) nem ír semmit.
+        """
+        now = time.time()
+        state = json.dumps(data.get("state"), ensure_ascii=False, separators=(",", ":"))
+        timers = data.get("timers", [])
+        # az időzítők hátralévő ideje minden hívásnál más: a lejárat (falióra) az összevetés alapja
+        deadlines = [(key, round(now + remaining, 1), handler, args) for key, remaining, handler, args in timers]
+        key = (channel, game)
+        if self._last.get(key) == (state, deadlines):
+            self.unchanged += 1
+            return
+        self._last[key] = (state, deadlines)
+        line = (f'{{"t":{round(now, 3)},"g":{json.dumps(game, ensure_ascii=False)},"d":{{"state":{state},'
+                f'"timers":{json.dumps(timers, ensure_ascii=False, separators=(",", ":"))}}}}}\n')
+        self._pending.setdefault(channel, []).append(line)
+        self.records += 1
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(self.fsync_interval, self._flush_soon)
+
+    def _flush_soon(self):
+        self._flush_handle = None
+        if self._writing is not None and not self._writing.done():
+            # az előző köteg még íródik: a mostani a következő körben megy
+            self._flush_handle = asyncio.get_event_loop().call_later(self.fsync_interval, self._flush_soon)
+            return
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._writing = asyncio.get_event_loop().run_in_executor(None, self._write_batch, batch)
+
+    def _write_batch(self, batch: dict):
+        """Háttérszálon: hozzáfűzés, majd csatornánként egy fsync."""
+        with self._lock:
+            for channel, lines in batch.items():
+                self._append(channel, lines)
+
+    def _append(self, channel: str, lines: list):
+        f = self._files.get(channel)
+        if f is None:
+            if channel not in self._lines:
+                # a korábbi futás(ok) tömörítetlen sorai is beszámítanak
+                self._lines[channel] = self._scan(self._path(channel))[1]
+            f = self._files[channel] = open(self._path(channel), "a", encoding="utf-8")
+        data = "".join(lines)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        self.fsyncs += 1
+        self.bytes += len(data.encode("utf-8"))
+        count = self._lines[channel] = self._lines.get(channel, 0) + len(lines)
+        if count > self.compact_lines:
+            self._compact(channel)
+
+    async def flush(self):
+        """Minden függő sor lemezre írása (leállításkor, teszteléskor)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._writing is not None:
+            await self._writing
+        batch, self._pending = self._pending, {}
+        if batch:
+            await asyncio.get_event_loop().run_in_executor(None, self._write_batch, batch)
+
+    # --------- tömörítés ---------
+    def _compact(self, channel: str):
+        """A fájl cseréje játékonként az utolsó állapotra (tmp + fsync + rename)."""
+        path = self._path(channel)
+        f = self._files.pop(channel, None)
+        if f is not None:
+            f.close()
+        latest = self._read_latest(path)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            for entry in latest.values():
+                out.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+        self._lines[channel] = len(latest)
+        self.compactions += 1
+
+    @classmethod
+    def _read_latest(cls, path: str) -> dict:
+        """Játéknév -> utolsó bejegyzés; a csonka utolsó sort (összeomlás írás közben) kihagyja."""
+        return cls._scan(path)[0]
+
+    @staticmethod
+    def _scan(path: str) -> tuple:
+        """(játéknév -> utolsó bejegyzés, a fájl sorainak száma)."""
+        latest = {}
+        lines = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    latest[entry["g"]] = entry
+        except FileNotFoundError:
+            pass
+        return latest, lines
+
+    # --------- visszajátszás ---------
+    def recover(self, channel: str) -> dict:
+        """{játéknév: export_state} a futó játékokra; az időzítők a kiesett idővel csökkentve."""
+        now = time.time()
+        states = {}
+        latest, lines = self._scan(self._path(channel))
+        with self._lock:
+            if channel not in self._files:
+                self._lines[channel] = lines
+        for game, entry in latest.items():
+            data = entry["d"]
+            if not data.get("timers") and not data.get("state", {}).get("active"):
+                continue   # lezárt játék: nincs mit folytatni
+            elapsed = max(0.0, now - entry["t"])
+            data["timers"] = [[key, max(0.0, remaining - elapsed), handler, args]
+                              for key, remaining, handler, args in data.get("timers", ())]
+            states[game] = data
+        return states
+
+    def close(self, channel: str):
+        """A csatorna fájljának elengedése (a csatorna egy másik folyamathoz költözött)."""
+        with self._lock:
+            f = self._files.pop(channel, None)
+            if f is not None:
+                f.close()
+            self._lines.pop(channel, None)   # visszatéréskor a fájlból számoljuk újra
+        for key in [k for k in self._last if k[0] == channel]:
+            del self._last[key]
+
+    def stats(self) -> dict:
+        return {"records": self.records, "unchanged": self.unchanged, "bytes": self.bytes, "fsyncs": self.fsyncs,
+                "compactions": self.compactions}
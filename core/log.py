@@ -0,0 +1,142 @@
+import atexit
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# ===============================
+# Naplózás (nem blokkoló, strukturált)
+# ===============================
+# A rekord a loop szálán készül el (szintellenőrzés, gyakoriságkorlát, üzenet összerakása),
+# majd egy korlátos sorba kerül; a stdout-ra egy háttérszál ír. Ha a kimenet lassú (log
+# gyűjtő visszanyomás), a loop nem áll meg: tele sornál a rekord eldobódik és számoljuk.
+#
+#   log = get_logger("runtime")
+#   log.warning("[⚠️] Chat küldési hiba (%s): %s", channel, e)     # %-os sablon, nem f-string!
+#
+# A gyakoriságkorlát a sablonra (logger + msg) vonatkozik, ezért kell a %-os forma: ugyanaz
+# a sablon RATE_WINDOW mp-enként legfeljebb RATE_BURST-szor jelenik meg, a többit a
+# következő megjelenés "(+N hasonló elnyomva)" végződéssel jelzi.
+# A játékok `BaseGame.log`-ja minden rekordhoz hozzáteszi a csatornát, a játékot és a game_id-t.
+# Szint: general.DEBUG (igaz -> DEBUG, különben INFO); config újratöltéskor is átáll.
+ROOT = "bot"
+QUEUE_SIZE = 10000
+RATE_WINDOW = 10.0
+RATE_BURST = 5
+FORMAT = "%(asctime)s %(levelname)-7s %(fields)s%(message)s"
+DATE_FORMAT = "%H:%M:%S"
+FIELDS = ("channel", "game", "game_id")
+
+_handler = None
+_listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def setup(debug: bool = False, stream=None):
+    """A háttérszálas kimenet bekapcsolása (egyszer, a főprogram elején)."""
+    global _handler, _listener
+    set_debug(debug)
+    if _handler is not None:
+        return
+    records = queue.Queue(QUEUE_SIZE)
+    _handler = _DroppingQueueHandler(records)
+    _handler.addFilter(RateLimitFilter())
+    out = logging.StreamHandler(stream or sys.stdout)
+    out.setFormatter(_Formatter(FORMAT, DATE_FORMAT))
+    _listener = _Listener(records, out)
+    _listener.start()
+    root = logging.getLogger(ROOT)
+    root.addHandler(_handler)
+    root.propagate = False
+    atexit.register(shutdown)
+
+
+def set_debug(debug: bool):
+    logging.getLogger(ROOT).setLevel(logging.DEBUG if debug else logging.INFO)
+
+
+def shutdown():
+    """A sorban maradt rekordok kiírása és a háttérszál leállítása (kilépés előtt)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stats() -> dict:
+    if _handler is None:
+        return {}
+    limiter = _handler.filters[0]
+    return {"queued": _handler.queue.qsize(), "dropped": _handler.dropped, "suppressed": limiter.suppressed}
+
+
+class RateLimitFilter(logging.Filter):
+    """Ugyanaz a sablon ablakonként legfeljebb `burst`-ször; a többi elnyomva, számolva."""
+
+    def __init__(self, window: float = RATE_WINDOW, burst: int = RATE_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._seen = {}         # (logger, sablon) -> [ablak kezdete, darab, elnyomott]
+        self.suppressed = 0
+
+    def filter(self, record) -> bool:
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        entry = self._seen.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            if entry is not None and entry[2]:
+                record.suppressed = entry[2]
+            self._seen[key] = [now, 1, 0]
+            return True
+        entry[1] += 1
+        if entry[1] <= self.burst:
+            return True
+        entry[2] += 1
+        self.suppressed += 1
+        return False
+
+
+class GameLogger(logging.LoggerAdapter):
+    """Egy játékpéldány naplója: a csatorna, a játék és az aktuális game_id minden rekordon."""
+
+    def __init__(self, game):
+        super().__init__(get_logger(f"game.{game.name}"), {})
+        self.game = game
+
+    def process(self, msg, kwargs):
+        game = self.game
+        kwargs["extra"] = {"channel": game.channel, "game": game.name, "game_id": game.game_id,
+                           **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def __init__(self, records):
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # tele sornál is bekerüljön (a szál addig ürít)
+        self.queue.put(self._sentinel)
+
+
+class _Formatter(logging.Formatter):
+    def format(self, record) -> str:
+        fields = [str(v) for v in (getattr(record, k, None) for k in FIELDS) if v is not None]
+        record.fields = f"[{' '.join(fields)}] " if fields else ""
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} (+{suppressed} hasonló elnyomva)" if suppressed else text
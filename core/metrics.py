@@ -0,0 +1,206 @@
+import asyncio
+import time
+from bisect import bisect_left
+
+from core.log import get_logger
+
+log = get_logger("metrics")
+
+# ===============================
+# Metrikák (Prometheus szöveges formátum)
+# ===============================
+# A mérés a forró úton csak egy bisect + két listaelem növelése, zár nélkül: minden
+# `observe`/`inc` az event loop szálán fut. A /metrics végpont (Flask szál) a sorozatok
+# másolatából renderel – a dict/list másolás CPython alatt egy lépésben történik.
+# A pillanatnyi értékeket (sorhosszak, futó játékok) nem a forró úton írjuk: a
+# `Registry.start_sampler` másodpercenként lefuttatja a regisztrált gyűjtőket.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MICRO_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+SAMPLE_INTERVAL = 1.0
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, labels: tuple = (), n: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + n
+
+    def render(self) -> list:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in list(self._values.items())]
+
+
+class Gauge(Counter):
+    """Pillanatnyi érték; a gyűjtők egyben cserélik le (`replace`), így a render sosem lát félkészet."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), kind: str = "gauge"):
+        super().__init__(name, help, labelnames)
+        self.kind = kind    # "counter" is lehet, ha egy máshol számolt összesítést tükröz
+
+    def set(self, value: float, labels: tuple = ()):
+        self._values[labels] = value
+
+    def replace(self, values: dict):
+        self._values = values
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}   # címkék -> [vödör0, ..., +Inf vödör, összeg]
+
+    def observe(self, value: float, labels: tuple = ()):
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        s[bisect_left(self.buckets, value)] += 1
+        s[-1] += value
+
+    def render(self) -> list:
+        lines = []
+        for labels, series in list(self._series.items()):
+            series = list(series)
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                total += count
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []    # callable() – a loop szálán, SAMPLE_INTERVAL-onként
+        self._sampler = None
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = (), kind: str = "gauge") -> Gauge:
+        return self._add(Gauge(name, help, labelnames, kind))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def collect(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                log.warning("[⚠️] Metrika-gyűjtő hiba: %s", e)
+
+    def start_sampler(self, interval: float = SAMPLE_INTERVAL):
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.get_event_loop().create_task(self._sample(interval))
+
+    async def _sample(self, interval: float):
+        while True:
+            self.collect()
+            await asyncio.sleep(interval)
+
+    def render(self) -> str:
+        out = []
+        for m in self.metrics:
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.kind}")
+            out.extend(m.render())
+        return "\n".join(out) + "\n"
+
+
+# ===============================
+# A bot metrikái
+# ===============================
+REGISTRY = Registry()
+
+COMMAND_SECONDS = REGISTRY.histogram(
+    "bot_command_seconds", "Parancs átfutási ideje a routertől az átmenet végéig (postafiók-várakozással)",
+    ("command",))
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "bot_event_loop_lag_seconds", "Event loop késés (a lag-mérő alvásának túlfutása)")
+OVERLAY_WRITE_SECONDS = REGISTRY.histogram(
+    "bot_overlay_write_seconds", "Overlay állapot kiírása (fájl + állapottár)", ("game",))
+OVERLAY_PUSH_SECONDS = REGISTRY.histogram(
+    "bot_overlay_push_seconds", "Overlay esemény elküldése egy WebSocket kliensnek")
+OVERLAY_ENCODE_SECONDS = REGISTRY.histogram(
+    "bot_overlay_encode_seconds", "Overlay üzenet kódolása formátumonként (frissítésenként egyszer)", ("format",),
+    buckets=MICRO_BUCKETS)
+OVERLAY_ENCODED_BYTES = REGISTRY.histogram(
+    "bot_overlay_encoded_bytes", "Kódolt overlay üzenet mérete formátumonként", ("format",), buckets=SIZE_BUCKETS)
+OVERLAY_CLIENTS = REGISTRY.gauge("bot_overlay_clients", "Csatlakozott overlay kliensek")
+OVERLAY_MESSAGES = REGISTRY.gauge(
+    "bot_overlay_messages_total", "Overlay üzenetek kimenet szerint (elküldve, összevonva, bontott lassú kliens)",
+    ("result",), kind="counter")
+SHADOW_SECONDS = REGISTRY.histogram(
+    "bot_shadow_transition_seconds", "Állapotátmenet ideje shadow módban (élő / jelölt modul)", ("game", "side"),
+    buckets=MICRO_BUCKETS + (0.01, 0.05, 0.25))
+SHADOW_TRANSITIONS = REGISTRY.gauge(
+    "bot_shadow_transitions_total", "Shadow módban tükrözött átmenetek kimenet szerint", ("game", "result"),
+    kind="counter")
+AI_THINK_SECONDS = REGISTRY.histogram(
+    "bot_ai_think_seconds", "AI lépésválasztás ideje", ("mode",))
+OUTBOUND_QUEUE_DEPTH = REGISTRY.gauge(
+    "bot_outbound_queue_depth", "Kimenő chat-sor hossza csatornánként", ("channel",))
+OUTBOUND_MESSAGES = REGISTRY.gauge(
+    "bot_outbound_messages_total", "Kimenő üzenetek száma kimenet szerint", ("result",), kind="counter")
+IRC_SEND_CONNECTED = REGISTRY.gauge(
+    "bot_irc_send_connected", "Küldőkapcsolat állapota (1 = hitelesítve, küld)", ("connection",))
+IRC_SEND_MESSAGES = REGISTRY.gauge(
+    "bot_irc_send_messages_total", "Küldőkapcsolatonként kiküldött üzenetek kimenet szerint",
+    ("connection", "result"), kind="counter")
+IRC_SEND_RECONNECTS = REGISTRY.gauge(
+    "bot_irc_send_reconnects_total", "Küldőkapcsolatok újracsatlakozásai", ("connection",), kind="counter")
+INBOUND_QUEUE_DEPTH = REGISTRY.gauge(
+    "bot_inbound_queue_depth", "Bejövő parancssor hossza prioritási osztályonként", ("class",))
+INBOUND_SHED = REGISTRY.gauge(
+    "bot_inbound_shed_total", "Terhelés miatt eldobott bejövő parancsok", ("class",), kind="counter")
+GAME_INSTANCES = REGISTRY.gauge(
+    "bot_game_instances", "Játékpéldányok száma típusonként", ("game",))
+ACTIVE_GAMES = REGISTRY.gauge(
+    "bot_active_games", "Éppen futó játékok száma típusonként", ("game",))
+ACTOR_MAILBOX_DEPTH = REGISTRY.gauge(
+    "bot_actor_mailbox_depth", "Feldolgozatlan üzenetek a játékok postafiókjaiban", ("game",))
+UPTIME_SECONDS = REGISTRY.gauge("bot_uptime_seconds", "A folyamat futási ideje")
+
+_STARTED = time.monotonic()
+REGISTRY.add_collector(lambda: UPTIME_SECONDS.set(round(time.monotonic() - _STARTED, 1)))
@@ -0,0 +1,263 @@
+import asyncio
+import time
+from collections import deque
+
+from core.log import get_logger
+
+log = get_logger("outbound")
+
+# ===============================
+# Kimenő chat-üzenetsor
+# ===============================
+# Twitch üzenetkeret: broadcaster/mod fióknak 100 üzenet / 30 mp,
+# sima fióknak 20 üzenet / 30 mp (csatornánként számolva).
+DEFAULT_RATE = 100
+DEFAULT_PER = 30.0
+USER_RATE = 20          # idegen csatornán, ahol a bot nem moderátor
+MAX_MESSAGE_LEN = 500
+MAX_QUEUE = 50          # ennél több várakozó üzenetnél dobjuk a legkisebb prioritásúakat
+LOW_PRESSURE_DEPTH = 3  # ennyi várakozó üzenet felett az alacsony prioritás már eldobható
+JOINER = " | "
+
+# prioritások (kisebb = fontosabb)
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+
+class TokenBucket:
+    """Egyszerű token bucket: `rate` darab token `per` másodpercenként."""
+
+    __slots__ = ("capacity", "fill_rate", "tokens", "stamp")
+
+    def __init__(self, rate: int, per: float):
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.stamp = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.fill_rate)
+        self.stamp = now
+
+    def available(self) -> bool:
+        self._refill()
+        return self.tokens >= 1.0
+
+    def wait_time(self) -> float:
+        self._refill()
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.fill_rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1.0
+
+
+class ChannelOutbox:
+    """Egy csatorna kimenő sora: rate limit, összevonás, terhelés alatti eldobás."""
+
+    def __init__(self, name: str, sender, rate: int = DEFAULT_RATE, per: float = DEFAULT_PER):
+        self.name = name
+        self._sender = sender          # async callable(channel_name, text)
+        self._queue = deque()          # (priority, text)
+        self._bucket = TokenBucket(rate, per)
+        self._wake = asyncio.Event()
+        self._task = None
+
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.dropped_low = 0
+        self.errors = 0
+
+    # --------- sorba tétel ---------
+    def put(self, text: str, priority: int = NORMAL) -> bool:
+        text = (text or "").strip()
+        if not text:
+            return False
+
+        if priority >= LOW:
+            # terhelés alatt (nincs token vagy már torlódik a sor) a figyelmeztetések mennek el elsőként
+            if len(self._queue) >= LOW_PRESSURE_DEPTH or not self._bucket.available():
+                self.dropped_low += 1
+                return False
+            # ugyanaz a figyelmeztetés ne kerüljön kétszer a sorba
+            if any(p == priority and t == text for p, t in self._queue):
+                self.dropped_low += 1
+                return False
+
+        if len(self._queue) >= MAX_QUEUE and not self._evict(priority):
+            self.dropped += 1
+            return False
+
+        if priority <= HIGH:
+            # moderátori válaszok a sor elejére kerülnek (a többi HIGH mögé)
+            idx = next((i for i, (p, _) in enumerate(self._queue) if p > HIGH), len(self._queue))
+            self._queue.insert(idx, (priority, text))
+        else:
+            self._queue.append((priority, text))
+        self._ensure_task()
+        self._wake.set()
+        return True
+
+    def _evict(self, priority: int) -> bool:
+        """Hely felszabadítása: a legrégebbi, nála kevésbé fontos üzenet kiesik."""
+        for prio in (LOW, NORMAL):
+            if prio <= priority:
+                break
+            for i, (p, _) in enumerate(self._queue):
+                if p == prio:
+                    del self._queue[i]
+                    if prio == LOW:
+                        self.dropped_low += 1
+                    else:
+                        self.dropped += 1
+                    return True
+        return False
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._drain())
+
+    # --------- összevonás ---------
+    def _next_line(self) -> str:
+        """Az egy körben összegyűlt üzenetek egy sorba fűzése (max. 500 karakter).
+
+        A `!`/`/` kezdetű sorok más botoknak szóló parancsok, ezeket sosem vonjuk össze.
+        """
+        _, text = self._queue.popleft()
+        if text[0] in "!/":
+            return text[:MAX_MESSAGE_LEN]
+
+        parts = [text]
+        length = len(text)
+        while self._queue:
+            _, nxt = self._queue[0]
+            if nxt[0] in "!/" or length + len(JOINER) + len(nxt) > MAX_MESSAGE_LEN:
+                break
+            self._queue.popleft()
+            parts.append(nxt)
+            length += len(JOINER) + len(nxt)
+        self.coalesced += len(parts) - 1
+        return JOINER.join(parts)[:MAX_MESSAGE_LEN]
+
+    # --------- küldő ciklus ---------
+    async def _drain(self):
+        while True:
+            if not self._queue:
+                self._wake.clear()
+                await self._wake.wait()
+            # egy kör türelem: az ugyanabban a tickben keletkező üzenetek is beérjenek
+            await asyncio.sleep(0)
+
+            delay = self._bucket.wait_time()
+            if delay > 0:
+                self._shed_low()
+                await asyncio.sleep(delay)
+                if not self._queue:
+                    continue
+
+            line = self._next_line()
+            self._bucket.take()
+            try:
+                await self._sender(self.name, line)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                log.warning("[⚠️] Chat küldési hiba (%s): %s", self.name, e)
+
+    def _shed_low(self):
+        """Token-hiány esetén az alacsony prioritású üzenetek eldobása."""
+        before = len(self._queue)
+        if any(p >= LOW for p, _ in self._queue):
+            self._queue = deque((p, t) for p, t in self._queue if p < LOW)
+            self.dropped_low += before - len(self._queue)
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._queue),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "dropped_low": self.dropped_low,
+            "errors": self.errors,
+        }
+
+
+class ChatOutbox:
+    """Csatornánkénti kimenő sorok kezelője a főbothoz.
+
+    A csatornák név szerint, dict-ben vannak nyilvántartva – nincs lineáris keresés
+    a `bot.connected_channels` listában üzenetenként. Küldőkészlettel (`pool`) az
+    üzenetek a külön küldőkapcsolatokon mennek ki, a twitchio kapcsolata csak olvas.
+    """
+
+    def __init__(self, bot, rate: int = DEFAULT_RATE, per: float = DEFAULT_PER,
+                 nick: str = None, mod_channels=(), pool=None):
+        self.bot = bot
+        self.pool = pool      # core.irc.SendPool vagy None (ilyenkor a twitchio kapcsolata küld)
+        self.rate = rate
+        self.per = per
+        # a saját csatornán és ahol a bot moderátor, a magasabb keret él; máshol USER_RATE
+        self.nick = (nick or "").lower()
+        self.mod_channels = {c.lower() for c in mod_channels}
+        self._channels = {}   # név -> twitchio Channel
+        self._outboxes = {}   # név -> ChannelOutbox
+
+    def bind(self, channel):
+        """Csatlakozott csatorna felvétele (event_channel_joined-ból hívjuk)."""
+        self._channels[channel.name.lower()] = channel
+
+    def _lookup(self, name: str):
+        ch = self._channels.get(name)
+        if ch is None:
+            ch = self.bot.get_channel(name)
+            if ch is not None:
+                self._channels[name] = ch
+        return ch
+
+    async def _send_raw(self, name: str, text: str):
+        if self.pool is not None and await self.pool.send(name, text):
+            return
+        ch = self._lookup(name)
+        if ch is None:
+            raise RuntimeError(f"nem található a(z) {name} csatorna")
+        await ch.send(text)
+
+    def outbox(self, name: str) -> ChannelOutbox:
+        key = name.lower()
+        box = self._outboxes.get(key)
+        if box is None:
+            rate = self.rate
+            if self.nick and key != self.nick and key not in self.mod_channels:
+                rate = min(rate, USER_RATE)
+            box = self._outboxes[key] = ChannelOutbox(key, self._send_raw, rate, self.per)
+        return box
+
+    def send(self, channel, text: str, priority: int = NORMAL) -> bool:
+        """Üzenet sorba tétele. `channel` lehet név vagy twitchio Channel; nem blokkol."""
+        name = channel if isinstance(channel, str) else channel.name
+        return self.outbox(name).put(text, priority)
+
+    async def release(self, name: str, timeout: float = 2.0):
+        """Csatorna leadása: a várakozó üzenetek kiküldése (legfeljebb `timeout` mp), majd törlés."""
+        key = name.lower()
+        box = self._outboxes.get(key)
+        deadline = time.monotonic() + timeout
+        while box is not None and box._queue and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        box = self._outboxes.pop(key, None)
+        if box is not None and box._task is not None:
+            box._task.cancel()
+        self._channels.pop(key, None)
+        if self.pool is not None:
+            await self.pool.part(key)
+
+    def stats(self) -> dict:
+        return {name: box.stats() for name, box in self._outboxes.items()}
+
+    def total_depth(self) -> int:
+        return sum(len(box._queue) for box in self._outboxes.values())
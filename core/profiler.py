@@ -0,0 +1,154 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# ===============================
+# Igény szerinti profilozás (!profile, /debug/profile)
+# ===============================
+# Egy időkorlátos futás két dolgot rögzít:
+#   - mintavételes profil: egy külön szál INTERVAL-onként lekéri minden szál aktuális
+#     stackjét (sys._current_frames) – a loop szálát és a háttérszálakat (stats, journal,
+#     eseménynapló, executor) is; a kimenet "összecsukott" stack formátum
+#     (szál;függvény;...;függvény darab), amit a flamegraph.pl / speedscope közvetlenül megnyit
+#   - tracemalloc pillanatkép-különbség: a futás alatt keletkezett (és megmaradt)
+#     foglalások, forrássoronként a TOP_ALLOC legnagyobb
+# Ha nem fut profil, nincs szál, nincs tracemalloc – a költség nulla.
+DEFAULT_DIR = "profiles"
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 60.0
+INTERVAL = 0.005            # mintavételi időköz (mp)
+TRACE_FRAMES = 10           # tracemalloc ennyi keretet tárol foglalásonként
+TOP_ALLOC = 25
+TOP_FRAMES = 5
+
+
+class Profiler:
+    def __init__(self, directory: str = DEFAULT_DIR, interval: float = INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.running = False
+        self.last = None        # az utolsó futás összefoglalója
+
+    async def run(self, seconds: float = DEFAULT_SECONDS, allocations: bool = True) -> dict:
+        """Profil a megadott ideig (legfeljebb MAX_SECONDS); az összefoglalót adja vissza."""
+        if self.running:
+            raise RuntimeError("már fut egy profilozás")
+        seconds = max(1.0, min(MAX_SECONDS, float(seconds)))
+        self.running = True
+        loop = asyncio.get_event_loop()
+        sampler = _Sampler(threading.get_ident(), self.interval)
+        started_trace = False
+        try:
+            if allocations:
+                started_trace = not tracemalloc.is_tracing()
+                if started_trace:
+                    tracemalloc.start(TRACE_FRAMES)
+                before = tracemalloc.take_snapshot()
+            sampler.start()
+            await asyncio.sleep(seconds)
+            sampler.stop()
+            alloc = None
+            if allocations:
+                # a loop szálán, mielőtt a saját executor-munkánk foglalna
+                after = tracemalloc.take_snapshot()
+                alloc = await loop.run_in_executor(None, _alloc_diff, before, after)
+        finally:
+            sampler.stop()
+            if started_trace:
+                tracemalloc.stop()
+            self.running = False
+        summary = await loop.run_in_executor(None, self._write, sampler, alloc, seconds)
+        self.last = summary
+        return summary
+
+    def _write(self, sampler, alloc, seconds: float) -> dict:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        folded_path = os.path.join(self.directory, f"profile-{stamp}.folded")
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(sampler.stacks.items(), key=lambda kv: -kv[1]):
+                f.write(f"{stack} {count}\n")
+        summary = {
+            "seconds": seconds,
+            "samples": sampler.samples,
+            "folded": folded_path,
+            "top_frames": sampler.top_frames(TOP_FRAMES),
+        }
+        if alloc is not None:
+            alloc_path = os.path.join(self.directory, f"profile-{stamp}-alloc.txt")
+            with open(alloc_path, "w", encoding="utf-8") as f:
+                for line in alloc:
+                    f.write(line + "\n")
+            summary["alloc"] = alloc_path
+            summary["top_alloc"] = alloc[:TOP_FRAMES]
+        return summary
+
+
+class _Sampler:
+    """Háttérszál, amely a futás alatt minden szál stackjét gyűjti."""
+
+    def __init__(self, loop_thread: int, interval: float):
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.stacks = {}        # "szál;f1;f2;..." -> minták száma
+        self.leaves = {}        # legfelső keret -> minták száma (a loop szálán)
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if self.samples % 200 == 0:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                thread = "loop" if tid == self.loop_thread else names.get(tid, str(tid))
+                key = thread + ";" + ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                if tid == self.loop_thread:
+                    self.leaves[stack[0]] = self.leaves.get(stack[0], 0) + 1
+            self.samples += 1
+
+    def top_frames(self, n: int) -> list:
+        """A loop szálán a leggyakoribb legfelső keretek: [(keret, arány), ...]."""
+        total = sum(self.leaves.values()) or 1
+        top = sorted(self.leaves.items(), key=lambda kv: -kv[1])[:n]
+        return [(frame, round(count / total, 3)) for frame, count in top]
+
+
+def _alloc_diff(before, after) -> list:
+    """A futás alatt nőtt foglalások forrássoronként, csökkenő méret szerint (olvasható sorok)."""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__),
+              tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    lines = []
+    for stat in stats[:TOP_ALLOC]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blokk)  "
+                     f"{frame.filename}:{frame.lineno}")
+    return lines
@@ -0,0 +1,85 @@
+from core.log import get_logger
+
+log = get_logger("router")
+
+# ===============================
+# Parancs-útválasztó
+# ===============================
+# (csatorna, parancs) -> Route előre felépített táblában. Üzenetenként egyetlen
+# split + egy dict-keresés, függetlenül attól, hány játék van betöltve.
+
+
+class CommandContext:
+    """Egy beérkezett parancs minden adata, ami a játékoknak kell."""
+
+    __slots__ = ("channel", "user", "badges", "command", "arg", "message")
+
+    def __init__(self, channel: str, user: str, badges: dict, command: str, arg: str, message=None):
+        self.channel = channel
+        self.user = user
+        self.badges = badges
+        self.command = command
+        self.arg = arg
+        self.message = message
+
+    @property
+    def is_mod(self) -> bool:
+        b = self.badges
+        return "moderator" in b or "broadcaster" in b or self.user.lower() == self.channel
+
+    @property
+    def args(self) -> list:
+        return self.arg.split()
+
+    def first_arg(self):
+        parts = self.arg.split(maxsplit=1)
+        return parts[0] if parts else None
+
+
+class Route:
+    """Parancs-cél: `handler(ctx)` egy játék állapotátmenete (vagy runtime-parancs)."""
+
+    __slots__ = ("handler", "game", "mod_only", "denied")
+
+    def __init__(self, handler, game=None, mod_only: bool = False, denied: str = None):
+        self.handler = handler
+        self.game = game        # None = runtime-szintű (közvetlenül, actor nélkül fut)
+        self.mod_only = mod_only
+        self.denied = denied    # mod_only parancsnál a nem moderátornak adott válasz (None = csend)
+
+
+class CommandRouter:
+    def __init__(self, prefix: str = "!"):
+        self.prefix = prefix
+        self._table = {}        # (csatorna, parancs) -> Route
+        self.unrouted = 0
+
+    def parse(self, content: str):
+        """'!tipp a' -> ('tipp', 'a'); nem parancs esetén None."""
+        if not content.startswith(self.prefix):
+            return None
+        body = content[len(self.prefix):]
+        cmd, _, arg = body.partition(" ")
+        return cmd.lower(), arg.strip()
+
+    def lookup(self, channel: str, command: str):
+        return self._table.get((channel, command))
+
+    def add(self, channel: str, command: str, route: Route):
+        key = (channel, command.lower())
+        old = self._table.get(key)
+        if old is not None and old.game is not None and old.game is not route.game:
+            log.warning("[⚠️] Parancsütközés: !%s (%s) – az újabb regisztráció nyer.", command, channel)
+        self._table[key] = route
+
+    def remove(self, channel: str, command: str, owner=None):
+        key = (channel, command.lower())
+        route = self._table.get(key)
+        if route is not None and (owner is None or route.game is owner):
+            del self._table[key]
+
+    def commands_for(self, channel: str) -> list:
+        return sorted(cmd for ch, cmd in self._table if ch == channel)
+
+    def __len__(self):
+        return len(self._table)
@@ -0,0 +1,595 @@
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+from core.config import ConfigService
+from core.metrics import ACTIVE_GAMES, ACTOR_MAILBOX_DEPTH, COMMAND_SECONDS, GAME_INSTANCES
+from core.router import CommandContext, CommandRouter, Route
+from core.outbound import HIGH, LOW
+from core.state import MemoryStore, game_state_key
+from core.stats import LABELS
+from core.log import get_logger
+
+log = get_logger("runtime")
+
+# ===============================
+# Játék-futtatókörnyezet
+# ===============================
+DEFAULT_IDLE_UNLOAD = 900     # ennyi mp tétlenség után a játékmodul kikerül a memóriából
+REAPER_INTERVAL = 60
+MODULE_WATCH_INTERVAL = 1.0   # fejlesztői mód: ennyi mp-enként nézzük a betöltött modulok fájljait
+RELOAD_BUDGET_MS = 100        # e fölötti újratöltési időnél figyelmeztetünk
+STATE_SYNC_INTERVAL = 1.0     # ennyi mp-enként íródnak ki a megváltozott csatornák pillanatképei
+
+
+class GameRuntime:
+    """A játékmodulok közös futtatója.
+
+    - a modulok `prepare(runtime)` függvénye regisztrálja a játékot (`register`)
+    - csatornánként egy BaseGame példány jön létre játékonként, de csak amikor az
+      adott csatornán először használják; addig a csatorna költsége néhány router-bejegyzés
+    - a bejövő parancsokat a CommandRouter (csatorna, parancs) táblája osztja ki
+      a megfelelő játék actor-ának
+    - a modulok csak első használatkor töltődnek be (`!indit <játék>` vagy a játék
+      belépő parancsa, pl. !akasztás), és tétlenség után kikerülnek
+    - egy betöltött modul futás közben cserélhető (`reload`, !reload): a példányok
+      állapota és időzítői átkerülnek az új kódra, a Twitch kapcsolat marad
+    """
+
+    def __init__(self, bot, outbox, host=None, prefix: str = "!", manifest: dict = None,
+                 idle_unload: float = DEFAULT_IDLE_UNLOAD, store=None, journal=None, stats=None,
+                 events=None, config=None, profile_dir: str = "profiles"):
+        self.bot = bot
+        self.outbox = outbox
+        self.host = host
+        self.store = store if store is not None else MemoryStore()
+        self._dirty = set()     # csatornák, amelyek pillanatképe még nincs a tárban
+        self._state_sync = None
+        self.journal = journal  # core.journal.Journal vagy None (újraindítás utáni folytatáshoz)
+        self.stats = stats      # core.stats.StatsStore vagy None (!top, !stats)
+        self.events = events    # core.events.EventLog vagy None (offline elemzéshez)
+        self.config = config if config is not None else ConfigService()
+        self.config.subscribe(self._config_changed)
+        self.profile_dir = profile_dir
+        self.profiler = None    # core.profiler.Profiler, első !profile-nál jön létre
+        self.shadow = None      # core.shadow.ShadowRunner vagy None (jelölt modulok tükrözése)
+        self._profile_task = None
+        self.router = CommandRouter(prefix)
+        self.factories = {}     # játéknév -> factory(channel) -> BaseGame
+        self.channels = {}      # csatorna -> {játéknév: BaseGame}
+        self.primary_channel = None
+        self._routes = {}       # id(game) -> a routerbe beírt parancstábla
+
+        if manifest is None:
+            from games import GAMES as manifest
+        self.manifest = manifest
+        self.modules = {}       # játéknév -> betöltött modul
+        self.load_times = {}    # játéknév -> betöltési idő (ms)
+        self._mtimes = {}       # játéknév -> a modulfájl mtime-ja betöltéskor (watch módhoz)
+        self._module_watch = None
+        self.idle_unload = idle_unload
+        self._aliases = {}
+        for name, spec in manifest.items():
+            for alias in (name, *spec.get("aliases", ())):
+                self._aliases[alias.lower()] = name
+
+        stop = Route(self._cmd_stop, None, mod_only=True, denied="❌ Nincs jogosultságod leállítani a modult.")
+        self._runtime_routes = {
+            "stop": stop, "leallit": stop, "leállít": stop,
+            "indit": Route(self._cmd_indit, None), "indít": Route(self._cmd_indit, None),
+            "top": Route(self._cmd_top, None), "stats": Route(self._cmd_stats, None),
+            "reload": Route(self._cmd_reload, None, mod_only=True),
+            "profile": Route(self._cmd_profile, None, mod_only=True),
+        }
+        self._lazy_route = Route(self._cmd_lazy_entry, None)
+        self._reaper = None
+
+    # --------- modulok ---------
+    def load(self, name: str) -> bool:
+        """Játékmodul betöltése (ha még nincs); a prepare(runtime) regisztrálja a játékot."""
+        if name in self.modules:
+            return True
+        spec = self.manifest.get(name)
+        if spec is None:
+            return False
+        t0 = time.perf_counter()
+        try:
+            module = importlib.import_module(spec["module"])
+            self.modules[name] = module
+            module.prepare(self)
+        except Exception as e:
+            self.modules.pop(name, None)
+            log.exception("[⚠️] Hiba a(z) %s modul betöltésénél: %s", name, e)
+            return False
+        self.load_times[name] = round((time.perf_counter() - t0) * 1000, 2)
+        self._mtimes[name] = _mtime(module)
+        log.info("[✅] %s betöltve (%s ms).", name, self.load_times[name])
+        return True
+
+    def load_modules(self):
+        """Minden manifesztben szereplő játék azonnali betöltése (eszközöknek, teszteléshez)."""
+        for name in self.manifest:
+            self.load(name)
+
+    def unload(self, name: str):
+        """Játékmodul eltávolítása: példányok leállítása, parancsok visszaállítása lusta belépőre."""
+        if name not in self.modules:
+            return
+        for channel in self.channels:
+            self.despawn(channel, name)
+        self.factories.pop(name, None)
+        self._mtimes.pop(name, None)
+        module = self.modules.pop(name)
+        sys.modules.pop(module.__name__, None)
+        package, _, attr = module.__name__.rpartition(".")
+        parent = sys.modules.get(package)
+        if parent is not None and getattr(parent, attr, None) is module:
+            delattr(parent, attr)
+        log.info("[💤] %s modul tétlenség miatt kiürítve.", name)
+
+    async def reload(self, name: str):
+        """Betöltött játékmodul cseréje futás közben.
+
+        1. az új kód importálása (szinkron; hibánál minden marad a régiben)
+        2. a régi példányok postafiókjainak kiürítése
+        3. await nélkül: export_state -> régi példány le -> új példány -> import_state
+        Visszaad: (siker, idő ms-ban, átadott példányok száma).
+        """
+        old = self.modules.get(name)
+        if old is None:
+            return False, 0.0, 0
+        t0 = time.perf_counter()
+        old_factory = self.factories.get(name)
+        module_name = old.__name__
+        importlib.invalidate_caches()
+        sys.modules.pop(module_name, None)
+        try:
+            module = importlib.import_module(module_name)
+            module.prepare(self)
+        except Exception as e:
+            sys.modules[module_name] = old
+            package, _, attr = module_name.rpartition(".")
+            if package in sys.modules:
+                setattr(sys.modules[package], attr, old)
+            self.factories[name] = old_factory
+            self._mtimes[name] = _mtime(old, fallback=self._mtimes.get(name))
+            log.warning("[⚠️] A(z) %s újratöltése sikertelen, a régi kód fut tovább: %r", name, e)
+            return False, round((time.perf_counter() - t0) * 1000, 2), 0
+        self.modules[name] = module
+        self._mtimes[name] = _mtime(module)
+
+        # a régi példányok még feldolgozzák, ami a postafiókjukban van
+        while True:
+            live = [game for games in self.channels.values()
+                    for game in games.values() if game.name == name]
+            for game in live:
+                await game.actor.ask(lambda: None)
+            if not any(game.actor.depth() for game in live):
+                break
+
+        # innentől nincs await: közben nem érkezhet parancs a régi példányokhoz
+        moved = 0
+        for channel, games in self.channels.items():
+            game = games.get(name)
+            if game is None or game.actor.depth():
+                continue
+            data = game.export_state()
+            self.despawn(channel, name, lazy=False)
+            fresh = self.spawn(channel, name)
+            if fresh is None:
+                continue
+            fresh.last_used = game.last_used
+            if data is not None:
+                fresh.import_state(data)
+                moved += 1
+        ms = round((time.perf_counter() - t0) * 1000, 2)
+        self.load_times[name] = ms
+        log.info("[🔁] %s újratöltve (%s ms, %s példány állapota átadva).", name, ms, moved)
+        if ms > RELOAD_BUDGET_MS:
+            log.warning("[⚠️] A(z) %s újratöltése %s ms volt (keret: %s ms).", name, ms, RELOAD_BUDGET_MS)
+        return True, ms, moved
+
+    def start_module_watch(self, interval: float = MODULE_WATCH_INTERVAL):
+        """Fejlesztői mód: a betöltött modulok fájljának változásakor automatikus reload."""
+        if self._module_watch is None or self._module_watch.done():
+            self._module_watch = asyncio.get_event_loop().create_task(self._watch_modules(interval))
+
+    async def _watch_modules(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            for name, module in list(self.modules.items()):
+                mtime = _mtime(module)
+                if mtime is not None and mtime != self._mtimes.get(name):
+                    await self.reload(name)
+
+    def resolve(self, alias: str):
+        return self._aliases.get((alias or "").lower())
+
+    def start_reaper(self, interval: float = REAPER_INTERVAL):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_event_loop().create_task(self._reap(interval))
+
+    async def _reap(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.reap()
+
+    def reap(self):
+        """Tétlen játékpéldányok, majd a példány nélkül maradt modulok kiürítése."""
+        now = time.monotonic()
+        for channel, games in self.channels.items():
+            for name, game in list(games.items()):
+                if now - game.last_used < self.idle_unload:
+                    continue
+                if game.active or game.actor.depth() or game.actor.timer_deadlines():
+                    continue
+                self.despawn(channel, name)
+        for name in list(self.modules):
+            if not any(name in games for games in self.channels.values()):
+                self.unload(name)
+
+    def register(self, name: str, factory):
+        self.factories[name] = factory
+
+    def _config_changed(self):
+        """Új config pillanatkép: minden élő példány megkapja a saját szekcióját."""
+        for channel, games in self.channels.items():
+            for game in games.values():
+                game.config = self.config.section(game.name, channel)
+
+    # --------- csatornák ---------
+    def join(self, channel: str):
+        channel = channel.lower()
+        if channel in self.channels:
+            return
+        if self.primary_channel is None:
+            self.primary_channel = channel
+        self.channels[channel] = {}
+        for cmd, route in self._runtime_routes.items():
+            self.router.add(channel, cmd, route)
+        for name in self.manifest:
+            self._install_lazy(channel, name)
+
+    def part(self, channel: str):
+        """Csatorna elhagyása: példányok leállítása, minden parancs törlése."""
+        channel = channel.lower()
+        for name in list(self.channels.get(channel, {})):
+            self.despawn(channel, name, lazy=False)
+        for cmd in self._runtime_routes:
+            self.router.remove(channel, cmd)
+        for spec in self.manifest.values():
+            for cmd in spec.get("entry", ()):
+                self.router.remove(channel, cmd)
+        self.channels.pop(channel, None)
+
+    # --------- csatorna átadása másik folyamatnak ---------
+    def snapshot_channel(self, channel: str) -> dict:
+        """A csatorna átadható játékállapotai: {játéknév: export_state()}."""
+        out = {}
+        for name, game in self.games(channel).items():
+            data = game.export_state()
+            if data is not None:
+                out[name] = data
+        return out
+
+    async def release(self, channel: str) -> dict:
+        """Csatorna leadása: a postafiókok kiürítése után pillanatkép, majd part()."""
+        for game in list(self.games(channel).values()):
+            await game.actor.ask(lambda: None)
+        states = self.snapshot_channel(channel)
+        self.store.set_json(game_state_key(channel), states)
+        self._dirty.discard(channel)
+        self.part(channel)
+        if self.journal is not None:
+            self.journal.close(channel)
+        return states
+
+    async def resume(self, channel: str):
+        """Csatorna folytatása: előbb a helyi journalból (újraindítás után), különben a közös
+        állapottárból (pl. egy kiesett node helyett)."""
+        t0 = time.perf_counter()
+        states = self.journal.recover(channel) if self.journal is not None else None
+        source = "journal"
+        if not states:
+            source = "állapottár"
+            try:
+                states = await self.store.get_json(game_state_key(channel))
+            except ConnectionError as e:
+                log.warning("[⚠️] #%s: az állapottár nem elérhető (%s) – tiszta lappal indul.", channel, e)
+                states = None
+        self.adopt(channel, states)
+        if states:
+            ms = round((time.perf_counter() - t0) * 1000, 2)
+            log.info("[♻️] #%s: %s folytatva (%s, %s ms).", channel, ", ".join(states), source, ms)
+
+    # --------- állapottár ---------
+    def mark_dirty(self, channel: str, game=None):
+        """Átmenet után: a csatorna pillanatképe mehet a tárba, a játék állapota a journalba."""
+        self._dirty.add(channel)
+        if game is not None and self.journal is not None:
+            data = game.export_state()
+            if data is not None:
+                self.journal.record(channel, game.name, data)
+
+    def start_state_sync(self, interval: float = STATE_SYNC_INTERVAL):
+        if self._state_sync is None or self._state_sync.done():
+            self._state_sync = asyncio.get_event_loop().create_task(self._sync_state(interval))
+
+    async def _sync_state(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.flush_state()
+
+    def flush_state(self):
+        """A megváltozott csatornák pillanatképének kiírása (a tár kötegelve küldi tovább)."""
+        dirty, self._dirty = self._dirty, set()
+        for channel in dirty:
+            if channel in self.channels:
+                self.store.set_json(game_state_key(channel), self.snapshot_channel(channel))
+
+    def adopt(self, channel: str, states: dict = None):
+        """Csatorna átvétele, a másik folyamat pillanatképéből folytatva a futó játékokat."""
+        self.join(channel)
+        for name, data in (states or {}).items():
+            game = self.spawn(channel, name)
+            if game is None:
+                log.warning("[⚠️] %s: a(z) %s állapota nem tölthető vissza.", channel, name)
+                continue
+            game.import_state(data)
+            game.last_used = time.monotonic()
+
+    def _install_lazy(self, channel: str, name: str):
+        for cmd in self.manifest[name].get("entry", ()):
+            self.router.add(channel, cmd, self._lazy_route)
+
+    def spawn(self, channel: str, name: str):
+        """A játék példánya a csatornán (betölti a modult és létrehozza, ha kell); hibánál None."""
+        game = self.channels[channel].get(name)
+        if game is not None:
+            return game
+        if not self.load(name):
+            return None
+        game = self.factories[name](channel)
+        game.last_used = time.monotonic()
+        self.channels[channel][name] = game
+        game.start()
+        self.sync_routes(game)
+        if self.shadow is not None:
+            self.shadow.attach(game)
+        return game
+
+    def despawn(self, channel: str, name: str, lazy: bool = True):
+        game = self.channels.get(channel, {}).pop(name, None)
+        if game is not None:
+            if self.shadow is not None:
+                self.shadow.detach(game)
+            game.actor.stop()
+            self._unroute(game)
+        if lazy:
+            self._install_lazy(channel, name)
+
+    def games(self, channel: str) -> dict:
+        return self.channels.get(channel, {})
+
+    # --------- útválasztás ---------
+    def sync_routes(self, game):
+        """A játék aktuális parancstáblájának átvezetése a routerbe (csak ha változott).
+
+        Amíg a játék postafiókjában feldolgozatlan parancs vár, a teljes (armed) tábla
+        marad bent: a még el nem bírált !akasztás utáni !tipp se vesszen el.
+        """
+        if game.actor.depth():
+            return
+        self._install(game, game.routes())
+
+    def _install(self, game, new: dict):
+        old = self._routes.get(id(game))
+        if new is old:
+            return
+        if old:
+            for cmd in old:
+                if cmd not in new:
+                    self.router.remove(game.channel, cmd, owner=game)
+        for cmd, route in new.items():
+            if not old or old.get(cmd) is not route:
+                self.router.add(game.channel, cmd, route)
+        self._routes[id(game)] = new
+
+    def _unroute(self, game):
+        old = self._routes.pop(id(game), None)
+        for cmd in old or ():
+            self.router.remove(game.channel, cmd, owner=game)
+
+    def make_context(self, channel: str, user: str, badges: dict, command: str, arg: str, message=None):
+        return CommandContext(channel, user, badges, command, arg, message)
+
+    async def dispatch(self, message):
+        """twitchio üzenet -> route -> játék actor. Nem parancs / ismeretlen parancs: azonnal kilép."""
+        parsed = self.router.parse(message.content or "")
+        if parsed is None:
+            return
+        channel = message.channel.name.lower()
+        route = self.router.lookup(channel, parsed[0])
+        if route is None:
+            self.router.unrouted += 1
+            return
+
+        author = message.author
+        ctx = CommandContext(channel, author.name, getattr(author, "badges", {}) or {},
+                             parsed[0], parsed[1], message)
+        if route.mod_only and not ctx.is_mod:
+            if route.denied:
+                self.outbox.send(channel, route.denied, LOW)
+            return
+        game = route.game
+        t0 = time.perf_counter()
+        if game is None:
+            await route.handler(ctx)
+            COMMAND_SECONDS.observe(time.perf_counter() - t0, (ctx.command,))
+            return
+        game.last_used = time.monotonic()
+        armed = game.armed_routes()
+        if self._routes.get(id(game)) is not armed:
+            self._install(game, armed)
+        game.actor.tell(route.handler, ctx).add_done_callback(
+            lambda _, command=ctx.command: COMMAND_SECONDS.observe(time.perf_counter() - t0, (command,)))
+
+    def collect_metrics(self):
+        """Példányok / futó játékok / postafiók-mélység típusonként (a metrika-mintavevő hívja)."""
+        instances, active, depth = {}, {}, {}
+        for name in self.manifest:
+            instances[(name,)] = active[(name,)] = depth[(name,)] = 0
+        for games in self.channels.values():
+            for name, game in games.items():
+                key = (name,)
+                instances[key] += 1
+                active[key] += 1 if game.active else 0
+                depth[key] += game.actor.depth()
+        GAME_INSTANCES.replace(instances)
+        ACTIVE_GAMES.replace(active)
+        ACTOR_MAILBOX_DEPTH.replace(depth)
+
+    # --------- profilozás ---------
+    async def profile(self, seconds: float = None) -> dict:
+        """Időkorlátos mintavételes profil + foglalás-különbség (!profile, /debug/profile)."""
+        from core.profiler import DEFAULT_SECONDS, Profiler
+        if self.profiler is None:
+            self.profiler = Profiler(self.profile_dir)
+        return await self.profiler.run(seconds or DEFAULT_SECONDS)
+
+    def is_active_player(self, channel: str, user: str) -> bool:
+        for game in self.channels.get(channel, {}).values():
+            if game.is_active_player(user):
+                return True
+        return False
+
+    # --------- runtime-parancsok ---------
+    async def _cmd_lazy_entry(self, ctx):
+        """Még be nem töltött játék belépő parancsa: betöltés, majd a parancs továbbadása."""
+        for name, spec in self.manifest.items():
+            if ctx.command in spec.get("entry", ()):
+                break
+        else:
+            return
+        if self.spawn(ctx.channel, name) is None:
+            return
+        route = self.router.lookup(ctx.channel, ctx.command)
+        if route is not None and route.game is not None:
+            await self.dispatch(ctx.message)
+
+    async def _cmd_indit(self, ctx):
+        """!indit <játék> – játékmodul betöltése igény szerint."""
+        name = self.resolve(ctx.first_arg())
+        if name is None:
+            self.outbox.send(ctx.channel, f"🎮 Elérhető játékok: {', '.join(self.manifest)} — Használat: !indit <játék>")
+            return
+        game = self.spawn(ctx.channel, name)
+        if game is None:
+            self.outbox.send(ctx.channel, f"❌ A(z) {name} játék nem tölthető be.")
+            return
+        game.last_used = time.monotonic()
+        entry = self.manifest[name].get("entry", ())
+        hint = f" Indítás: !{entry[0]}" if entry else ""
+        self.outbox.send(ctx.channel, f"🎮 {name} betöltve.{hint}")
+
+    async def _cmd_stop(self, ctx):
+        """Minden futó játék leállítása a csatornán – csak streamer/mod."""
+        stopped = False
+        for game in self.games(ctx.channel).values():
+            was_active = game.active
+            await game.actor.ask(game.stop)
+            game.actor.cancel_all()
+            stopped = stopped or was_active
+        if not stopped:
+            self.outbox.send(ctx.channel, "ℹ️ Nincs futó játék.", HIGH)
+
+    async def _cmd_reload(self, ctx):
+        """!reload [játék] – játékmodul(ok) újratöltése a futó játékok megtartásával – csak streamer/mod."""
+        arg = ctx.first_arg()
+        names = [self.resolve(arg)] if arg else list(self.modules)
+        if None in names:
+            self.outbox.send(ctx.channel, f"❌ Ismeretlen játék: {arg}", HIGH)
+            return
+        if not names:
+            self.outbox.send(ctx.channel, "ℹ️ Nincs betöltött játékmodul.", HIGH)
+            return
+        parts = []
+        for name in names:
+            if name not in self.modules:
+                parts.append(f"{name}: nincs betöltve (a következő indítás már az új kódot tölti)")
+                continue
+            ok, ms, moved = await self.reload(name)
+            parts.append(f"{name}: {ms} ms, {moved} játék átadva" if ok else f"{name}: hiba, a régi kód fut")
+        self.outbox.send(ctx.channel, "🔁 Újratöltés — " + " | ".join(parts), HIGH)
+
+    async def _cmd_profile(self, ctx):
+        """!profile [mp] – profilozás a háttérben, az eredmény fájlnevei a chatbe – csak streamer/mod."""
+        if (self._profile_task is not None and not self._profile_task.done()) or \
+                (self.profiler is not None and self.profiler.running):
+            self.outbox.send(ctx.channel, "ℹ️ Már fut egy profilozás.", HIGH)
+            return
+        try:
+            seconds = float(ctx.first_arg()) if ctx.first_arg() else None
+        except ValueError:
+            self.outbox.send(ctx.channel, "🔬 Használat: !profile [másodperc]", HIGH)
+            return
+        # a parancs nem várja meg a futást – a bejövő sor addig is halad
+        task = self._profile_task = asyncio.get_event_loop().create_task(self.profile(seconds))
+        task.add_done_callback(lambda t, channel=ctx.channel: self._profile_done(channel, t))
+        self.outbox.send(ctx.channel, "🔬 Profilozás indul...", HIGH)
+
+    def _profile_done(self, channel: str, task):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.outbox.send(channel, f"❌ Profilozási hiba: {task.exception()}", HIGH)
+            return
+        s = task.result()
+        top = ", ".join(f"{frame.split(' ')[0]} {share:.0%}" for frame, share in s["top_frames"][:3])
+        files = s["folded"] + (f", {s['alloc']}" if "alloc" in s else "")
+        self.outbox.send(channel, f"🔬 Profil kész ({s['seconds']:.0f} mp, {s['samples']} minta) — "
+                                  f"loop: {top or '-'} — {files}", HIGH)
+
+    async def _cmd_top(self, ctx):
+        """!top [játék] – a csatorna legtöbb győzelmet szerzett játékosai."""
+        if self.stats is None:
+            return
+        arg = ctx.first_arg()
+        names = [self.resolve(arg)] if arg else list(self.manifest)
+        if None in names:
+            self.outbox.send(ctx.channel, f"🏆 Használat: !top [{'/'.join(self.manifest)}]")
+            return
+        parts = []
+        for name in names:
+            rows = await self.stats.top(ctx.channel, name)
+            if rows:
+                ranking = ", ".join(f"{i}. {user} ({count})" for i, (user, count) in enumerate(rows, 1))
+                parts.append(f"{name}: {ranking}")
+        if not parts:
+            self.outbox.send(ctx.channel, "🏆 Még nincs győztes ezen a csatornán.")
+            return
+        self.outbox.send(ctx.channel, "🏆 Toplista (győzelmek) — " + " | ".join(parts))
+
+    async def _cmd_stats(self, ctx):
+        """!stats [user] – egy játékos összesített statisztikája a csatornán."""
+        if self.stats is None:
+            return
+        user = (ctx.first_arg() or ctx.user).lstrip("@")
+        per_game = await self.stats.user_stats(ctx.channel, user)
+        if not per_game:
+            self.outbox.send(ctx.channel, f"📊 {user}: még nincs statisztika.")
+            return
+        parts = []
+        for name, events in sorted(per_game.items()):
+            counts = ", ".join(f"{events[ev]} {label}" for ev, label in LABELS.items() if ev in events)
+            parts.append(f"{name}: {counts}")
+        self.outbox.send(ctx.channel, f"📊 {user} — " + " | ".join(parts))
+
+
+def _mtime(module, fallback=None):
+    try:
+        return os.stat(module.__file__).st_mtime_ns
+    except (AttributeError, TypeError, OSError):
+        return fallback
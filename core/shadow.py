@@ -0,0 +1,526 @@
+import asyncio
+import importlib.util
+import json
+import logging
+import random
+import sys
+import time
+from collections import deque
+
+from core.actor import After, Cancel, Emit, Overlay, Say, Stat, Track
+from core.config import ConfigService
+from core.log import ROOT, get_logger
+from core.metrics import SHADOW_SECONDS, SHADOW_TRANSITIONS, REGISTRY, Counter, Gauge, Histogram
+from core.router import CommandContext
+from core.state import MemoryStore
+
+log = get_logger("shadow")
+
+# ===============================
+# Shadow (canary) futtatás
+# ===============================
+# Egy játékmodul új változata (a "jelölt") az élő példányokkal párban fut a valódi
+# forgalmon, de semmilyen kimenete nincs: az átmeneteit meghívjuk, az effektjeit csak
+# összevetjük, sosem hajtjuk végre (chat, overlay, tár, statisztika, időzítők).
+#
+#   - az élő actor minden átmenete után a megfigyelő (GameActor.tap) egy bejegyzést tesz
+#     a sorba: handler, argumentumok, az élő effektek és idő, a véletlengenerátor
+#     átmenet előtti állapota és a falióra – ennyi az élő út többletköltsége
+#   - a jelölt átmenetét egy külön task futtatja később, ugyanazzal a véletlen-állapottal
+#     és órával (az élő modul time() olvasásait félretesszük, a jelölt modul `time`-ja
+#     ugyanezeket adja vissza), így az eltérés a kód
+#     eltérése, nem a véletlené; a jelölt saját időzítői nem futnak – az élő időzítőkből
+#     induló átmenetek ugyanúgy tükröződnek, mint a parancsok
+#   - összevetés: az effektek átmenetenként; a teljes állapot (snapshot) és az overlay
+#     tartalma akkor, ha az élő példány azóta nem lépett tovább. Eltérés után a jelölt az
+#     élő állapotából folytatja, így egy eltérés nem gyűrűzik tovább
+#   - a jelölt átmenete az event loopon fut (ugyanazon a véletlen-állapoton és órán, mint
+#     az élő), tehát egy-egy tükrözés idejére az élő utat is feltartja. A garancia ezért:
+#       * a sor korlátos, a task átmenetenként átadja a vezérlést, és LAG_THRESHOLD feletti
+#         loop-késésnél a várakozó tükrözéseket eldobja (a párt később újraszinkronizálja)
+#       * átmenetenkénti időkeret: a BUDGET-nél lassabb jelölt-átmenetekből legfeljebb
+#         STRIKES darab, a HARD_LIMIT-nél lassabból egyetlen egy fut le – utána a jelölt
+#         modult minden csatornán kikapcsoljuk (a riportban az ok és az addigi időmérések)
+#     Egy lassabb jelölt (pl. mélyebb AI) így legfeljebb néhány átmenetnyi késést okoz;
+#     tartósan lassabb változat mérésére a shadow mód nem alkalmas, azt offline kell
+#     (tools/selfplay.py, tools/microbench.py)
+MAX_PENDING = 1000          # ennyi várakozó tükrözés felett eldobunk
+LAG_THRESHOLD = 0.02        # mp – e fölötti loop-késésnél a várakozó tükrözések eldobódnak
+BUDGET = 0.005              # mp – egy jelölt-átmenet ideje e fölött "túllépés"
+STRIKES = 3                 # ennyi túllépés után a jelölt modul kikapcsol
+HARD_LIMIT = 0.02           # mp – ennél lassabb jelölt-átmenet után azonnal kikapcsol
+SAMPLES = 512               # parancsonként ennyi utolsó időmérés a percentilisekhez
+MAX_DIVERGENCES = 50        # ennyi utolsó eltérés marad meg a riporthoz
+LOG_FIRST = 5               # játékonként az első ennyi eltérés naplózódik, utána minden LOG_EVERY-edik
+LOG_EVERY = 100
+REPORT_INTERVAL = 300       # mp – összefoglaló a naplóba
+VOLATILE_FIELDS = ("game_id",)   # véletlenszerű azonosítók: az élő értéke íródik a jelöltbe
+CLOCK_SLACK = 0.001         # mp – más modulok órája ennyivel + az élő handler futásidejével térhet el
+RECORDED_READS = 64         # átmenetenként legfeljebb ennyi élő time() olvasás tükröződik
+_SKIP = object()            # a tükrözött handler nem játéklépés (pl. a runtime postafiók-ürítése)
+
+
+class _Recorder:
+    """Az élő modul `time`-ja helyett: a valódi óra, de a time() értékeit félreteszi.
+
+    Így a jelölt átmenet pontosan azokat az időbélyegeket kapja, amiket az élő handler
+    olvasott (pl. egy kihívás "since" mezője, amit később egyezésre vizsgálnak).
+    """
+
+    def __init__(self):
+        self.reads = deque(maxlen=RECORDED_READS)
+
+    def time(self) -> float:
+        now = time.time()
+        self.reads.append(now)
+        return now
+
+    def take(self, since: float) -> tuple:
+        """Az átmenet alatti olvasások (a korábbiak más hívóktól jöttek)."""
+        reads = tuple(t for t in self.reads if t >= since)
+        self.reads.clear()
+        return reads
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class _Clock:
+    """A jelölt modul `time`-ja helyett: time() sorban az élő handler olvasásait adja vissza
+    (utána a legutolsót, olvasás nélkül az átmenet előtti faliórát), a többi a valódi."""
+
+    def __init__(self):
+        self.now = time.time()
+        self.reads = ()
+        self.pos = 0
+
+    def replay(self, wall: float, reads: tuple):
+        self.now, self.reads, self.pos = wall, reads, 0
+
+    def time(self) -> float:
+        if self.pos < len(self.reads):
+            self.now = self.reads[self.pos]
+            self.pos += 1
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class _ShadowRuntime:
+    """Amit a jelölt modul runtime-ként lát: a router és a config tükre, minden kimenet vak."""
+
+    outbox = host = stats = events = journal = None
+
+    def __init__(self, live, config: ConfigService):
+        self.live = live
+        self.config = config
+        self.router = live.router
+        self.store = MemoryStore()
+        self.factories = {}
+
+    @property
+    def primary_channel(self):
+        return self.live.primary_channel
+
+    def register(self, name: str, factory):
+        self.factories[name] = factory
+
+    def make_context(self, *args, **kwargs):
+        return self.live.make_context(*args, **kwargs)
+
+    def sync_routes(self, game):
+        pass
+
+    def mark_dirty(self, channel: str, game=None):
+        pass
+
+
+class _Pair:
+    __slots__ = ("live", "shadow", "recorder", "pending", "dirty", "closed")
+
+    def __init__(self, live, shadow, recorder=None):
+        self.live = live
+        self.shadow = shadow
+        self.recorder = recorder    # az élő modul time() olvasásai (_Recorder) vagy None
+        self.pending = 0        # a sorban várakozó tükrözései
+        self.dirty = False      # kimaradt átmenet: összevetés helyett újraszinkronizálás
+        self.closed = False
+
+
+class _GameStats:
+    def __init__(self, module: str):
+        self.module = module
+        self.counts = dict.fromkeys(("mirrored", "compared", "diverged", "errors", "shed", "resyncs",
+                                     "over_budget"), 0)
+        self.disabled = None    # ha a jelölt kikapcsolt: az ok
+        self.timings = {}       # parancs / időzítő -> deque[(élő mp, jelölt mp)]
+        self.tap_seconds = 0.0  # a megfigyelő saját ideje az élő úton (összesen)
+        self.taps = 0
+
+    def record(self, label: str, live: float, shadow: float):
+        samples = self.timings.get(label)
+        if samples is None:
+            samples = self.timings[label] = deque(maxlen=SAMPLES)
+        samples.append((live, shadow))
+
+
+def _pct(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def _timing(samples) -> dict:
+    live = sorted(s[0] for s in samples)
+    shadow = sorted(s[1] for s in samples)
+    live50, shadow50 = _pct(live, 0.5), _pct(shadow, 0.5)
+    return {"n": len(live),
+            "live_us": {"p50": round(live50 * 1e6, 1), "p95": round(_pct(live, 0.95) * 1e6, 1)},
+            "shadow_us": {"p50": round(shadow50 * 1e6, 1), "p95": round(_pct(shadow, 0.95) * 1e6, 1)},
+            "delta": round(shadow50 / live50 - 1.0, 3) if live50 else None}
+
+
+def _short(value, limit: int = 300) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=repr)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _same(a, b, slack: float) -> bool:
+    """Egyezés, a lebegőpontos értékek (időbélyegek) `slack` eltérésével.
+
+    A játékmodul time() olvasásai pontosan tükröződnek, de a többi modulé (pl. a közös
+    BaseGame-é) nem – azok legfeljebb az élő handler futásidejével térhetnek el.
+    """
+    if isinstance(a, float) and isinstance(b, (int, float)) or isinstance(b, float) and isinstance(a, int):
+        return abs(a - b) <= slack
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k], slack) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y, slack) for x, y in zip(a, b))
+    return a == b
+
+
+def _signature(effects, full: bool) -> list:
+    """Összevethető effektlista; az overlay tartalma csak `full` esetén (később változhat)."""
+    if effects is None:
+        return [("hiba",)]
+    out = []
+    for eff in effects:
+        if isinstance(eff, Say):
+            out.append(("say", eff.text, eff.priority))
+        elif isinstance(eff, Overlay):
+            out.append(("overlay", eff.payload if full else None))
+        elif isinstance(eff, Emit):
+            out.append(("emit", eff.event))
+        elif isinstance(eff, Stat):
+            out.append(("stat", eff.user, eff.event, eff.detail))
+        elif isinstance(eff, Track):
+            out.append(("track", eff.event))
+        elif isinstance(eff, After):
+            out.append(("after", getattr(eff.handler, "__name__", None), eff.key))
+        elif isinstance(eff, Cancel):
+            out.append(("cancel", eff.key))
+        else:
+            out.append((type(eff).__name__,))
+    return out
+
+
+def _copy(state):
+    return json.loads(json.dumps(state, ensure_ascii=False))
+
+
+def _load_candidate(path: str):
+    """A jelölt modul betöltése külön modulobjektumként (az élő változat mellé, nem helyette)."""
+    spec = importlib.util.find_spec(path)
+    if spec is None or not spec.origin:
+        raise ImportError(f"nem található: {path}")
+    shadow_spec = importlib.util.spec_from_file_location(f"{path}__shadow", spec.origin)
+    module = importlib.util.module_from_spec(shadow_spec)
+    shadow_spec.loader.exec_module(module)
+    return module
+
+
+def _shadow_logger(logger: logging.Logger) -> logging.Logger:
+    return get_logger("shadow." + logger.name.removeprefix(ROOT + "."))
+
+
+def _isolate(module, clock: _Clock):
+    """A jelölt modul órája a tükrözött idő; a metrikái és a naplója nem keveredik az élőkkel."""
+    if getattr(module, "time", None) is time:
+        module.time = clock
+    for attr, value in list(vars(module).items()):
+        if isinstance(value, Histogram):
+            setattr(module, attr, Histogram(value.name, value.help, value.labelnames, value.buckets))
+        elif isinstance(value, Gauge):
+            setattr(module, attr, Gauge(value.name, value.help, value.labelnames, value.kind))
+        elif isinstance(value, Counter):
+            setattr(module, attr, Counter(value.name, value.help, value.labelnames))
+        elif isinstance(value, logging.Logger):
+            setattr(module, attr, _shadow_logger(value))
+
+
+class ShadowRunner:
+    """Jelölt játékmodulok párhuzamos, mellékhatás nélküli futtatása az élők mellett.
+
+    `candidates`: játéknév -> a jelölt modul (pl. {"amoeba": "games.amoeba.bot_next"}).
+    A runtime a példányok létrehozásakor / megszüntetésekor hívja az `attach` / `detach`
+    párost; a `report()` az eltéréseket és az élő / jelölt átmenetidőket adja.
+    """
+
+    def __init__(self, runtime, candidates: dict, monitor=None, max_pending: int = MAX_PENDING,
+                 lag_threshold: float = LAG_THRESHOLD, budget: float = BUDGET, strikes: int = STRIKES,
+                 hard_limit: float = HARD_LIMIT):
+        self.runtime = runtime
+        self.candidates = dict(candidates)
+        self.monitor = monitor      # core.inbound.LoopLagMonitor vagy None
+        self.max_pending = max_pending
+        self.lag_threshold = lag_threshold
+        self.budget = budget
+        self.strikes = strikes
+        self.hard_limit = hard_limit
+        self.config = ConfigService()
+        self.config.mirror(runtime.config)
+        self.facade = _ShadowRuntime(runtime, self.config)
+        self.clock = _Clock()
+        self.modules = {}           # játéknév -> betöltött jelölt modul
+        self.pairs = {}             # id(élő példány) -> _Pair
+        self.queue = deque()
+        self.stats = {name: _GameStats(path) for name, path in self.candidates.items()}
+        self.divergences = deque(maxlen=MAX_DIVERGENCES)
+        self._wake = None
+        self._task = None
+        self._report_task = None
+
+    def start(self):
+        loop = asyncio.get_event_loop()
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        if self._report_task is None or self._report_task.done():
+            self._report_task = loop.create_task(self._report_loop())
+        REGISTRY.add_collector(self.collect_metrics)
+        log.info("[🐤] Shadow mód: %s", ", ".join(f"{name} <- {path}" for name, path in self.candidates.items()))
+
+    # --------- párok ---------
+    def _factory(self, name: str):
+        if name not in self.modules:
+            path = self.candidates[name]
+            try:
+                module = _load_candidate(path)
+                _isolate(module, self.clock)
+                module.prepare(self.facade)
+            except Exception as e:
+                log.exception("[⚠️] A(z) %s shadow modul (%s) nem tölthető be – kikapcsolva: %s", name, path, e)
+                self.candidates.pop(name, None)
+                return None
+            self.modules[name] = module
+            log.info("[🐤] %s shadow modul betöltve (%s).", name, path)
+        return self.facade.factories.get(name)
+
+    def attach(self, game):
+        """Élő példány párosítása egy friss jelölt példánnyal (az élő állapotából indul)."""
+        if game.name not in self.candidates or id(game) in self.pairs:
+            return
+        factory = self._factory(game.name)
+        if factory is None:
+            return
+        try:
+            shadow = factory(game.channel)
+        except Exception as e:
+            log.warning("[⚠️] #%s: a(z) %s shadow példány nem jött létre: %s", game.channel, game.name, e)
+            return
+        shadow.log.logger = _shadow_logger(shadow.log.logger)
+        module = sys.modules.get(type(game).__module__)
+        recorder = getattr(module, "time", None)
+        if recorder is time:
+            recorder = module.time = _Recorder()
+        pair = self.pairs[id(game)] = _Pair(game, shadow, recorder if isinstance(recorder, _Recorder) else None)
+        self._resync(pair, count=False)
+        game.actor.tap = lambda *event: self._tap(pair, *event)
+
+    def detach(self, game):
+        pair = self.pairs.pop(id(game), None)
+        if pair is not None:
+            pair.closed = True
+            game.actor.tap = None
+
+    def _resync(self, pair: _Pair, count: bool = True):
+        """A jelölt az élő példány mostani állapotából folytatja."""
+        state = pair.live.snapshot()
+        if state is not None:
+            pair.shadow.restore(_copy(state))
+        for field in VOLATILE_FIELDS:
+            if hasattr(pair.live, field):
+                setattr(pair.shadow, field, getattr(pair.live, field))
+        pair.dirty = False
+        if count:
+            self.stats[pair.live.name].counts["resyncs"] += 1
+
+    # --------- élő út ---------
+    def _tap(self, pair: _Pair, handler, args, effects, elapsed, rng, wall):
+        t0 = time.perf_counter()
+        stats = self.stats[pair.live.name]
+        if len(self.queue) >= self.max_pending:
+            stats.counts["shed"] += 1
+            pair.dirty = True
+        else:
+            live = pair.live
+            volatile = {f: getattr(live, f) for f in VOLATILE_FIELDS if hasattr(live, f)}
+            reads = pair.recorder.take(wall) if pair.recorder is not None else ()
+            self.queue.append((pair, handler, args, effects, elapsed, rng, wall, reads, volatile))
+            pair.pending += 1
+            if self._wake is not None:
+                self._wake.set()
+        stats.taps += 1
+        stats.tap_seconds += time.perf_counter() - t0
+
+    # --------- tükrözés ---------
+    async def _run(self):
+        queue = self.queue
+        while True:
+            if not queue:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            if self.monitor is not None and self.monitor.lag > self.lag_threshold:
+                self._shed()
+                await asyncio.sleep(self.monitor.interval)
+                continue
+            try:
+                self._replay(*queue.popleft())
+            except Exception as e:
+                log.exception("[⚠️] Shadow tükrözési hiba: %s", e)
+            await asyncio.sleep(0)
+
+    def _shed(self):
+        while self.queue:
+            pair = self.queue.popleft()[0]
+            pair.pending -= 1
+            pair.dirty = True
+            self.stats[pair.live.name].counts["shed"] += 1
+
+    def _counterpart(self, pair: _Pair, handler, args):
+        """A jelölt handlere ugyanarra az üzenetre; None: a jelölt nem fogadja el."""
+        if args and isinstance(args[0], CommandContext):
+            route = pair.shadow.armed_routes().get(args[0].command)
+            return route.handler if route is not None else None
+        if getattr(handler, "__self__", None) is pair.live:
+            return getattr(pair.shadow, handler.__name__, None)
+        return _SKIP
+
+    def _replay(self, pair: _Pair, handler, args, effects, elapsed, rng, wall, reads, volatile):
+        pair.pending -= 1
+        if pair.closed:
+            return
+        live = pair.live
+        settled = pair.pending == 0 and not live.actor.depth()
+        if pair.dirty:
+            # kimaradt átmenet után csak akkor folytatható, ha az élő azóta nem lépett
+            if settled:
+                self._resync(pair)
+            return
+        shadow_handler = self._counterpart(pair, handler, args)
+        if shadow_handler is _SKIP:
+            return
+        stats = self.stats[live.name]
+        stats.counts["mirrored"] += 1
+        label = args[0].command if args and isinstance(args[0], CommandContext) else handler.__name__
+
+        saved = random.getstate()
+        random.setstate(rng)
+        self.clock.replay(wall, reads)
+        t0 = time.perf_counter()
+        try:
+            shadow_effects = () if shadow_handler is None else (shadow_handler(*args) or ())
+        except Exception as e:
+            shadow_effects = None
+            stats.counts["errors"] += 1
+            log.debug("Shadow %s: hiba a(z) %s átmenetben: %r", live.name, label, e)
+        shadow_elapsed = time.perf_counter() - t0
+        random.setstate(saved)
+        for field, value in volatile.items():
+            setattr(pair.shadow, field, value)
+
+        stats.record(label, elapsed, shadow_elapsed)
+        SHADOW_SECONDS.observe(elapsed, (live.name, "live"))
+        SHADOW_SECONDS.observe(shadow_elapsed, (live.name, "shadow"))
+        if shadow_elapsed > self.budget:
+            stats.counts["over_budget"] += 1
+            if shadow_elapsed > self.hard_limit or stats.counts["over_budget"] >= self.strikes:
+                self._disable(live.name, f"{label}: {shadow_elapsed * 1000:.1f} ms "
+                                         f"({stats.counts['over_budget']}. túllépés, keret {self.budget * 1000:g} ms)")
+                return
+
+        slack = elapsed + CLOCK_SLACK
+        live_sig = _signature(effects, settled)
+        shadow_sig = _signature(shadow_effects, settled)
+        if not _same(live_sig, shadow_sig, slack):
+            self._diverged(pair, label, "effects", live_sig, shadow_sig)
+        elif settled:
+            live_state, shadow_state = live.snapshot() or {}, pair.shadow.snapshot() or {}
+            if not _same(live_state, shadow_state, slack):
+                keys = sorted(k for k in set(live_state) | set(shadow_state)
+                              if not _same(live_state.get(k), shadow_state.get(k), slack))
+                self._diverged(pair, label, "state", {k: live_state.get(k) for k in keys},
+                               {k: shadow_state.get(k) for k in keys})
+            else:
+                stats.counts["compared"] += 1
+        else:
+            stats.counts["compared"] += 1
+
+    def _disable(self, name: str, reason: str):
+        """A jelölt modul kikapcsolása minden csatornán (túl lassú ahhoz, hogy a loopon fusson)."""
+        self.candidates.pop(name, None)
+        self.stats[name].disabled = reason
+        for pair in list(self.pairs.values()):
+            if pair.live.name == name:
+                self.detach(pair.live)
+        log.warning("[🐤] A(z) %s shadow modul kikapcsolva – túllépte az időkeretet: %s", name, reason)
+
+    def _diverged(self, pair: _Pair, label: str, kind: str, live, shadow):
+        game = pair.live
+        stats = self.stats[game.name]
+        stats.counts["diverged"] += 1
+        self.divergences.append({"t": round(time.time(), 3), "channel": game.channel, "game": game.name,
+                                 "command": label, "kind": kind, "live": _short(live), "shadow": _short(shadow)})
+        n = stats.counts["diverged"]
+        if n <= LOG_FIRST or n % LOG_EVERY == 0:
+            log.warning("[🐤] Shadow eltérés (#%s): #%s %s %s (%s) – élő: %s | jelölt: %s", n, game.channel,
+                        game.name, label, kind, _short(live, 200), _short(shadow, 200))
+        # a jelölt az élő állapotából folytatja (ha az élő azóta lépett, a következő nyugalmi pontban)
+        if pair.pending == 0 and not game.actor.depth():
+            self._resync(pair)
+        else:
+            pair.dirty = True
+
+    # --------- riport ---------
+    def report(self) -> dict:
+        games = {}
+        for name, stats in self.stats.items():
+            commands = {label: _timing(samples) for label, samples in sorted(stats.timings.items()) if samples}
+            every = [s for samples in stats.timings.values() for s in samples]
+            games[name] = {
+                "module": stats.module,
+                "disabled": stats.disabled,
+                **stats.counts,
+                "pending": sum(p.pending for p in self.pairs.values() if p.live.name == name),
+                "tap_us": round(stats.tap_seconds / stats.taps * 1e6, 2) if stats.taps else 0,
+                "overall": _timing(every) if every else {},
+                "commands": commands,
+            }
+        return {"games": games, "divergences": list(self.divergences)}
+
+    async def _report_loop(self, interval: float = REPORT_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            for name, r in self.report()["games"].items():
+                overall = r["overall"]
+                if not overall:
+                    continue
+                log.info("[🐤] Shadow %s: %s tükrözve, %s eltérés, %s eldobva – élő p50 %s µs, jelölt p50 %s µs "
+                         "(%+.0f%%)", name, r["mirrored"], r["diverged"], r["shed"], overall["live_us"]["p50"],
+                         overall["shadow_us"]["p50"], (overall["delta"] or 0) * 100)
+
+    def collect_metrics(self):
+        SHADOW_TRANSITIONS.replace({(name, result): count for name, stats in self.stats.items()
+                                    for result, count in stats.counts.items()})
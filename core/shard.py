@@ -0,0 +1,187 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+
+from core.log import get_logger, shutdown as shutdown_log
+
+log = get_logger("shard")
+
+# ===============================
+# Shardolás: csatornák szétosztása worker folyamatok között
+# ===============================
+DEFAULT_VNODES = 160          # virtuális pontok shardonként a gyűrűn
+CHECKPOINT_INTERVAL = 5.0     # ennyi mp-enként küldi a worker a futó játékok állapotát
+LINE_LIMIT = 4 * 1024 * 1024  # egy vezérlőüzenet max. mérete (bájt)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Konzisztens hash-gyűrű: egy shard ki/belépésekor csak az ő csatornái mozdulnak."""
+
+    def __init__(self, nodes=(), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self.nodes = set()
+        self._keys = []     # rendezett hash-pontok
+        self._owners = []   # pont -> shard
+
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.vnodes):
+            h = _hash(f"shard-{node}#{i}")
+            idx = bisect.bisect(self._keys, h)
+            self._keys.insert(idx, h)
+            self._owners.insert(idx, node)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(k, o) for k, o in zip(self._keys, self._owners) if o != node]
+        self._keys = [k for k, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def node_for(self, key: str):
+        if not self._keys:
+            return None
+        idx = bisect.bisect(self._keys, _hash(key.lower())) % len(self._keys)
+        return self._owners[idx]
+
+    def assign(self, keys) -> dict:
+        return {key: self.node_for(key) for key in keys}
+
+
+# ===============================
+# Vezérlőcsatorna (soronként egy JSON üzenet, localhost TCP)
+# ===============================
+def encode(msg: dict) -> bytes:
+    return json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def read_messages(reader):
+    """A kapcsolat üzenetei sorban; a kapcsolat bontásakor véget ér."""
+    while True:
+        try:
+            line = await reader.readline()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            return
+        if not line:
+            return
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            log.warning("[⚠️] Hibás vezérlőüzenet – kihagyva.")
+
+
+class ShardClient:
+    """Worker oldali kapcsolat a supervisorhoz.
+
+    A worker `bot.host`-ja: az overlay eseményeket nem maga szórja, hanem a
+    supervisor front szerverének küldi tovább. A supervisortól kapott join/release
+    parancsokkal veszi át és adja le a csatornákat (a futó játékok állapotával együtt),
+    és rendszeresen checkpointot küld, hogy egy összeomlás után is folytatható legyen.
+
+    A join/release parancsok saját taskban futnak, csatornánként sorban: a vezérlőolvasó
+    sosem vár a Twitchre vagy egy csatorna kimenő sorának kiürülésére, így egy lassú
+    csatorna nem tartja fel a többi átadását.
+    """
+
+    def __init__(self, address: str, shard_id: int, bot):
+        host, _, port = address.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port))
+        self.shard_id = shard_id
+        self.bot = bot
+        self._writer = None
+        self._twitch_ready = asyncio.Event()
+        self._last_checkpoint = {}   # csatorna -> utoljára küldött állapot (JSON szöveg)
+        self._channel_tasks = {}     # csatorna -> a legutóbb ütemezett join/release task
+
+    async def start(self):
+        reader, self._writer = await asyncio.open_connection(*self.address, limit=LINE_LIMIT)
+        self._post({"type": "hello", "shard": self.shard_id, "pid": os.getpid()})
+        loop = asyncio.get_event_loop()
+        loop.create_task(self._read(reader))
+        loop.create_task(self._checkpoints())
+        log.info("[🧩] Shard #%s csatlakozott a supervisorhoz (%s:%s).", self.shard_id, *self.address[:2])
+
+    def twitch_ready(self):
+        """event_ready-ből hívjuk: innentől lehet csatornákra csatlakozni."""
+        self._twitch_ready.set()
+
+    def ws_broadcast(self, payload: dict):
+        """Overlay esemény továbbítása a front szerverre (a HostAPI-val azonos felület)."""
+        self._post({"type": "overlay", "payload": payload})
+
+    def _post(self, msg: dict):
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.write(encode(msg))
+
+    async def _read(self, reader):
+        async for msg in read_messages(reader):
+            kind = msg.get("type")
+            if kind == "join":
+                self._schedule(msg["channel"], self._join, msg.get("state"))
+            elif kind == "release":
+                self._schedule(msg["channel"], self._release)
+        # a supervisor eltűnt: árva workerként nem futunk tovább
+        log.error("[🛑] Shard #%s: megszakadt a kapcsolat a supervisorral – kilépés.", self.shard_id)
+        shutdown_log()
+        os._exit(1)
+
+    def _schedule(self, channel: str, step, *args):
+        """Vezérlőlépés saját taskban; ugyanannak a csatornának a lépései sorban futnak."""
+        prev = self._channel_tasks.get(channel)
+        task = asyncio.get_event_loop().create_task(self._serialized(prev, step, channel, *args))
+        self._channel_tasks[channel] = task
+        task.add_done_callback(lambda t: self._channel_tasks.pop(channel, None)
+                               if self._channel_tasks.get(channel) is t else None)
+
+    async def _serialized(self, prev, step, channel: str, *args):
+        if prev is not None:
+            await asyncio.wait([prev])      # az előző lépés hibája itt nem számít
+        try:
+            await step(channel, *args)
+        except Exception:
+            log.exception("[⚠️] #%s: vezérlőlépés (%s) sikertelen", channel, step.__name__)
+
+    async def _join(self, channel: str, state: dict = None):
+        if state is None:
+            # nincs friss átadott állapot: a közös állapottárból folytatjuk (ha van benne)
+            await self.bot.runtime.resume(channel)
+        else:
+            self.bot.runtime.adopt(channel, state)
+        if state:
+            log.info("[🧩] #%s átvéve folyamatban lévő játékkal: %s", channel, ", ".join(state))
+        await self._twitch_ready.wait()
+        await self.bot.join_channels([channel])
+
+    async def _release(self, channel: str):
+        state = await self.bot.runtime.release(channel)
+        self._last_checkpoint.pop(channel, None)
+        # a leadó oldalon maradt üzenetek még kimennek, mielőtt elhagyjuk a csatornát
+        await self.bot.outbox.release(channel)
+        try:
+            await self.bot.part_channels([channel])
+        except Exception as e:
+            log.warning("[⚠️] #%s elhagyása sikertelen: %s", channel, e)
+        self._post({"type": "released", "channel": channel, "state": state})
+
+    async def _checkpoints(self):
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            for channel in list(self.bot.runtime.channels):
+                state = self.bot.runtime.snapshot_channel(channel)
+                text = json.dumps(state, ensure_ascii=False, sort_keys=True)
+                if self._last_checkpoint.get(channel) == text:
+                    continue
+                self._last_checkpoint[channel] = text
+                self._post({"type": "checkpoint", "channel": channel, "state": state})
@@ -0,0 +1,452 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from urllib.parse import urlparse
+
+from core.log import get_logger
+
+log = get_logger("state")
+
+# ===============================
+# Közös állapottár
+# ===============================
+# Játék-pillanatképek (benne a cooldownok), overlay állapot és overlay események
+# egy cserélhető háttértárban. A memória-backend egy folyamaton belül dolgozik;
+# a RESP (Redis-protokoll) backenddel több gép is ugyanazt az állapotot látja:
+# egy második node kiszolgálhatja az overlayeket vagy átveheti a csatornát.
+DEFAULT_BATCH_INTERVAL = 0.05   # ennyi ideig gyűjtjük az írásokat egy pipeline-ba (mp)
+RECONNECT_MAX = 10.0
+CONNECT_TIMEOUT = 5.0           # csatlakozás + AUTH/SELECT ennyi mp-en belül
+
+
+def game_state_key(channel: str) -> str:
+    return f"state:{channel}"
+
+
+def overlay_key(channel: str, game: str) -> str:
+    return f"overlay:{channel}:{game}"
+
+
+OVERLAY_TOPIC = "overlay"
+
+
+class StateStore(ABC):
+    """Kulcs-érték tár (szöveges értékekkel) + pub/sub.
+
+    Az írások (`set`, `delete`, `publish`) nem blokkolnak: a backend kötegelve küldi
+    ki őket; `flush()` megvárja, hogy minden addigi írás célba érjen.
+    """
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def get(self, key: str):
+        """Érték vagy None."""
+
+    @abstractmethod
+    async def mget(self, keys) -> list:
+        """Értékek a kulcsok sorrendjében (hiányzónál None)."""
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """Írás sorba állítása; ugyanarra a kulcsra a köteg utolsó értéke nyer."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    async def flush(self):
+        pass
+
+    @abstractmethod
+    def publish(self, topic: str, message: str):
+        pass
+
+    @abstractmethod
+    async def subscribe(self, topic: str, callback):
+        """`callback(message)` minden `topic`-ra küldött üzenetre (más node-okéra is)."""
+
+    def stats(self) -> dict:
+        return {}
+
+    # --------- JSON segédek ---------
+    async def get_json(self, key: str):
+        raw = await self.get(key)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+
+    def set_json(self, key: str, value):
+        self.set(key, json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+# ===============================
+# Memória backend
+# ===============================
+class MemoryStore(StateStore):
+    """Egy folyamaton belüli tár – az alapértelmezés, külső szolgáltatás nélkül."""
+
+    def __init__(self):
+        self._data = {}
+        self._subscribers = {}   # topic -> [callback]
+        self.writes = 0
+
+    async def get(self, key: str):
+        return self._data.get(key)
+
+    async def mget(self, keys) -> list:
+        return [self._data.get(k) for k in keys]
+
+    def set(self, key: str, value: str):
+        self._data[key] = value
+        self.writes += 1
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def flush(self):
+        pass
+
+    def publish(self, topic: str, message: str):
+        for callback in self._subscribers.get(topic, ()):
+            try:
+                callback(message)
+            except Exception as e:
+                log.warning("[⚠️] Feliratkozó hiba (%s): %s", topic, e)
+
+    async def subscribe(self, topic: str, callback):
+        self._subscribers.setdefault(topic, []).append(callback)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._data), "writes": self.writes}
+
+
+# ===============================
+# RESP (Redis-protokoll) backend
+# ===============================
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+async def read_reply(reader):
+    """Egy RESP2 válasz beolvasása (bulk stringek str-ként, hibák RespError példányként)."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("a kapcsolat lezárult")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        return RespError(body.decode("utf-8"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2].decode("utf-8")
+    if kind == b"*":
+        size = int(body)
+        if size < 0:
+            return None
+        return [await read_reply(reader) for _ in range(size)]
+    raise RespError(f"ismeretlen RESP típus: {line!r}")
+
+
+class RespStore(StateStore):
+    """Redis-protokollú tár, pipeline-olt és kötegelt írásokkal.
+
+    - minden parancs egy közös pufferbe kerül, és tickenként egyetlen write() megy ki;
+      a válaszokat egy olvasó task FIFO sorrendben párosítja a várakozó future-ökhöz
+    - a `set()` hívások `batch_interval` ideig gyűlnek, kulcsonként csak az utolsó
+      érték megy ki (egy pillanatkép másodpercenként többször is változhat)
+    - a pub/sub külön kapcsolaton fut (SUBSCRIBE módban a kapcsolat mást nem fogad)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: str = None, batch_interval: float = DEFAULT_BATCH_INTERVAL):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.batch_interval = batch_interval
+
+        self._reader = None
+        self._writer = None
+        self._waiters = deque()     # válaszra váró future-ök, küldési sorrendben
+        self._buffer = []           # még ki nem írt parancsok
+        self._flush_scheduled = False
+        self._pending_sets = {}     # kulcs -> érték (None = törlés)
+        self._batch_handle = None
+        self._read_task = None
+        self._subscriptions = {}    # topic -> [callback]
+        self._sub_task = None
+        self._sub_writer = None
+        self._closing = False
+        self._reconnecting = False
+
+        self.commands = 0
+        self.round_trips = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        u = urlparse(url)
+        db = int(u.path.lstrip("/") or 0)
+        return cls(u.hostname or "127.0.0.1", u.port or 6379, db, u.password, **kwargs)
+
+    # --------- kapcsolat ---------
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._read_task = asyncio.get_event_loop().create_task(self._read_loop())
+        if self.password:
+            await self._command("AUTH", self.password)
+        if self.db:
+            await self._command("SELECT", self.db)
+        log.info("[🗄️] Állapottár: redis://%s:%s/%s", self.host, self.port, self.db)
+
+    async def close(self):
+        self._closing = True
+        await self.flush()
+        for task in (self._read_task, self._sub_task):
+            if task is not None:
+                task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                reply = await read_reply(self._reader)
+                if not self._waiters:
+                    continue
+                fut = self._waiters.popleft()
+                if fut.done():
+                    continue
+                if isinstance(reply, RespError):
+                    fut.set_exception(reply)
+                else:
+                    fut.set_result(reply)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self._fail_waiters(e)
+            if not self._closing and not self._reconnecting:
+                asyncio.get_event_loop().create_task(self._reconnect())
+
+    def _fail_waiters(self, exc):
+        waiters, self._waiters = self._waiters, deque()
+        self._buffer.clear()   # ezek válasza már nem érkezhet meg – ne csússzon el a párosítás
+        for fut in waiters:
+            if not fut.done():
+                fut.set_exception(ConnectionError(str(exc)))
+                fut.exception()   # ne legyen "never retrieved" figyelmeztetés
+
+    async def _reconnect(self):
+        delay = 0.5
+        self._writer = None
+        self._reconnecting = True
+        try:
+            while not self._closing:
+                log.warning("[⚠️] Állapottár kapcsolat megszakadt – újracsatlakozás %.1f mp múlva.", delay)
+                await asyncio.sleep(delay)
+                try:
+                    await asyncio.wait_for(self.connect(), CONNECT_TIMEOUT)
+                    self._schedule_flush()
+                    return
+                except (OSError, RespError, asyncio.TimeoutError) as e:
+                    # pl. rossz jelszó vagy még töltő Redis (LOADING): a félkész kapcsolatot
+                    # eldobjuk, és tovább próbálkozunk
+                    log.warning("[⚠️] Állapottár újracsatlakozás sikertelen: %s", e)
+                    self._drop_connection()
+                    delay = min(delay * 2, RECONNECT_MAX)
+        finally:
+            self._reconnecting = False
+
+    def _drop_connection(self):
+        if self._read_task is not None:
+            self._read_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self._fail_waiters(ConnectionError("újracsatlakozás"))
+
+    # --------- pipeline ---------
+    def _command(self, *args) -> asyncio.Future:
+        fut = asyncio.get_event_loop().create_future()
+        if self._writer is None or self._writer.is_closing():
+            fut.set_exception(ConnectionError("nincs kapcsolat az állapottárral"))
+            return fut
+        self._buffer.append(encode_command(*args))
+        self._waiters.append(fut)
+        self.commands += 1
+        self._schedule_flush()
+        return fut
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_event_loop().call_soon(self._write_buffer)
+
+    def _write_buffer(self):
+        self._flush_scheduled = False
+        if not self._buffer or self._writer is None or self._writer.is_closing():
+            return
+        self._writer.write(b"".join(self._buffer))
+        self._buffer.clear()
+        self.round_trips += 1
+
+    def _fire(self, *args):
+        """Parancs, aminek az eredménye nem érdekes (a hibát csak naplózzuk)."""
+        fut = self._command(*args)
+        fut.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(fut):
+        if not fut.cancelled() and fut.exception() is not None:
+            exc = fut.exception()
+            if not isinstance(exc, ConnectionError):
+                log.warning("[⚠️] Állapottár hiba: %s", exc)
+
+    # --------- kulcs-érték ---------
+    async def get(self, key: str):
+        if key in self._pending_sets:
+            return self._pending_sets[key]
+        return await self._command("GET", key)
+
+    async def mget(self, keys) -> list:
+        keys = list(keys)
+        if not keys:
+            return []
+        values = await self._command("MGET", *keys)
+        return [self._pending_sets.get(k, v) if k in self._pending_sets else v
+                for k, v in zip(keys, values)]
+
+    def set(self, key: str, value: str):
+        if key in self._pending_sets:
+            self.coalesced += 1
+        self._pending_sets[key] = value
+        self._schedule_batch()
+
+    def delete(self, key: str):
+        self._pending_sets[key] = None
+        self._schedule_batch()
+
+    def _schedule_batch(self):
+        if self._batch_handle is None:
+            self._batch_handle = asyncio.get_event_loop().call_later(self.batch_interval, self._send_batch)
+
+    def _send_batch(self):
+        self._batch_handle = None
+        if self._writer is None or self._writer.is_closing():
+            # kapcsolat nélkül a köteg megmarad, újracsatlakozás után megy ki
+            self._schedule_batch_later()
+            return
+        batch, self._pending_sets = self._pending_sets, {}
+        upserts = {}
+        for key, value in batch.items():
+            if value is None:
+                self._fire_batch({key: None}, "DEL", key)
+            else:
+                upserts[key] = value
+        if upserts:
+            self._fire_batch(upserts, "MSET", *(x for item in upserts.items() for x in item))
+
+    def _fire_batch(self, batch: dict, *args):
+        """Köteg-írás; ha a kapcsolat a válasz előtt megszakad, a köteg visszakerül a
+        függő írások közé (az azóta jött újabb értékek nyernek), és az újracsatlakozás
+        után kimegy – különben egy tétlen játék utolsó pillanatképe sosem érne a tárba."""
+        fut = self._command(*args)
+
+        def done(f):
+            if f.cancelled() or f.exception() is None:
+                return
+            if not isinstance(f.exception(), ConnectionError):
+                self._log_failure(f)
+                return
+            for key, value in batch.items():
+                self._pending_sets.setdefault(key, value)
+            if not self._closing:
+                self._schedule_batch()
+        fut.add_done_callback(done)
+
+    def _schedule_batch_later(self):
+        self._batch_handle = asyncio.get_event_loop().call_later(RECONNECT_MAX / 10, self._send_batch)
+
+    async def flush(self):
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+            self._send_batch()
+        if self._waiters:
+            await asyncio.gather(*list(self._waiters), return_exceptions=True)
+
+    # --------- pub/sub ---------
+    def publish(self, topic: str, message: str):
+        self._fire("PUBLISH", topic, message)
+
+    async def subscribe(self, topic: str, callback):
+        first = topic not in self._subscriptions
+        self._subscriptions.setdefault(topic, []).append(callback)
+        if self._sub_task is None:
+            self._sub_task = asyncio.get_event_loop().create_task(self._sub_loop())
+        elif first and self._sub_writer is not None:
+            self._sub_writer.write(encode_command("SUBSCRIBE", topic))
+
+    async def _sub_loop(self):
+        delay = 0.5
+        self._sub_writer = None
+        while not self._closing:
+            try:
+                reader, self._sub_writer = await asyncio.open_connection(self.host, self.port)
+                if self.password:
+                    self._sub_writer.write(encode_command("AUTH", self.password))
+                    await read_reply(reader)
+                self._sub_writer.write(encode_command("SUBSCRIBE", *self._subscriptions))
+                delay = 0.5
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == "message":
+                        for callback in self._subscriptions.get(reply[1], ()):
+                            try:
+                                callback(reply[2])
+                            except Exception as e:
+                                log.warning("[⚠️] Feliratkozó hiba (%s): %s", reply[1], e)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError):
+                self._sub_writer = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "resp",
+            "commands": self.commands,
+            "round_trips": self.round_trips,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._waiters),
+        }
+
+
+def open_store(url: str = None) -> StateStore:
+    """'memory' / üres -> MemoryStore; 'redis://host:port/db' -> RespStore."""
+    if not url or url == "memory":
+        return MemoryStore()
+    if url.startswith(("redis://", "resp://")):
+        return RespStore.from_url(url)
+    raise ValueError(f"ismeretlen állapottár: {url}")
@@ -0,0 +1,183 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.log import get_logger
+
+log = get_logger("stats")
+
+# ===============================
+# Játékos-statisztikák (SQLite, WAL)
+# ===============================
+# A játékok `Stat` effektjei (ki mit tippelt, ki nyert, ki hívta az ördögöt ...) itt
+# csak egy listába kerülnek – a `record` O(1), nincs benne I/O. A lista másodpercenként
+# egyetlen tranzakcióban íródik ki egy külön szálon: a nyers események az `events`
+# táblába, az összesítések (csatorna, játék, esemény, user -> darab) a `totals` táblába
+# UPSERT-tel. A !top és a !stats csak a `totals`-ból olvas, indexen keresztül.
+FLUSH_INTERVAL = 1.0        # ennyi mp-enként íródnak ki a várakozó események
+MAX_PENDING = 5000          # ennyi várakozó eseménynél nem várjuk meg a következő kört
+DEFAULT_PATH = "stats.db"
+
+# esemény -> felirat a chatben
+LABELS = {
+    "win": "győzelem",
+    "loss": "vereség",
+    "draw": "döntetlen",
+    "hit": "jó tipp",
+    "miss": "rossz tipp",
+    "word": "szótipp",
+    "hint": "segítség",
+    "angel": "angyal",
+    "devil": "ördög",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY,
+    ts      REAL NOT NULL,
+    channel TEXT NOT NULL,
+    game    TEXT NOT NULL,
+    user    TEXT NOT NULL,
+    event   TEXT NOT NULL,
+    detail  TEXT
+);
+CREATE TABLE IF NOT EXISTS totals (
+    channel TEXT NOT NULL,
+    game    TEXT NOT NULL,
+    event   TEXT NOT NULL,
+    user    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (channel, game, event, user)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS totals_rank ON totals (channel, game, event, count DESC);
+CREATE INDEX IF NOT EXISTS totals_user ON totals (channel, user);
+"""
+
+_INSERT_EVENT = "INSERT INTO events (ts, channel, game, user, event, detail) VALUES (?, ?, ?, ?, ?, ?)"
+_UPSERT_TOTAL = """
+INSERT INTO totals (channel, game, event, user, count, last_ts) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (channel, game, event, user)
+DO UPDATE SET count = count + excluded.count, last_ts = excluded.last_ts
+"""
+
+
+class StatsStore:
+    """Write-behind statisztika-tár.
+
+    Minden adatbázis-művelet ugyanazon az egy háttérszálon fut (egy kapcsolat, nincs
+    zárolási verseny); a loop csak a várakozó listát cseréli és a Future-re vár.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats")
+        self._db = None
+        self._pending = []      # (ts, csatorna, játék, user, esemény, részlet)
+        self._writing = None    # folyamatban lévő háttér-írás (Future)
+        self._task = None
+
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.last_batch_ms = 0.0
+
+    # --------- életciklus ---------
+    async def open(self):
+        await self._run(self._open)
+
+    def _open(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        self._db = db
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                log.warning("[⚠️] Statisztika írási hiba: %s", e)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        await self.flush()
+        await self._run(self._db.close)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, fn, *args):
+        return asyncio.get_event_loop().run_in_executor(self._executor, fn, *args)
+
+    # --------- írás ---------
+    def record(self, channel: str, game: str, user: str, event: str, detail: str = None):
+        """Egy esemény felvétele; a következő kötegben kerül az adatbázisba."""
+        self._pending.append((time.time(), channel, game, user.lower(), event, detail))
+        self.recorded += 1
+        if len(self._pending) >= MAX_PENDING:
+            self._writing = self._run(self._write_batch, self._pending)
+            self._pending = []
+
+    async def flush(self):
+        """A várakozó események kiírása egy tranzakcióban (a háttérszálon).
+
+        Az egyetlen háttérszál sorban hajtja végre a kötegeket, így a sorrend megmarad.
+        """
+        batch, self._pending = self._pending, []
+        if batch:
+            self._writing = self._run(self._write_batch, batch)
+        if self._writing is not None:
+            await self._writing
+
+    def _write_batch(self, batch: list):
+        t0 = time.perf_counter()
+        totals = {}
+        for ts, channel, game, user, event, _ in batch:
+            key = (channel, game, event, user)
+            count, _ = totals.get(key, (0, 0.0))
+            totals[key] = (count + 1, ts)
+        db = self._db
+        db.execute("BEGIN")
+        try:
+            db.executemany(_INSERT_EVENT, batch)
+            db.executemany(_UPSERT_TOTAL, [(*key, count, ts) for key, (count, ts) in totals.items()])
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+        self.written += len(batch)
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - t0) * 1000, 2)
+
+    # --------- lekérdezések ---------
+    async def top(self, channel: str, game: str, event: str = "win", limit: int = 5) -> list:
+        """[(user, darab), ...] csökkenő sorrendben."""
+        return await self._run(self._query,
+                               "SELECT user, count FROM totals WHERE channel = ? AND game = ? AND event = ? "
+                               "ORDER BY count DESC, last_ts ASC LIMIT ?",
+                               (channel, game, event, limit))
+
+    async def user_stats(self, channel: str, user: str) -> dict:
+        """{játék: {esemény: darab}} egy felhasználóra."""
+        rows = await self._run(self._query,
+                               "SELECT game, event, count FROM totals WHERE channel = ? AND user = ?",
+                               (channel, user.lower()))
+        out = {}
+        for game, event, count in rows:
+            out.setdefault(game, {})[event] = count
+        return out
+
+    def _query(self, sql: str, params: tuple) -> list:
+        return self._db.execute(sql, params).fetchall()
+
+    def stats(self) -> dict:
+        return {"recorded": self.recorded, "written": self.written, "pending": len(self._pending),
+                "batches": self.batches, "last_batch_ms": self.last_batch_ms}
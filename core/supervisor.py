@@ -0,0 +1,233 @@
+import asyncio
+import os
+import signal
+import sys
+import time
+
+from core.host import HostAPI
+from core.shard import LINE_LIMIT, HashRing, encode, read_messages
+from core.log import get_logger
+
+log = get_logger("supervisor")
+
+# ===============================
+# Supervisor – folyamatonként egy shard
+# ===============================
+# A supervisor nem csatlakozik a Twitch-hez: elindít CPU-magonként egy workert
+# (main_bot.py SHARD_ID/SHARD_CONTROL környezettel), a csatornákat konzisztens
+# hash-eléssel osztja szét közöttük, és egyetlen front WebSocket szerverként
+# továbbítja a workerek overlay eseményeit.
+RELEASE_TIMEOUT = 10.0    # ennyit várunk, hogy a leadó worker átadja az állapotot
+ONLINE_TIMEOUT = 60.0     # ennyit várunk, hogy az újraindított worker bejelentkezzen
+CRASH_BACKOFF_MAX = 30.0  # egymás utáni összeomlásoknál max. ennyi mp szünet
+
+
+class _Worker:
+    __slots__ = ("shard", "proc", "writer", "online", "planned", "restarts")
+
+    def __init__(self, shard: int):
+        self.shard = shard
+        self.proc = None
+        self.writer = None
+        self.online = asyncio.Event()
+        self.planned = False        # tervezett leállítás (rolling restart), nem összeomlás
+        self.restarts = 0
+
+
+class Supervisor:
+    """Worker folyamatok indítása, felügyelete és a csatornák költöztetése közöttük.
+
+    - összeomlott worker újraindul, és az utolsó checkpointból folytatja a csatornáit
+    - `rolling_restart()` (SIGHUP) egyenként cseréli a workereket: előbb a csatornáit
+      a többi shardra költözteti (release -> join állapottal), így a futó játékok
+      megszakítás nélkül mennek tovább
+    """
+
+    def __init__(self, channels, shards: int, ws_port: int, script: str = "main_bot.py",
+                 primary_channel: str = None):
+        self.channels = [c.lower() for c in channels]
+        self.shards = max(1, shards)
+        self.script = script
+        self.primary_channel = primary_channel or (self.channels[0] if self.channels else "")
+        self.ring = HashRing(range(self.shards))
+        self.owner = {}          # csatorna -> shard
+        self.checkpoints = {}    # csatorna -> utolsó ismert játékállapot
+        self.workers = {shard: _Worker(shard) for shard in range(self.shards)}
+        self.host = HostAPI(port=ws_port, primary_channel=self.primary_channel)
+        self.control_port = None
+        self._pending = {}       # csatorna -> Future (release válasz)
+        self._stopping = False
+        self._stopped = None
+        self._busy = asyncio.Lock()
+
+    # --------- indítás ---------
+    async def run(self):
+        self._stopped = asyncio.Event()
+        server = await asyncio.start_server(self._on_worker, "127.0.0.1", 0, limit=LINE_LIMIT)
+        self.control_port = server.sockets[0].getsockname()[1]
+        await self.host.start()
+
+        self.owner = self.ring.assign(self.channels)
+        for shard in self.workers:
+            count = sum(1 for s in self.owner.values() if s == shard)
+            log.info("[🧩] Shard #%s: %s csatorna", shard, count)
+            asyncio.get_event_loop().create_task(self._keep_alive(self.workers[shard]))
+        self._install_signals()
+        await self._stopped.wait()
+        server.close()
+
+    def _install_signals(self):
+        loop = asyncio.get_event_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(self.rolling_restart()))
+            loop.add_signal_handler(signal.SIGTERM, lambda: loop.create_task(self.shutdown()))
+        except (NotImplementedError, AttributeError, RuntimeError):
+            pass   # Windows: nincs SIGHUP / add_signal_handler
+
+    def _worker_env(self, shard: int) -> dict:
+        env = dict(os.environ)
+        env.pop("SHARDS", None)
+        env.update({
+            "SHARD_ID": str(shard),
+            "SHARD_COUNT": str(self.shards),
+            "SHARD_CONTROL": f"127.0.0.1:{self.control_port}",
+            "PRIMARY_CHANNEL": self.primary_channel,
+            "PYTHONUNBUFFERED": "1",
+        })
+        return env
+
+    async def _keep_alive(self, w: _Worker):
+        backoff = 1.0
+        while not self._stopping:
+            w.proc = await asyncio.create_subprocess_exec(sys.executable, self.script, env=self._worker_env(w.shard))
+            started = time.monotonic()
+            code = await w.proc.wait()
+            w.online.clear()
+            w.writer = None
+            if self._stopping:
+                return
+            if w.planned:
+                w.planned = False
+                backoff = 1.0
+                continue
+            w.restarts += 1
+            if time.monotonic() - started > 60:
+                backoff = 1.0
+            log.error("[💥] Shard #%s leállt (kód: %s) – újraindítás %.0f mp múlva, "
+                      "a csatornák az utolsó checkpointból folytatódnak.", w.shard, code, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, CRASH_BACKOFF_MAX)
+
+    # --------- vezérlőkapcsolat ---------
+    async def _on_worker(self, reader, writer):
+        w = None
+        async for msg in read_messages(reader):
+            kind = msg.get("type")
+            if kind == "overlay":
+                self.host.ws_broadcast(msg["payload"])
+            elif kind == "checkpoint":
+                self.checkpoints[msg["channel"]] = msg["state"]
+            elif kind == "released":
+                self.checkpoints[msg["channel"]] = msg["state"]
+                fut = self._pending.pop(msg["channel"], None)
+                if fut is not None and not fut.done():
+                    fut.set_result(msg["state"])
+            elif kind == "hello":
+                w = self.workers.get(msg.get("shard"))
+                if w is None:
+                    break
+                w.writer = writer
+                for channel, shard in self.owner.items():
+                    if shard == w.shard:
+                        self._send(w, {"type": "join", "channel": channel, "state": self.checkpoints.get(channel)})
+                w.online.set()
+                log.info("[🧩] Shard #%s online (pid %s).", w.shard, msg.get("pid"))
+        if w is not None and w.writer is writer:
+            w.writer = None
+            w.online.clear()
+        writer.close()
+
+    def _send(self, w: _Worker, msg: dict) -> bool:
+        if w.writer is None or w.writer.is_closing():
+            return False
+        w.writer.write(encode(msg))
+        return True
+
+    # --------- költöztetés ---------
+    async def _release(self, channel: str):
+        """A csatorna jelenlegi shardja leadja a csatornát; az állapot a checkpointok közé kerül."""
+        old = self.owner.get(channel)
+        w_old = self.workers.get(old)
+        if w_old is None:
+            return
+        fut = asyncio.get_event_loop().create_future()
+        self._pending[channel] = fut
+        if self._send(w_old, {"type": "release", "channel": channel}):
+            try:
+                await asyncio.wait_for(fut, RELEASE_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.warning("[⚠️] #%s: a shard #%s nem adta le időben – utolsó checkpoint megy tovább.", channel, old)
+        self._pending.pop(channel, None)
+
+    async def move(self, channel: str, new: int):
+        """Csatorna átköltöztetése: a régi shard leadja (állapottal), az új átveszi."""
+        if self.owner.get(channel) == new:
+            return
+        await self._release(channel)
+        self.owner[channel] = new
+        # ha az új shard épp nem elérhető, a bejelentkezésekor kapja meg
+        self._send(self.workers[new], {"type": "join", "channel": channel, "state": self.checkpoints.get(channel)})
+
+    async def rebalance(self):
+        """Minden csatorna a gyűrű szerinti tulajdonoshoz kerül; csak az érintettek mozdulnak."""
+        moved = 0
+        for channel in self.channels:
+            target = self.ring.node_for(channel)
+            if target != self.owner.get(channel):
+                await self.move(channel, target)
+                moved += 1
+        if moved:
+            log.info("[🧩] Újraosztás: %s csatorna költözött.", moved)
+
+    async def rolling_restart(self):
+        """Workerek cseréje egyenként, a futó játékok megszakítása nélkül (pl. deploy után)."""
+        async with self._busy:
+            for shard, w in self.workers.items():
+                if len(self.workers) > 1:
+                    self.ring.remove(shard)
+                    await self.rebalance()
+                else:
+                    # nincs hova költözni: friss állapotot kérünk, az új folyamat ebből folytatja
+                    for channel in [c for c, s in self.owner.items() if s == shard]:
+                        await self._release(channel)
+                w.planned = True
+                w.online.clear()
+                if w.proc is not None and w.proc.returncode is None:
+                    w.proc.terminate()
+                try:
+                    await asyncio.wait_for(w.online.wait(), ONLINE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    log.warning("[⚠️] Shard #%s nem jelentkezett be újraindítás után.", shard)
+                self.ring.add(shard)
+                await self.rebalance()
+            log.info("[✅] Rolling restart kész.")
+
+    async def shutdown(self):
+        self._stopping = True
+        for w in self.workers.values():
+            if w.proc is not None and w.proc.returncode is None:
+                w.proc.terminate()
+        for w in self.workers.values():
+            if w.proc is not None:
+                await w.proc.wait()
+        self._stopped.set()
+
+    def stats(self) -> dict:
+        return {
+            shard: {
+                "online": w.online.is_set(),
+                "restarts": w.restarts,
+                "channels": sum(1 for s in self.owner.values() if s == shard),
+            }
+            for shard, w in self.workers.items()
+        }
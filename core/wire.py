@@ -0,0 +1,231 @@
+import json
+import struct
+
+# ===============================
+# Overlay átviteli formátumok
+# ===============================
+# A kliens a WebSocket címben választ: ?format=json (alapértelmezett, olvasható –
+# hibakereséshez) vagy ?format=bin (tömör bináris). A bináris üzenet egy frissítésnél
+# egyszer készül el, és minden bináris feliratkozó ugyanazt a bájtsort kapja.
+#
+# Bináris elrendezés (1. verzió, a többbájtos számok big-endian):
+#   u8 verzió | u8 esemény | u8 játék | str csatorna | u8 állapotfajta | [állapot]
+# Az esemény és a játék kódja az alábbi táblákból jön (0: utána str a név). Egy str
+# u8 hosszból és UTF-8 bájtokból áll. Állapotfajták:
+#   0 nincs állapot (nem refresh esemény)      1 null (a játék elengedte az állapotát)
+#   2 akasztófa: u8 téma | str kategória | str szó | u8 db + str hibás tippek |
+#                u8 élet | u8 max élet | u8 állapot
+#   3 tábla: u8 mód | u8 sor | u8 oszlop | mezők 2 bitenként (sorfolytonosan, az első
+#            mező a legfelső bitpáron) | str játékos1 | str játékos2 |
+#            u8 soron következő | u8 győztes (+ str, ha 4)
+#   4 általános: u32 hossz + tömör JSON – ami a fenti elrendezésekbe nem fér bele
+# A kódtáblák bővíthetők, de csak a végükön (a már kiadott kódok nem változhatnak);
+# az overlay/wire.js dekódoló ugyanezeket a táblákat tartalmazza.
+FORMATS = ("json", "bin")
+DEFAULT_FORMAT = "json"
+WIRE_VERSION = 1
+
+EVENTS = ("", "refresh", "new_game", "victory", "devil", "angel", "game_over")
+GAMES = ("", "akasztofa", "amoeba")
+THEMES = ("", "temeto", "gyertya", "akasztofa", "szorny", "zombik")
+HANGMAN_STATES = ("normal", "angel")
+BOARD_MODES = ("", "amoeba", "connect4")
+CELLS = (" ", "☠️", "🩸")             # 2 bites mezőkódok (a 3 szabad)
+
+STATE_NONE, STATE_NULL, STATE_HANGMAN, STATE_BOARD, STATE_JSON = range(5)
+PLAYER_NONE, PLAYER_1, PLAYER_2, PLAYER_DRAW, PLAYER_OTHER = range(5)
+DRAW = "Döntetlen"
+
+_EVENT_CODE = {name: i for i, name in enumerate(EVENTS) if name}
+_GAME_CODE = {name: i for i, name in enumerate(GAMES) if name}
+_THEME_CODE = {name: i for i, name in enumerate(THEMES)}
+_HANGMAN_STATE_CODE = {name: i for i, name in enumerate(HANGMAN_STATES)}
+_MODE_CODE = {name: i for i, name in enumerate(BOARD_MODES) if name}
+_CELL_DIGITS = tuple((name, str(i)) for i, name in enumerate(CELLS))
+_HANGMAN_KEYS = frozenset(("theme", "category", "word", "wrong", "lives_status", "state"))
+_BOARD_KEYS = frozenset(("game", "mode", "board", "player1", "player2", "current_player", "winner"))
+
+
+class _Unfit(Exception):
+    """Az állapot nem fér bele a fix elrendezésbe – általános (JSON) állapotként megy."""
+
+
+def encode_json(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode(payload: dict, fmt: str) -> object:
+    """Üzenet a kért formátumban (json: str, bin: bytes)."""
+    return encode_binary(payload) if fmt == "bin" else encode_json(payload)
+
+
+# --------- kódolás ---------
+def _str(out: bytearray, text):
+    data = str(text).encode("utf-8")
+    if len(data) > 255:
+        raise _Unfit
+    out.append(len(data))
+    out += data
+
+
+def _code(out: bytearray, table: dict, name):
+    code = table.get(name)
+    if code is None:
+        out.append(0)
+        _str(out, name or "")
+    else:
+        out.append(code)
+
+
+def _hangman(out: bytearray, state: dict):
+    theme = _THEME_CODE.get(state["theme"])
+    status = _HANGMAN_STATE_CODE.get(state["state"])
+    if theme is None or status is None or len(state["wrong"]) > 255:
+        raise _Unfit
+    try:
+        lives, max_lives = (int(x) for x in state["lives_status"].split("/"))
+    except (AttributeError, ValueError):
+        raise _Unfit
+    if not (0 <= lives <= 255 and 0 <= max_lives <= 255):
+        raise _Unfit
+    out.append(theme)
+    _str(out, state["category"])
+    _str(out, state["word"])
+    out.append(len(state["wrong"]))
+    for item in state["wrong"]:
+        _str(out, item)
+    out += bytes((lives, max_lives, status))
+
+
+def _player(out: bytearray, name: str, state: dict):
+    if not name:
+        out.append(PLAYER_NONE)
+    elif name == state["player1"]:
+        out.append(PLAYER_1)
+    elif name == state["player2"]:
+        out.append(PLAYER_2)
+    elif name == DRAW:
+        out.append(PLAYER_DRAW)
+    else:
+        out.append(PLAYER_OTHER)
+        _str(out, name)
+
+
+def _board(out: bytearray, state: dict):
+    board = state["board"]
+    mode = _MODE_CODE.get(state["mode"])
+    rows = len(board)
+    cols = len(board[0]) if rows else 0
+    if mode is None or not (0 < rows <= 255 and 0 < cols <= 255):
+        raise _Unfit
+    if any(len(row) != cols for row in board):
+        raise _Unfit
+    out += bytes((mode, rows, cols))
+    # mezőnként egy 4-es számrendszerbeli jegy: a sorfolytonos jegysor egy nagy-endián
+    # egész, aminek a bájtjai épp a 2 bites csomagolás (C-ben, mezőnkénti Python ciklus nélkül)
+    digits = "".join(map("".join, board))
+    for cell, digit in _CELL_DIGITS:
+        digits = digits.replace(cell, digit)
+    if len(digits) != rows * cols or not (digits.isascii() and digits.isdigit()) or "3" in digits:
+        raise _Unfit
+    digits += "0" * (-len(digits) % 4)
+    try:
+        out += int(digits, 4).to_bytes(len(digits) // 4, "big")
+    except ValueError:     # 4-9: nem mezőkód
+        raise _Unfit
+    _str(out, state["player1"])
+    _str(out, state["player2"])
+    _player(out, state["current_player"], state)
+    _player(out, state["winner"], state)
+
+
+def encode_binary(payload: dict) -> bytes:
+    out = bytearray((WIRE_VERSION,))
+    _code(out, _EVENT_CODE, payload.get("event"))
+    _code(out, _GAME_CODE, payload.get("game"))
+    _str(out, payload.get("channel") or "")
+    if "state" not in payload:
+        out.append(STATE_NONE)
+        return bytes(out)
+    state = payload["state"]
+    if state is None:
+        out.append(STATE_NULL)
+        return bytes(out)
+    head = len(out)
+    try:
+        if isinstance(state, dict) and state.keys() == _HANGMAN_KEYS:
+            out.append(STATE_HANGMAN)
+            _hangman(out, state)
+            return bytes(out)
+        if isinstance(state, dict) and state.keys() == _BOARD_KEYS and state["game"] == "amoeba":
+            out.append(STATE_BOARD)
+            _board(out, state)
+            return bytes(out)
+    except (_Unfit, TypeError, KeyError):
+        del out[head:]
+    data = encode_json(state).encode("utf-8")
+    out.append(STATE_JSON)
+    out += struct.pack(">I", len(data))
+    out += data
+    return bytes(out)
+
+
+# --------- dekódolás (eszközökhöz; a böngészőben az overlay/wire.js teszi ugyanezt) ---------
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def u8(self) -> int:
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def str(self) -> str:
+        n = self.u8()
+        self.pos += n
+        return self.data[self.pos - n:self.pos].decode("utf-8")
+
+    def code(self, table: tuple) -> str:
+        code = self.u8()
+        return table[code] if code else self.str()
+
+
+def _read_player(r: _Reader, p1: str, p2: str) -> str:
+    code = r.u8()
+    return ("", p1, p2, DRAW)[code] if code != PLAYER_OTHER else r.str()
+
+
+def decode_binary(data: bytes) -> dict:
+    r = _Reader(data)
+    version = r.u8()
+    if version != WIRE_VERSION:
+        raise ValueError(f"ismeretlen overlay formátum verzió: {version}")
+    payload = {"event": r.code(EVENTS), "game": r.code(GAMES), "channel": r.str()}
+    kind = r.u8()
+    if kind == STATE_NULL:
+        payload["state"] = None
+    elif kind == STATE_HANGMAN:
+        theme = THEMES[r.u8()]
+        category, word = r.str(), r.str()
+        wrong = [r.str() for _ in range(r.u8())]
+        lives, max_lives, status = r.u8(), r.u8(), r.u8()
+        payload["state"] = {"theme": theme, "category": category, "word": word, "wrong": wrong,
+                            "lives_status": f"{lives}/{max_lives}", "state": HANGMAN_STATES[status]}
+    elif kind == STATE_BOARD:
+        mode, rows, cols = BOARD_MODES[r.u8()], r.u8(), r.u8()
+        n = rows * cols
+        packed = data[r.pos:r.pos + (n + 3) // 4]
+        r.pos += len(packed)
+        flat = [CELLS[(packed[i >> 2] >> (6 - 2 * (i & 3))) & 3] for i in range(n)]
+        p1, p2 = r.str(), r.str()
+        current = _read_player(r, p1, p2)
+        winner = _read_player(r, p1, p2)
+        payload["state"] = {"game": "amoeba", "mode": mode,
+                            "board": [flat[i:i + cols] for i in range(0, n, cols)],
+                            "player1": p1, "player2": p2, "current_player": current, "winner": winner}
+    elif kind == STATE_JSON:
+        (n,) = struct.unpack_from(">I", data, r.pos)
+        payload["state"] = json.loads(data[r.pos + 4:r.pos + 4 + n].decode("utf-8"))
+    return payload
@@ -1,124 +1,186 @@
 from abc import ABC, abstractmethod
-import asyncio
 import json
 import os
 import time
-from typing import Dict, Set, List
+from typing import Dict, List, Optional
+
+from core.actor import After, Emit, GameActor, Overlay, Say, Stat, Track
+from core.log import GameLogger
+from core.metrics import OVERLAY_WRITE_SECONDS
+from core.outbound import NORMAL
+from core.router import Route
+from core.state import overlay_key
 
 class BaseGame(ABC):
-    def __init__(self, channel: str, bot):
+    """Egy játék egy csatornán. A GameRuntime példányosítja és irányítja.
+
+    A parancsok a `routes()` által visszaadott táblán át érkeznek: parancsnév -> Route,
+    ahol a handler szinkron állapotátmenet `handler(ctx) -> effektlista`. A runtime
+    minden átmenet után újraolvassa a táblát, így az inaktív játék csak a belépő
+    parancsait (pl. !akasztás) tartja a routerben.
+    """
+
+    name = ""
+
+    def __init__(self, channel: str, runtime):
         self.channel = channel
-        self.bot = bot
+        self.runtime = runtime
         self.active = False
         self.game_id = None
         self.game_starter = None
-        self.last_tipp_times = {}
-        self.last_tipp_time = 0
-        
-        # Overlay elérési útvonalak
-        self.OVERLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "overlay")
-        self.DATA_FILE = os.path.join(self.OVERLAY_DIR, "data.json")
-        
-        # Konfiguráció a fő botból
-        self.config = bot.config
-        
-        # WebSocket értesítés a fő botból
-        self._ws_notify = bot._ws_notify if hasattr(bot, '_ws_notify') else lambda x: None
-    
+        self.last_used = 0.0        # utolsó parancs ideje (monotonic) – tétlen példány kiürítéséhez
+
+        # Overlay elérési útvonalak: játékonként saját fájl, hogy a játékok ne írják felül
+        # egymás állapotát – az elsődleges csatornáé overlay/<játék>.json, a többi csatornáé
+        # saját névtérben (overlay/channels/<csatorna>/<játék>.json)
+        self.OVERLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "overlay")
+        if channel == getattr(runtime, "primary_channel", channel):
+            self.DATA_FILE = os.path.join(self.OVERLAY_DIR, f"{self.name}.json")
+        else:
+            self.DATA_FILE = os.path.join(self.OVERLAY_DIR, "channels", channel, f"{self.name}.json")
+
+        # Konfiguráció: a config szolgáltatás csak olvasható pillanatképe (a játék szekciója,
+        # a csatorna felülírásaival); változáskor a runtime cseréli le
+        self.config = runtime.config.section(self.name, channel)
+
+        # Napló: a csatorna, a játék és az aktuális game_id minden sorban
+        self.log = GameLogger(self)
+
+        # Egyetlen író: minden parancs és időzítő ezen az actoron fut át
+        self.actor = GameActor(f"{self.name}:{channel}", self.perform, on_transition=self._transitioned)
+
     @abstractmethod
     def start(self):
         """Játék indítása"""
         pass
-    
+
     @abstractmethod
-    async def handle_message(self, user: str, message: str) -> bool:
-        """Üzenet feldolgozása. Visszaadja, hogy a játék aktív-e"""
+    def routes(self) -> Dict[str, Route]:
+        """Az aktuális állapotban élő parancsok. Állapotonként előre felépített dict-et adj vissza!"""
         pass
-    
+
     @abstractmethod
     def stop(self):
-        """Játék leállítása és takarítás"""
+        """Játék leállítása és takarítás (állapotátmenet, effektlistát ad vissza)"""
         pass
-    
-    def send_message(self, message: str):
-        """Üzenet küldése a Twitch chatbe"""
+
+    def armed_routes(self) -> Dict[str, Route]:
+        """Minden parancs, amit a játék bármely állapotban elfogad (amíg a postafiókban vár valami)."""
+        return self.routes()
+
+    async def handle_message(self, user: str, message: str) -> bool:
+        """Üzenet feldolgozása router nélkül (pl. tesztkörnyezetben). Visszaadja, hogy a játék aktív-e"""
+        parsed = self.runtime.router.parse(message)
+        if parsed:
+            route = self.routes().get(parsed[0])
+            if route:
+                ctx = self.runtime.make_context(self.channel, user, {}, parsed[0], parsed[1])
+                await self.actor.tell(route.handler, ctx)
+        return self.active
+
+    def is_active_player(self, user: str) -> bool:
+        """Igaz, ha a user a játék aktív résztvevője (bejövő prioritáshoz)."""
+        return False
+
+    def _transitioned(self):
+        self.runtime.sync_routes(self)
+        self.runtime.mark_dirty(self.channel, self)
+
+    # --------- állapot átadása (shardok közötti költöztetés) ---------
+    def snapshot(self):
+        """A játék JSON-ba írható állapota; None, ha nincs mit átadni (alapértelmezés)."""
+        return None
+
+    def restore(self, state: dict):
+        """A `snapshot()` által adott állapot visszatöltése egy friss példányba."""
+        pass
+
+    def export_state(self):
+        """Állapot + élő nevesített időzítők (a handlerek a játék saját metódusai, név szerint)."""
+        state = self.snapshot()
+        if state is None:
+            return None
+        timers = [[key, round(remaining, 3), handler.__name__, list(args)]
+                  for key, remaining, handler, args in self.actor.timer_specs()
+                  if getattr(handler, "__self__", None) is self]
+        return {"state": state, "timers": timers}
+
+    def import_state(self, data: dict):
+        """`export_state()` eredményének betöltése: állapot, időzítők újraélesítése, parancstábla."""
+        self.restore(data["state"])
+        for key, remaining, handler, args in data.get("timers", ()):
+            self.actor.arm(After(remaining, getattr(self, handler), *args, key=key))
+        self._transitioned()
+
+    # --------- effektek végrehajtása ---------
+    def perform(self, eff):
+        if isinstance(eff, Say):
+            self.send_message(eff.text, NORMAL if eff.priority is None else eff.priority)
+        elif isinstance(eff, Overlay):
+            self.write_overlay(eff.payload, eff.refresh)
+        elif isinstance(eff, Emit):
+            self.ws_send(eff.event)
+        elif isinstance(eff, Stat):
+            stats = self.runtime.stats
+            if stats is not None:
+                stats.record(self.channel, self.name, eff.user, eff.event, eff.detail)
+        elif isinstance(eff, Track):
+            events = self.runtime.events
+            if events is not None:
+                events.emit(self.channel, self.name, eff.event, eff.data)
+
+    def send_message(self, message: str, priority: int = NORMAL):
+        """Üzenet küldése a Twitch chatbe (a főbot kimenő során át, nem blokkol)"""
         try:
-            target_channel = None
-            for ch in self.bot.connected_channels:
-                if ch.name.lower() == self.channel.lower():
-                    target_channel = ch
-                    break
-            
-            if target_channel:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    asyncio.create_task(target_channel.send(message))
-                else:
-                    loop.run_until_complete(target_channel.send(message))
-            else:
-                print(f"Hiba: Nem található a(z) {self.channel} csatorna")
+            self.runtime.outbox.send(self.channel, message, priority)
         except Exception as e:
-            print(f"Hiba az üzenetküldés során: {e}")
-    
-    def save_overlay_state(self, theme: str, category: str, word: str, 
+            self.log.warning("Hiba az üzenetküldés során: %s", e)
+
+    def ws_send(self, event_name: str, **data):
+        """Esemény továbbítása az overlay felé a HostAPI-n át."""
+        host = self.runtime.host
+        if host:
+            host.ws_broadcast({"event": event_name, "game": self.name, "channel": self.channel, **data})
+
+    def write_overlay(self, payload: Optional[dict], refresh: bool = True):
+        """Overlay állapot kiírása (fájl + közös állapottár) + opcionális azonnali refresh.
+
+        A refresh magát az állapotot is viszi, így a feliratkozott overlaynek nem kell a
+        fájlt újraolvasnia. None: a játék elengedi az állapotát (fájl és kulcs törlése).
+        """
+        t0 = time.perf_counter()
+        key = overlay_key(self.channel, self.name)
+        if payload is None:
+            try:
+                os.remove(self.DATA_FILE)
+            except FileNotFoundError:
+                pass
+            self.runtime.store.delete(key)
+        else:
+            os.makedirs(os.path.dirname(self.DATA_FILE), exist_ok=True)
+            with open(self.DATA_FILE, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            self.runtime.store.set_json(key, payload)
+        OVERLAY_WRITE_SECONDS.observe(time.perf_counter() - t0, (self.name,))
+        if refresh:
+            self.ws_send("refresh", state=payload)
+
+    def save_overlay_state(self, theme: str, category: str, word: str,
                           wrong: List[str], lives_status: str, state: str):
         """Állapot mentése az overlay számára"""
+        data = {
+            "theme": theme,
+            "category": category,
+            "word": word,
+            "wrong": wrong,
+            "lives_status": lives_status,
+            "state": state
+        }
         try:
-            # Biztosítsuk, hogy az overlay könyvtár létezik
-            os.makedirs(self.OVERLAY_DIR, exist_ok=True)
-            
-            # Adatstruktúra létrehozása
-            data = {
-                "theme": theme,
-                "category": category,
-                "word": word,
-                "wrong": wrong,
-                "lives_status": lives_status,
-                "state": state
-            }
-            
-            # Debug: kiírjuk a mentett adatokat
-            print(f"💾 Overlay adatok mentése:")
-            print(f"   Útvonal: {self.DATA_FILE}")
-            print(f"   Téma: {theme}")
-            print(f"   Kategória: {category}")
-            print(f"   Szó: {word}")
-            print(f"   Hibás betűk: {wrong}")
-            print(f"   Élet állapot: {lives_status}")
-            print(f"   Állapot: {state}")
-            
-            # Fájlba mentés
-            with open(self.DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            # WebSocket értesítés küldése
-            self._ws_notify("refresh")
-            
-            print("✅ Overlay adatok sikeresen mentve")
-            
-        except Exception as e:
-            print(f"❌ Hiba az overlay frissítésekor: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    async def clear_overlay_after(self, delay: float = 8.0):
-        """Overlay törlése késleltetve"""
-        await asyncio.sleep(delay)
-        try:
-            with open(self.DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump({
-                    "theme": "",
-                    "category": "",
-                    "word": "",
-                    "wrong": [],
-                    "lives_status": "0/0",
-                    "state": "normal"
-                }, f, ensure_ascii=False, indent=2)
-            self._ws_notify("game_over")
-            print("✅ Overlay sikeresen törölve")
+            # Fájlba mentés + WebSocket értesítés küldése
+            self.write_overlay(data)
         except Exception as e:
-            print(f"❌ Hiba az overlay törlésekor: {e}")
-    
-    def is_streamer_or_mod(self, user) -> bool:
-        """Ellenőrzi, hogy a felhasználó streamer vagy mod-e"""
-        return self.bot.is_streamer_or_mod(user)
\ No newline at end of file
+            self.log.exception("❌ Hiba az overlay frissítésekor: %s", e)
+            return
+        self.log.debug("💾 Overlay mentve: %s (téma: %s, kategória: %s, szó: %s, hibás: %s, élet: %s, állapot: %s)",
+                       self.DATA_FILE, theme, category, word, wrong, lives_status, state)
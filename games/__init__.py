@@ -0,0 +1,17 @@
+# Játék-manifeszt: a runtime ebből tudja, melyik parancs melyik modult tölti be,
+# anélkül hogy a modult (és a katalógusát) induláskor importálná.
+#   module  – a játék belépési modulja (prepare(runtime) függvénnyel)
+#   entry   – parancsok, amelyek első használatkor betöltik a játékot
+#   aliases – a `!indit <név>` parancsban elfogadott nevek
+GAMES = {
+    "akasztofa": {
+        "module": "games.akasztofa.bot",
+        "entry": ("akasztás",),
+        "aliases": ("akasztofa", "akasztófa", "hangman"),
+    },
+    "amoeba": {
+        "module": "games.amoeba.bot",
+        "entry": ("kihívás", "kihivas", "kihív", "kihiv"),
+        "aliases": ("amoeba", "amőba", "amoba", "connect4"),
+    },
+}
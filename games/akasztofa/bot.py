@@ -1,10 +1,18 @@
-import asyncio
+import hashlib
 import json
 import random
 import time
 import uuid
 from pathlib import Path
-from twitchio.ext import commands
+
+from core.actor import After, Emit, Overlay, Say, Stat, Track
+from core.config import ConfigError, Field
+from core.log import get_logger
+from core.outbound import HIGH, LOW
+from core.router import Route
+from game_interface import BaseGame
+
+log = get_logger("game.akasztofa")
 
 # ===============================
 # Beállítások / konstansok
@@ -18,79 +26,67 @@ THEMES = {
     "zombik": 8,
 }
 
-# Meglévő overlay-struktúrához igazodunk (root overlay/)
-OVERLAY_DIR = Path(__file__).resolve().parents[2] / "overlay"
-OVERLAY_DATA = OVERLAY_DIR / "data.json"
-
-GAME_DURATION_SECONDS = 1200  # 20 perc
-
-DEFAULT_CONFIG = {
-    "PERSONAL_TIPP_COOLDOWN": 5,
-    "GLOBAL_TIPP_COOLDOWN": 3,
-    "NEW_GAME_COOLDOWN": 120,
-    "GAME_DURATION": 1200,
-    "ANGEL_CHANCE": 8,   # %
-    "DEVIL_CHANCE": 1    # %
+# a gyökér config.json "akasztofa" szekciója (csatornánként: "channels" -> <csatorna> -> "akasztofa")
+CONFIG_SCHEMA = {
+    "PERSONAL_TIPP_COOLDOWN": Field(int, 5, 0),
+    "GLOBAL_TIPP_COOLDOWN": Field(int, 3, 0),
+    "NEW_GAME_COOLDOWN": Field(int, 120, 0),
+    "GAME_DURATION": Field(int, 1200, 60),      # 20 perc
+    "ANGEL_CHANCE": Field(float, 8, 0, 100),    # %
+    "DEVIL_CHANCE": Field(float, 1, 0, 100),    # %
+    "DIFFICULTY": Field(float, 60, 0, 100),     # % – a téma életeiből várhatóan elhasznált rész (kalibrált katalógusnál)
 }
 
-CONFIG_FILE = Path(__file__).resolve().parent / "config.json"
+# a korábbi, modulon belüli beállításfájlok – első betöltéskor átkerülnek a gyökér config.json-ba
+LEGACY_CONFIG_FILE = Path(__file__).resolve().parent / "config.json"
+LEGACY_CHANNEL_DIR = Path(__file__).resolve().parent / "channels"
 
 
-def load_config():
-    cfg = DEFAULT_CONFIG.copy()
-    if CONFIG_FILE.exists():
+def migrate_legacy_config(config):
+    """games/akasztofa/config.json és channels/<csatorna>.json átvétele (utána .bak)."""
+    files = [(LEGACY_CONFIG_FILE, None)]
+    if LEGACY_CHANNEL_DIR.is_dir():
+        files += [(p, p.stem) for p in sorted(LEGACY_CHANNEL_DIR.glob("*.json"))]
+    for path, channel in files:
+        if not path.exists():
+            continue
         try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                if isinstance(data, dict):
-                    cfg.update(data)
-        except Exception:
-            pass
-    return cfg
-
-
-def save_config(cfg):
-    try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2, ensure_ascii=False)
-    except Exception:
-        pass
+            config.set_many("akasztofa", data, channel)
+            path.rename(path.with_suffix(".json.bak"))
+        except (OSError, ValueError, ConfigError) as e:
+            log.warning("[⚠️] %s nem vehető át: %s", path, e)
+            continue
+        log.info("[⚙️] %s átköltöztetve a config.json-ba%s.", path.name, f" (#{channel})" if channel else "")
 
 
 # ===============================
-# Állapot
+# Szókatalógus
 # ===============================
-game_active = False
-game_id = None
-game_starter = ""
-current_theme = "temeto"
-STAGES_MAX = 6
+CATALOG_FILE = Path(__file__).resolve().parent / "data" / "words.json"
+# a tools/word_difficulty.py kimenete: szavanként és témánként a várható hibás tippek száma
+COMPILED_CATALOG = Path(__file__).resolve().parent / "data" / "words.compiled.json"
+COMPILED_VERSION = 1
+DIFFICULTY_BUCKETS = 20
+DIFFICULTY_WINDOW = 5       # a célvödör körül ennyi vödörből választunk (±25%)
+DIFFICULTY_DECAY = 0.75     # vödrönkénti súlycsökkenés a céltól távolodva
 
-secret_word = ""
-category = ""
-guessed_letters = set()
-wrong_items = []
-last_wrong_guesser = ""
-hint_used = False
-state = "normal"   # 'normal' | 'angel' | stb.
-bonus_life = 0
 
-# A main_bot HostAPI-ja (itt lesz beállítva a prepare(bot)-ban)
-_host_api = None
+def catalog_fingerprint() -> str:
+    """A words.json tartalmának hash-e – ebből látszik, ha a kalibráció elavult."""
+    return hashlib.sha256(CATALOG_FILE.read_bytes()).hexdigest() if CATALOG_FILE.exists() else ""
 
 
-# ===============================
-# Szókatalógus
-# ===============================
 def load_catalog():
     """
     Betölti a games/akasztofa/data/words.json fájlt.
     - JSON: {kategória: [szavak]}
     - nem JSON: "Kategória:" sorok + alattuk szavak
     """
-    path = Path(__file__).resolve().parent / "data" / "words.json"
+    path = CATALOG_FILE
     if not path.exists():
-        print(f"[❌] Nem található a szókatalógus: {path}")
+        log.error("[❌] Nem található a szókatalógus: %s", path)
         return {}
 
     # JSON próbálkozás
@@ -103,7 +99,7 @@ def load_catalog():
         pass
 
     # Kategória-formátum
-    print("[ℹ️] A words.json nem JSON – kategória formátumban olvasom.")
+    log.info("[ℹ️] A words.json nem JSON – kategória formátumban olvasom.")
     catalog = {}
     current_cat = None
     with open(path, "r", encoding="utf-8") as f:
@@ -122,6 +118,87 @@ def load_catalog():
     return {k: v for k, v in catalog.items() if v}
 
 
+class DifficultyIndex:
+    """(téma, kategória, szó) hármasok nehézség szerinti vödrökben.
+
+    Nehézség: a téma életeiből várhatóan elhasznált rész (várható hibás tippek / életek,
+    0 = biztos nyerés, 1 = esélytelen). Egyetlen vödörből választva egy stream alatt
+    feltűnően ismétlődnének a szavak, ezért a célvödör körüli ±`window` vödörből
+    választunk, távolsággal csökkenő (`decay` ^ távolság) súllyal. A súly szavanként
+    normált: egy szó összsúlya a legközelebbi témáinak súlya, akárhány témája esik az
+    ablakba. Célvödrönként előre felépített kumulált súlytábla – választás O(log n).
+    """
+
+    def __init__(self, entries, buckets: int = DIFFICULTY_BUCKETS, window: int = DIFFICULTY_WINDOW,
+                 decay: float = DIFFICULTY_DECAY):
+        self.buckets = [[] for _ in range(buckets)]
+        for difficulty, theme, category, word in entries:
+            self.buckets[self._slot(difficulty)].append((theme, category, word))
+        filled = [i for i, b in enumerate(self.buckets) if b]
+        self.nearest = [min(filled, key=lambda j: (abs(j - i), j)) for i in range(buckets)] if filled else []
+        self.tables = [self._table(slot, window, decay) for slot in range(buckets)] if filled else []
+
+    def _table(self, slot: int, window: int, decay: float) -> tuple:
+        """(hármasok, kumulált súlyok) egy célvödörhöz."""
+        near = [(decay ** abs(j - slot), entry) for j, bucket in enumerate(self.buckets)
+                if abs(j - slot) <= window for entry in bucket]
+        if not near:
+            near = [(1.0, entry) for entry in self.buckets[self.nearest[slot]]]
+        per_word = {}
+        for w, (_, category, word) in near:
+            per_word[(category, word)] = per_word.get((category, word), 0.0) + w
+        items, cum, total = [], [], 0.0
+        for w, entry in near:
+            total += w * w / per_word[entry[1:]]
+            items.append(entry)
+            cum.append(total)
+        return items, cum
+
+    def __len__(self):
+        return sum(len(b) for b in self.buckets)
+
+    def _slot(self, difficulty: float) -> int:
+        return min(len(self.buckets) - 1, max(0, int(difficulty * len(self.buckets))))
+
+    def pick(self, target: float) -> tuple:
+        """(téma, kategória, szó) a célnehézség (0–1) körül."""
+        items, cum = self.tables[self._slot(target)]
+        return random.choices(items, cum_weights=cum)[0]
+
+
+def load_difficulty(catalog: dict):
+    """A kalibrált katalógus indexe; None, ha nincs, vagy a words.json / THEMES azóta változott."""
+    if not COMPILED_CATALOG.exists() or not catalog:
+        return None
+    try:
+        with open(COMPILED_CATALOG, "r", encoding="utf-8") as f:
+            compiled = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("[⚠️] A kalibrált katalógus nem olvasható (%s): %s", COMPILED_CATALOG.name, e)
+        return None
+    if (compiled.get("version") != COMPILED_VERSION or compiled.get("source") != catalog_fingerprint()
+            or compiled.get("themes") != THEMES):
+        log.warning("[⚠️] A %s elavult (words.json vagy THEMES változott) – egyenletes szóválasztás. "
+                    "Újraszámolás: python tools/word_difficulty.py", COMPILED_CATALOG.name)
+        return None
+    words = compiled.get("words", {})
+    entries = []
+    for category, items in catalog.items():
+        calibrated = words.get(category, {})
+        for word in items:
+            expected = calibrated.get(word, {}).get("wrong")
+            if not expected:
+                continue
+            for theme, lives in THEMES.items():
+                if theme in expected:
+                    entries.append((expected[theme] / lives, theme, category, word))
+    if not entries:
+        return None
+    index = DifficultyIndex(entries)
+    log.info("[🎯] Kalibrált szókatalógus: %s téma–szó pár.", len(index))
+    return index
+
+
 # ===============================
 # Segédfüggvények
 # ===============================
@@ -129,418 +206,360 @@ def mask_word(word: str, revealed: set[str]) -> str:
     return "".join([c if (c.lower() in revealed or not c.isalpha()) else "_" for c in word])
 
 
-def lives_status() -> str:
-    return f"{len(wrong_items)}/{STAGES_MAX + bonus_life}"
-
-
-def _ws_send(event_name: str):
-    """Esemény továbbítása az overlay felé a főbot HostAPI-ján át."""
-    if _host_api:
-        _host_api.ws_broadcast({"event": event_name, "game": "akasztofa"})
-        # print(f"[Overlay] Esemény elküldve: {event_name}")
-    else:
-        print(f"[Overlay] HostAPI nincs inicializálva – kihagyva: {event_name}")
-
-
-def _overlay_write(payload: dict, do_refresh: bool = True):
-    """data.json kiírás + opcionális azonnali refresh."""
-    OVERLAY_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OVERLAY_DATA, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    if do_refresh:
-        _ws_send("refresh")
-
-
-def _save_overlay():
-    """Jelenlegi állapot kiírása és frissítés."""
-    data = {
-        "theme": current_theme,
-        "category": category,
-        "word": mask_word(secret_word, guessed_letters),
-        "wrong": wrong_items,
-        "lives_status": lives_status(),
-        "state": state,
-    }
-    _overlay_write(data, do_refresh=True)
-
-
-async def _clear_overlay_after(delay: float = 8.0):
-    """Végállapot megjelenítése után takarítás & overlay törlés."""
-    await asyncio.sleep(delay)
-
-    # állapot-változók nullázása
-    global game_active, game_id, game_starter, current_theme, STAGES_MAX
-    global secret_word, category, guessed_letters, wrong_items, last_wrong_guesser
-    global hint_used, state, bonus_life
-
-    game_active = False
-    game_id = None
-    game_starter = ""
-    current_theme = ""
-    STAGES_MAX = 0
-    secret_word = ""
-    category = ""
-    guessed_letters.clear()
-    wrong_items.clear()
-    last_wrong_guesser = ""
-    hint_used = False
-    state = "normal"
-    bonus_life = 0
-
-    # overlay ürítése + refresh + game_over jelzés
-    empty = {
-        "theme": "",
-        "category": "",
-        "word": "",
-        "wrong": [],
-        "lives_status": "0/0",
-        "state": "normal"
-    }
-    _overlay_write(empty, do_refresh=True)
-    _ws_send("game_over")
+def lives_status(wrong_items: list, stages_max: int, bonus_life: int = 0) -> str:
+    return f"{len(wrong_items)}/{stages_max + bonus_life}"
 
 
 # ===============================
-# Játéklogika
+# Játéklogika (egy csatorna egy játékpéldánya)
 # ===============================
-def _roll_theme_and_word(catalog: dict):
-    global current_theme, STAGES_MAX, category, secret_word
-    current_theme = random.choice(list(THEMES.keys()))
-    STAGES_MAX = THEMES[current_theme]
-    category = random.choice(list(catalog.keys()))
-    secret_word = random.choice(catalog[category]).lower()
-
-
-def start_new_game(catalog: dict, starter: str):
-    """Új játék inicializálása. Csak akkor hívd, ha a bot már prepare-ölve van!"""
-    global game_active, game_id, game_starter
-    global guessed_letters, wrong_items, hint_used, state, bonus_life
-
-    if not catalog:
-        print("[⚠️] Üres katalógus – nem indítok játékot.")
-        return
-
-    # tiszta overlay állapot
-    reset_overlay_state()
-    _ws_send("new_game")
-
-    game_active = True
-    game_id = str(uuid.uuid4())
-    game_starter = starter
-
-    guessed_letters = set()
-    wrong_items = []
-    hint_used = False
-    state = "normal"
-    bonus_life = 0
-
-    _roll_theme_and_word(catalog)
-    _save_overlay()
-
-
-async def game_timer(bot, my_id: str):
-    """Automatikus timeout a játékra."""
-    await asyncio.sleep(GAME_DURATION_SECONDS)
-    global game_active
-    if game_active and my_id == game_id:
-        game_active = False
-        try:
-            await bot.connected_channels[0].send(f"!akasztas_to {game_starter}")
-            await bot.connected_channels[0].send(f"❌ Vesztettetek! A szó: {secret_word.upper()}")
-        except Exception:
-            pass
-        _save_overlay()
-        asyncio.create_task(_clear_overlay_after(8.0))
+class HangmanGame(BaseGame):
+    """Az akasztófa teljes állapota és állapotátmenetei.
 
+    Minden publikus metódus szinkron átmenet: az állapotot módosítja, és a
+    végrehajtandó I/O-t (chat, overlay, időzítők) effektlistaként adja vissza.
+    A metódusokat kizárólag a játék GameActor-a hívja, sorban.
+    """
 
-# ===============================
-# Parancsok
-# ===============================
-class HangmanCog(commands.Cog):
-    def __init__(self, bot: commands.Bot, catalog: dict):
-        self.bot = bot
+    name = "akasztofa"
+
+    def __init__(self, channel: str, runtime, catalog: dict, difficulty: DifficultyIndex = None):
+        super().__init__(channel, runtime)
         self.catalog = catalog
-        self.config = load_config()
+        self.difficulty = difficulty    # DifficultyIndex vagy None (egyenletes véletlen választás)
+        self.game_starter = ""
+        self.current_theme = "temeto"
+        self.stages_max = 6
+
+        self.secret_word = ""
+        self.category = ""
+        self.guessed_letters = set()
+        self.wrong_items = []
+        self.last_wrong_guesser = ""
+        self.hint_used = False
+        self.state = "normal"   # 'normal' | 'angel' | stb.
+        self.bonus_life = 0
+        self.started_at = 0.0
+        self.guesses = 0
+
+        # cooldown nyilvántartás
         self.last_global_tip = 0.0
-        self.last_user_tip = {}
+        self.last_user_tip = {}     # user -> utolsó tipp ideje (csak a személyes cooldownon belüliek)
+        self._tips_pruned = 0.0
         self.last_newgame = 0.0
 
-
-    def is_streamer_or_mod(self, ctx):
-        badges = getattr(ctx.author, "badges", {}) or {}
-        channel_name = self.bot.connected_channels[0].name.lower()
-        return (
-            "moderator" in badges
-            or "broadcaster" in badges
-            or ctx.author.name.lower() == channel_name
+        # parancstáblák állapotonként, előre felépítve
+        mod = dict(
+            setangel=Route(self._set_percent("ANGEL_CHANCE", "!setangel 0.5", "😇 Mentőangyal esélye beállítva: {}%"), self, True),
+            setdevil=Route(self._set_percent("DEVIL_CHANCE", "!setdevil 0.25", "😈 Ördög esélye beállítva: {}%"), self, True),
+            setpersonal=Route(self._set_int("PERSONAL_TIPP_COOLDOWN", 0, "👤 Személyes tipp cooldown: {} mp"), self, True),
+            setglobal=Route(self._set_int("GLOBAL_TIPP_COOLDOWN", 0, "🌐 Globális tipp cooldown: {} mp"), self, True),
+            setnewgame=Route(self._set_int("NEW_GAME_COOLDOWN", 0, "🎮 Új játék indítás közti idő: {} mp"), self, True),
+            setduration=Route(self._set_int("GAME_DURATION", 60, "⏱️ Játékidő beállítva: {} mp"), self, True),
+            setdifficulty=Route(self._set_percent("DIFFICULTY", "!setdifficulty 60", "🎯 Célnehézség beállítva: {}%"), self, True),
+            status=Route(lambda ctx: self.status(), self, True),
+            refresh=Route(lambda ctx: self.refresh(), self, True),
         )
-
-    async def check_cooldowns(self, ctx, action="tipp") -> bool:
-        """Globális/személyes/új játék cooldown ellenőrzés."""
-        now = time.time()
-
-        if action == "tipp":
-            gcd = int(self.config.get("GLOBAL_TIPP_COOLDOWN", 0))
-            pcd = int(self.config.get("PERSONAL_TIPP_COOLDOWN", 0))
-
-            # globális cooldown
-            if gcd > 0:
-                delta = now - self.last_global_tip
-                if delta < gcd:
-                    await ctx.send(f"⏳ Várj még {round(gcd-delta,1)} mp-et a következő tipphez (globális cooldown).")
-                    return False
-
-            # személyes cooldown
-            if pcd > 0:
-                user = ctx.author.name.lower()
-                delta = now - self.last_user_tip.get(user, 0.0)
-                if delta < pcd:
-                    await ctx.send(f"⏳ {ctx.author.name}, várj még {round(pcd-delta,1)} mp-et a következő tipphez.")
-                    return False
-
-            # ha engedett → időbélyegek frissítése
-            self.last_global_tip = now
-            self.last_user_tip[ctx.author.name.lower()] = now
-            return True
-
-        elif action == "newgame":
-            ngcd = int(self.config.get("NEW_GAME_COOLDOWN", 0))
-            if ngcd > 0:
-                delta = now - self.last_newgame
-                if delta < ngcd:
-                    await ctx.send(f"⏳ Új játék előtt várj még {round(ngcd-delta,1)} mp-et.")
-                    return False
-            self.last_newgame = now
-            return True
-
-    async def handle_special_events(self, ctx):
-        """Angyal/ördög + veszteség logika, minden rossz tipp után hívódik."""
-        global wrong_items, bonus_life, state, game_active
-
-        # ANGEL: ha elértük a max hibát és még nincs extra élet
-        if len(wrong_items) == STAGES_MAX and bonus_life == 0:
-            if random.random() < self.config.get("ANGEL_CHANCE", 8) / 100.0:
-                bonus_life += 1
-                state = "angel"
-                await ctx.send("😇 Az utolsó pillanatban megmentett titeket a mentőangyal! Még egy esély!")
-                _save_overlay()
-                _ws_send("angel")
-                return
-
-        # DEVIL: kis eséllyel bármelyik rossz tippnél
-        if random.random() < self.config.get("DEVIL_CHANCE", 1) / 100.0:
-            wrong_items.append("😈")
-            await ctx.send(f"😈 Az ördög megjelent — {lives_status()}")
-            _ws_send("devil")
-
-            # veszteség?
-            if len(wrong_items) >= STAGES_MAX + bonus_life:
-                game_active = False
-                _save_overlay()
-                await ctx.send(f"!akasztas_to {ctx.author.name}")
-                await ctx.send(f"❌ Vesztettetek! A szó: {secret_word.upper()}")
-                asyncio.create_task(_clear_overlay_after(8.0))
-                return
-            else:
-                _save_overlay()
-                return
-
-        # normál veszteség
-        if len(wrong_items) >= STAGES_MAX + bonus_life:
-            game_active = False
-            _save_overlay()
-            await ctx.send(f"!akasztas_to {ctx.author.name}")
-            await ctx.send(f"❌ Vesztettetek! A szó: {secret_word.upper()}")
-            asyncio.create_task(_clear_overlay_after(8.0))
-            return
-
-        # állapotmentés
-        _save_overlay()
-
-    @commands.command(name="akasztás")
-    async def akasztas(self, ctx):
-        if not await self.check_cooldowns(ctx, 'newgame'):
+        self._idle_routes = {"akasztás": Route(lambda ctx: self.new_game(ctx.user), self), **mod}
+        self._active_routes = {
+            **self._idle_routes,
+            "tipp": Route(lambda ctx: self.tipp(ctx.user, ctx.arg), self),
+            "hint": Route(lambda ctx: self.hint(ctx.user), self),
+        }
+
+    def start(self):
+        self.actor.start()
+
+    def routes(self):
+        return self._active_routes if self.active else self._idle_routes
+
+    def armed_routes(self):
+        return self._active_routes
+
+    # --------- segédek ---------
+    def lives_status(self) -> str:
+        return lives_status(self.wrong_items, self.stages_max, self.bonus_life)
+
+    def overlay_payload(self) -> dict:
+        return {
+            "theme": self.current_theme,
+            "category": self.category,
+            "word": mask_word(self.secret_word, self.guessed_letters),
+            "wrong": list(self.wrong_items),
+            "lives_status": self.lives_status(),
+            "state": self.state,
+        }
+
+    def _save(self):
+        return Overlay(self.overlay_payload())
+
+    def _reset(self):
+        self.active = False
+        self.game_id = None
+        self.game_starter = ""
+        self.current_theme = ""
+        self.stages_max = 0
+        self.secret_word = ""
+        self.category = ""
+        self.guessed_letters = set()
+        self.wrong_items = []
+        self.last_wrong_guesser = ""
+        self.hint_used = False
+        self.state = "normal"
+        self.bonus_life = 0
+        self.started_at = 0.0
+        self.guesses = 0
+
+    def _roll_theme_and_word(self):
+        if self.difficulty is not None:
+            # téma és szó együtt, hogy az életek száma a szó nehézségéhez illjen
+            theme, self.category, word = self.difficulty.pick(self.config["DIFFICULTY"] / 100.0)
+            self.current_theme = theme
+            self.stages_max = THEMES[theme]
+            self.secret_word = word.lower()
             return
-        """Új játék indítása."""
-        global game_active
-        if game_active:
-            await ctx.send("Már fut egy játék! Tippelj: !tipp X vagy !tipp <szó>")
+        self.current_theme = random.choice(list(THEMES.keys()))
+        self.stages_max = THEMES[self.current_theme]
+        self.category = random.choice(list(self.catalog.keys()))
+        self.secret_word = random.choice(self.catalog[self.category]).lower()
+
+    def _finish(self, effects: list, result: str, event: str = None) -> list:
+        """Játék lezárása: overlay végállapot + takarítás 8 mp múlva."""
+        self.active = False
+        effects.append(self._save())
+        effects.append(Track("end", id=self.game_id, result=result, category=self.category,
+                             length=len(self.secret_word), lives=self.stages_max,
+                             guesses=self.guesses, wrong=len(self.wrong_items), hint=self.hint_used,
+                             bonus_life=self.bonus_life, devils=self.wrong_items.count("😈"),
+                             duration=round(time.time() - self.started_at, 1)))
+        if event:
+            effects.append(Emit(event))
+        effects.append(After(8.0, self.clear, self.game_id, key="clear"))
+        return effects
+
+    def _lose(self, effects: list, user: str) -> list:
+        self._finish(effects, "loss")
+        if user:
+            effects.append(Stat(user, "loss"))
+        effects.append(Say(f"!akasztas_to {user}"))
+        effects.append(Say(f"❌ Vesztettetek! A szó: {self.secret_word.upper()}"))
+        return effects
+
+    def _win(self, effects: list) -> list:
+        self._finish(effects, "win", "victory")
+        effects.append(Say(f"🎉 Nyertetek! A szó: {self.secret_word.upper()}"))
+        return effects
+
+    def _is_solved(self) -> bool:
+        return mask_word(self.secret_word, self.guessed_letters) == self.secret_word
+
+    # --------- állapot átadása ---------
+    _SNAPSHOT_FIELDS = ("active", "game_id", "game_starter", "current_theme", "stages_max",
+                        "secret_word", "category", "wrong_items", "last_wrong_guesser",
+                        "hint_used", "state", "bonus_life", "last_global_tip", "last_user_tip",
+                        "last_newgame", "started_at", "guesses")
+
+    def snapshot(self):
+        state = {f: getattr(self, f) for f in self._SNAPSHOT_FIELDS}
+        state["guessed_letters"] = sorted(self.guessed_letters)
+        return state
+
+    def restore(self, state: dict):
+        for f in self._SNAPSHOT_FIELDS:
+            if f in state:
+                setattr(self, f, state[f])
+        self.guessed_letters = set(state.get("guessed_letters", ()))
+
+    # --------- cooldownok ---------
+    def _check_tipp_cooldown(self, user: str, now: float):
+        """None, ha tippelhet; különben a figyelmeztető üzenet."""
+        gcd = int(self.config.get("GLOBAL_TIPP_COOLDOWN", 0))
+        pcd = int(self.config.get("PERSONAL_TIPP_COOLDOWN", 0))
+
+        # globális cooldown
+        if gcd > 0:
+            delta = now - self.last_global_tip
+            if delta < gcd:
+                return f"⏳ Várj még {round(gcd-delta,1)} mp-et a következő tipphez (globális cooldown)."
+
+        # személyes cooldown
+        if pcd > 0:
+            delta = now - self.last_user_tip.get(user.lower(), 0.0)
+            if delta < pcd:
+                return f"⏳ {user}, várj még {round(pcd-delta,1)} mp-et a következő tipphez."
+
+        # ha engedett → időbélyegek frissítése
+        self.last_global_tip = now
+        if pcd > 0:
+            self.last_user_tip[user.lower()] = now
+            self._prune_user_tips(now, pcd)
+        elif self.last_user_tip:
+            self.last_user_tip = {}
+        return None
+
+    def _prune_user_tips(self, now: float, pcd: int):
+        """A lejárt személyes cooldownok törlése (cooldown-ablakonként egyszer) – különben a
+        szótár minden valaha tippelt nézővel nő, és vele minden pillanatkép / journal-sor."""
+        if now - self._tips_pruned < pcd:
             return
+        self._tips_pruned = now
+        self.last_user_tip = {u: t for u, t in self.last_user_tip.items() if now - t < pcd}
 
-        start_new_game(self.catalog, ctx.author.name)
-        if not game_active:
-            await ctx.send("❌ Nem tudok játékot indítani – üres a szókatalógus.")
-            return
-
-        await ctx.send(f"🪦 Új játék! Kategória: {category} — Tippelj: !tipp X vagy !tipp <szó>")
-        asyncio.create_task(game_timer(self.bot, game_id))
-
-    @commands.command(name="tipp")
-    async def tipp(self, ctx):
+    # --------- átmenetek ---------
+    def new_game(self, starter: str):
+        """Új játék indítása (!akasztás)."""
+        now = time.time()
+        ngcd = int(self.config.get("NEW_GAME_COOLDOWN", 0))
+        if ngcd > 0:
+            delta = now - self.last_newgame
+            if delta < ngcd:
+                return [Say(f"⏳ Új játék előtt várj még {round(ngcd-delta,1)} mp-et.", LOW)]
+        self.last_newgame = now
+
+        if self.active:
+            return [Say("Már fut egy játék! Tippelj: !tipp X vagy !tipp <szó>")]
+        if not self.catalog:
+            self.log.warning("[⚠️] Üres katalógus – nem indítok játékot.")
+            return [Say("❌ Nem tudok játékot indítani – üres a szókatalógus.")]
+
+        self._reset()
+        self.active = True
+        self.game_id = str(uuid.uuid4())
+        self.game_starter = starter
+        self.started_at = now
+        self._roll_theme_and_word()
+
+        duration = self.config["GAME_DURATION"]
+        return [
+            Track("start", id=self.game_id, category=self.category, length=len(self.secret_word),
+                  theme=self.current_theme, lives=self.stages_max, duration_limit=duration),
+            Emit("new_game"),
+            self._save(),
+            Say(f"🪦 Új játék! Kategória: {self.category} — Tippelj: !tipp X vagy !tipp <szó>"),
+            After(duration, self.timeout, self.game_id, key="timeout"),
+        ]
+
+    def tipp(self, user: str, guess: str):
         """Betű- vagy szótipp."""
-        global game_active, last_wrong_guesser, hint_used
-
-        if not game_active:
-            return
+        if not self.active:
+            return None
 
-        if not await self.check_cooldowns(ctx, "tipp"):
-            return
-
-        parts = ctx.message.content.split(maxsplit=1)
-        if len(parts) < 2:
-            return
-        guess = parts[1].strip().lower()
+        warning = self._check_tipp_cooldown(user, time.time())
+        if warning:
+            return [Say(warning, LOW)]
 
-        async def handle_win():
-            global game_active
-            game_active = False
-            _save_overlay()
-            _ws_send("victory")
-            await ctx.send(f"🎉 Nyertetek! A szó: {secret_word.upper()}")
-            asyncio.create_task(_clear_overlay_after(8.0))
+        guess = guess.strip().lower()
+        if not guess:
+            return None
+        self.guesses += 1
 
         # teljes szó tipp
         if len(guess) > 1:
-            if guess == secret_word.lower():
-                await handle_win()
-                return
-            wrong_items.append("🧩")
-            last_wrong_guesser = ctx.author.name
-            await ctx.send(f"❌ Rossz szó tipp — {lives_status()}")
-            await self.handle_special_events(ctx)
-            return
+            if guess == self.secret_word.lower():
+                return self._win([Stat(user, "word", guess), Stat(user, "win"),
+                                  Track("guess", id=self.game_id, user=user, kind="word", hit=True)])
+            self.wrong_items.append("🧩")
+            self.last_wrong_guesser = user
+            effects = [Say(f"❌ Rossz szó tipp — {self.lives_status()}"), Stat(user, "miss", guess),
+                       Track("guess", id=self.game_id, user=user, kind="word", hit=False)]
+            return self._special_events(effects, user)
 
         # egy betű
-        if len(guess) == 1 and guess.isalpha():
-            if guess in guessed_letters or guess.upper() in wrong_items:
-                await ctx.send(f"❗ Már volt: {guess.upper()}")
-                return
-
-            if guess in secret_word.lower():
-                guessed_letters.add(guess)
-                await ctx.send(f"✅ Jó tipp: {guess.upper()}")
-                _save_overlay()
-                if mask_word(secret_word, guessed_letters) == secret_word:
-                    await handle_win()
-                return
-
-            wrong_items.append(guess.upper())
-            last_wrong_guesser = ctx.author.name
-            await ctx.send(f"❌ Rossz tipp: {guess.upper()} — {lives_status()}")
-            await self.handle_special_events(ctx)
-            return
+        if guess.isalpha():
+            if guess in self.guessed_letters or guess.upper() in self.wrong_items:
+                return [Say(f"❗ Már volt: {guess.upper()}", LOW)]
+
+            if guess in self.secret_word.lower():
+                self.guessed_letters.add(guess)
+                effects = [Say(f"✅ Jó tipp: {guess.upper()}"), Stat(user, "hit", guess),
+                           Track("guess", id=self.game_id, user=user, kind="letter", hit=True)]
+                if self._is_solved():
+                    effects.append(Stat(user, "win"))
+                    return self._win(effects)
+                effects.append(self._save())
+                return effects
+
+            self.wrong_items.append(guess.upper())
+            self.last_wrong_guesser = user
+            effects = [Say(f"❌ Rossz tipp: {guess.upper()} — {self.lives_status()}"), Stat(user, "miss", guess),
+                       Track("guess", id=self.game_id, user=user, kind="letter", hit=False)]
+            return self._special_events(effects, user)
         # egyéb input: ignor
+        return None
 
-    @commands.command(name="hint")
-    async def hint(self, ctx):
+    def hint(self, user: str):
         """Felfed egy jó betűt, de +1 hiba (💡)."""
-        global hint_used
-        if not game_active:
-            await ctx.send("❌ Nincs aktív játék!")
-            return
-        if hint_used:
-            await ctx.send("💡 A segítséget már felhasználtátok ebben a játékban!")
-            return
+        if not self.active:
+            return [Say("❌ Nincs aktív játék!", LOW)]
+        if self.hint_used:
+            return [Say("💡 A segítséget már felhasználtátok ebben a játékban!", LOW)]
 
-        hidden = [c.lower() for c in secret_word if c.isalpha() and c.lower() not in guessed_letters]
+        hidden = [c.lower() for c in self.secret_word if c.isalpha() and c.lower() not in self.guessed_letters]
         if not hidden:
-            await ctx.send("💡 Minden betű megvan, nincs mit segíteni!")
-            return
+            return [Say("💡 Minden betű megvan, nincs mit segíteni!")]
 
         letter = random.choice(hidden)
-        guessed_letters.add(letter)
-        wrong_items.append("💡")
-        hint_used = True
+        self.guessed_letters.add(letter)
+        self.wrong_items.append("💡")
+        self.hint_used = True
 
-        await ctx.send(f"💡 Segítség: tartalmazza az „{letter.upper()}” betűt — de ez egy plusz hiba! ({lives_status()})")
+        effects = [Say(f"💡 Segítség: tartalmazza az „{letter.upper()}” betűt — de ez egy plusz hiba! ({self.lives_status()})"),
+                   Stat(user, "hint", letter), Track("hint", id=self.game_id, user=user)]
+        self._special_events(effects, user)
 
-        await self.handle_special_events(ctx)
-
-        if mask_word(secret_word, guessed_letters) == secret_word:
-            await self._win_after_hint(ctx)
-
-    async def _win_after_hint(self, ctx):
-        global game_active
-        game_active = False
-        _save_overlay()
-        _ws_send("victory")
-        await ctx.send(f"🎉 Nyertetek! A szó: {secret_word.upper()}")
-        asyncio.create_task(_clear_overlay_after(8.0))
-
-    # ----- Beállítás parancsok -----
-
-    @commands.command(name="setangel")
-    async def setangel(self, ctx):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        parts = ctx.message.content.split(maxsplit=1)
-        if len(parts) < 2:
-            await ctx.send("❌ Add meg az értéket! Példa: !setangel 0.5")
-            return
-        try:
-            value = float(parts[1].replace(",", "."))
-        except ValueError:
-            await ctx.send("❌ Hibás számformátum! Példa: !setangel 0.5")
-            return
-        value = max(0.0, min(100.0, value))
-        self.config["ANGEL_CHANCE"] = value
-        save_config(self.config)
-        await ctx.send(f"😇 Mentőangyal esélye beállítva: {value}%")
-
-    @commands.command(name="setdevil")
-    async def setdevil(self, ctx):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        parts = ctx.message.content.split(maxsplit=1)
-        if len(parts) < 2:
-            await ctx.send("❌ Add meg az értéket! Példa: !setdevil 0.25")
-            return
-        try:
-            value = float(parts[1].replace(",", "."))
-        except ValueError:
-            await ctx.send("❌ Hibás számformátum! Példa: !setdevil 0.25")
-            return
-        value = max(0.0, min(100.0, value))
-        self.config["DEVIL_CHANCE"] = value
-        save_config(self.config)
-        await ctx.send(f"😈 Ördög esélye beállítva: {value}%")
-
-    @commands.command(name="setpersonal")
-    async def setpersonal(self, ctx, value: int):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        self.config["PERSONAL_TIPP_COOLDOWN"] = max(0, value)
-        save_config(self.config)
-        await ctx.send(f"👤 Személyes tipp cooldown: {value} mp")
+        if self.active and self._is_solved():
+            effects.append(Stat(user, "win"))
+            self._win(effects)
+        return effects
 
-    @commands.command(name="setglobal")
-    async def setglobal(self, ctx, value: int):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        self.config["GLOBAL_TIPP_COOLDOWN"] = max(0, value)
-        save_config(self.config)
-        await ctx.send(f"🌐 Globális tipp cooldown: {value} mp")
+    def _special_events(self, effects: list, user: str) -> list:
+        """Angyal/ördög + veszteség logika, minden rossz tipp után hívódik."""
+        # ANGEL: ha elértük a max hibát és még nincs extra élet
+        if len(self.wrong_items) == self.stages_max and self.bonus_life == 0:
+            if random.random() < self.config.get("ANGEL_CHANCE", 8) / 100.0:
+                self.bonus_life += 1
+                self.state = "angel"
+                effects.append(Say("😇 Az utolsó pillanatban megmentett titeket a mentőangyal! Még egy esély!"))
+                effects.append(self._save())
+                effects.append(Emit("angel"))
+                effects.append(Stat(user, "angel"))
+                effects.append(Track("angel", id=self.game_id, user=user, wrong=len(self.wrong_items)))
+                return effects
 
-    @commands.command(name="setnewgame")
-    async def setnewgame(self, ctx, value: int):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        self.config["NEW_GAME_COOLDOWN"] = max(0, value)
-        save_config(self.config)
-        await ctx.send(f"🎮 Új játék indítás közti idő: {value} mp")
+        # DEVIL: kis eséllyel bármelyik rossz tippnél
+        if random.random() < self.config.get("DEVIL_CHANCE", 1) / 100.0:
+            self.wrong_items.append("😈")
+            effects.append(Say(f"😈 Az ördög megjelent — {self.lives_status()}"))
+            effects.append(Emit("devil"))
+            effects.append(Stat(user, "devil"))
+            effects.append(Track("devil", id=self.game_id, user=user, wrong=len(self.wrong_items)))
 
-    @commands.command(name="setduration")
-    async def setduration(self, ctx, value: int):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        self.config["GAME_DURATION"] = max(60, value)
-        save_config(self.config)
-        await ctx.send(f"⏱️ Játékidő beállítva: {value} mp")
+        # veszteség?
+        if len(self.wrong_items) >= self.stages_max + self.bonus_life:
+            return self._lose(effects, user)
 
-    @commands.command(name="status")
-    async def status(self, ctx):
-        if not self.is_streamer_or_mod(ctx):
-            return
+        # állapotmentés
+        effects.append(self._save())
+        return effects
+
+    def timeout(self, my_id: str):
+        """Automatikus timeout a játékra."""
+        if not self.active or my_id != self.game_id:
+            return None
+        return self._lose([Track("timeout", id=self.game_id, category=self.category)], self.game_starter)
+
+    def clear(self, my_id: str):
+        """Végállapot megjelenítése után takarítás & overlay törlés."""
+        if my_id != self.game_id or self.active:
+            return None
+        self._reset()
+        # overlay állapot elengedése + refresh + game_over jelzés
+        return [Overlay(None), Emit("game_over")]
+
+    def refresh(self):
+        return [self._save(), Say("🔄 Overlay frissítve!", HIGH)]
+
+    def status(self):
         msg = (
             "📊 **Játék beállítások:**\n"
             f"😇 Mentőangyal esély: {self.config['ANGEL_CHANCE']}%\n"
@@ -548,72 +567,69 @@ class HangmanCog(commands.Cog):
             f"👤 Személyes tipp cooldown: {self.config['PERSONAL_TIPP_COOLDOWN']} mp\n"
             f"🌐 Globális tipp cooldown: {self.config['GLOBAL_TIPP_COOLDOWN']} mp\n"
             f"🎮 Új játék indítás közti idő: {self.config['NEW_GAME_COOLDOWN']} mp\n"
-            f"⏱️ Játékidő: {self.config['GAME_DURATION']} mp"
+            f"⏱️ Játékidő: {self.config['GAME_DURATION']} mp\n"
+            f"🎯 Célnehézség: {self.config['DIFFICULTY']}%"
+            + ("" if self.difficulty is not None else " (nincs kalibrált katalógus)")
         )
-        await ctx.send(msg)
-
-    @commands.command(name="refresh")
-    async def refresh_overlay(self, ctx):
-        if not self.is_streamer_or_mod(ctx):
-            return
-        _save_overlay()
-        await ctx.send("🔄 Overlay frissítve!")
+        return [Say(msg, HIGH)]
 
-    @commands.command(name="stop")
-    async def stop_module(self, ctx):
-        """Leállítja az akasztófa modult, hogy másik játék indítható legyen."""
-        global game_active, game_id, game_starter
-
-        if not self.is_streamer_or_mod(ctx):
-            await ctx.send("❌ Nincs jogosultságod leállítani a modult.")
-            return
-
-        # ha fut épp játék, azt is lezárja
-        game_active = False
-        game_id = None
-        game_starter = ""
-
-        # overlay törlés
-        reset_overlay_state()
-        _ws_send("game_over")
+    # ----- Beállítás parancsok -----
 
-        # saját cog eltávolítása a botból
+    def set_config(self, key: str, value, reply: str):
         try:
-            self.bot.remove_cog("HangmanCog")
-            await ctx.send("🛑 Akasztófa modul leállítva. Új játék betölthető.")
-        except Exception as e:
-            await ctx.send(f"⚠️ Nem sikerült leállítani: {e}")
+            self.config = self.runtime.config.set(self.name, key, value, self.channel)
+        except ConfigError as e:
+            return [Say(f"❌ Hibás érték: {e}", HIGH)]
+        return [Say(reply, HIGH)]
+
+    def _set_percent(self, key: str, example: str, reply: str):
+        def handler(ctx):
+            if not ctx.arg:
+                return [Say(f"❌ Add meg az értéket! Példa: {example}", HIGH)]
+            try:
+                value = float(ctx.arg.replace(",", "."))
+            except ValueError:
+                return [Say(f"❌ Hibás számformátum! Példa: {example}", HIGH)]
+            value = max(0.0, min(100.0, value))
+            return self.set_config(key, value, reply.format(value))
+        return handler
+
+    def _set_int(self, key: str, minimum: int, reply: str):
+        def handler(ctx):
+            try:
+                value = int(ctx.first_arg())
+            except (TypeError, ValueError):
+                return [Say(f"❌ Add meg az értéket egész számként! Példa: !{ctx.command} 5", HIGH)]
+            return self.set_config(key, max(minimum, value), reply.format(value))
+        return handler
+
+    def stop(self):
+        """Futó játék lezárása modul-leállításkor."""
+        was_active = self.active
+        self.active = False
+        self.game_id = None
+        self.game_starter = ""
+        effects = [Overlay(None), Emit("game_over")]
+        if was_active:
+            effects.append(Say("🛑 Akasztófa leállítva. Új játék betölthető.", HIGH))
+        return effects
 
 
 # ===============================
-# Modul belépési pontok a fő botnak
+# Modul belépési pont a fő botnak
 # ===============================
-def reset_overlay_state():
-    """Overlay állapotának tiszta alaphelyzetbe hozása."""
-    empty = {
-        "theme": "",
-        "category": "",
-        "word": "",
-        "wrong": [],
-        "lives_status": "0/0",
-        "state": "normal"
-    }
-    OVERLAY_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OVERLAY_DATA, "w", encoding="utf-8") as f:
-        json.dump(empty, f, ensure_ascii=False, indent=2)
-    print("[🧹] Overlay állapot alaphelyzetbe állítva.")
-
-
-def prepare(bot):
+def prepare(runtime):
     """
-    A main_bot `!indit akasztofa` hívásában ezt futtatja:
-      - beállítjuk a HostAPI-t
-      - regisztráljuk a parancsokat (Cog)
+    A GameRuntime első használatkor (`!indit akasztofa` vagy `!akasztás`) ezt futtatja:
+      - felvesszük a beállítások sémáját (a régi games/akasztofa/config.json átköltözik)
+      - betöltjük a szókatalógust (egyszer, minden csatorna közösen használja) és – ha van
+        friss – a kalibrált nehézségeket (tools/word_difficulty.py)
+      - regisztráljuk a játékot; a csatornánkénti példányt (saját beállításokkal,
+        cooldownokkal) a runtime hozza létre első használatkor
     """
-    global _host_api
-    _host_api = getattr(bot, "host", None)
-    if not _host_api:
-        print("[❌] Nincs HostAPI a boton!")
+    runtime.config.register("akasztofa", CONFIG_SCHEMA)
+    migrate_legacy_config(runtime.config)
     catalog = load_catalog()
-    bot.add_cog(HangmanCog(bot, catalog))
-    print("[✅] Akasztofa modul csatlakoztatva a főbothoz.")
+    difficulty = load_difficulty(catalog)
+    runtime.register("akasztofa", lambda channel: HangmanGame(channel, runtime, catalog, difficulty))
+    log.info("[✅] Akasztofa modul csatlakoztatva a főbothoz.")
@@ -1,52 +1,47 @@
-import asyncio
-import json
 import random
 import time
-from pathlib import Path
-from twitchio.ext import commands
 
-# ===============================
-# 🔧 Könnyen módosítható beállítások
-# ===============================
-CHALLENGE_TIMEOUT = 180       # kihívás érvényessége (mp)
-AI_REPLY_WINDOW   = 30        # kihívás lejárta után ennyi ideig írhat a kihívó: !igen (mp)
-MOVE_TIMEOUT      = 60        # egy játékos ennyi ideig léphet (mp) – utána automatikus lépés
-OVERLAY_CLEAR_DELAY = 8       # játék vége után ennyi idővel ürítjük az overlay-t (mp)
-AI_THINK_DELAY      = (1.0, 2.0)  # AI "gondolkodási" idő (mp) min/max
-
-# játéktípusok: (mode, size_or_rows, win_cond)
-# - "amoeba": size x size tábla, 5 kell
-# - "connect4": 6x7 tábla fix, 4 kell
-BOARD_TYPES = [
-    ("amoeba",   13, 5),
-    ("amoeba",   19, 5),
-    ("connect4",  6, 4),  # 6x7 fix a kódban
-]
+from core.actor import After, Cancel, Emit, Overlay, Say, Stat, Track
+from core.config import ConfigError, Field
+from core.log import get_logger
+from core.metrics import AI_THINK_SECONDS
+from core.outbound import HIGH, LOW
+from core.router import Route
+from game_interface import BaseGame
+
+log = get_logger("game.amoeba")
 
 # ===============================
-# Overlay + HostAPI
+# 🔧 Beállítások (a gyökér config.json "amoeba" szekciója)
 # ===============================
-OVERLAY_DIR = Path(__file__).resolve().parents[2] / "overlay"
-OVERLAY_DATA = OVERLAY_DIR / "data.json"
-_host_api = None  # main_bot.prepare() injektálja
-
-def _ws_send(event_name: str):
-    """WebSocket-trigger az overlaynek (ha a főbot biztosít HostAPI-t)."""
-    if _host_api:
-        try:
-            _host_api.ws_broadcast({"event": event_name, "game": "amoeba"})
-        except Exception:
-            pass
-
-def _overlay_write(payload: dict, do_refresh: bool = True):
-    OVERLAY_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OVERLAY_DATA, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    if do_refresh:
-        _ws_send("refresh")
-
-def _clear_overlay():
-    _overlay_write({}, do_refresh=True)
+def _check_think_delay(value):
+    if len(value) != 2 or not all(isinstance(v, (int, float)) for v in value) or not 0 <= value[0] <= value[1]:
+        raise ConfigError("[min, max] mp kell (0 <= min <= max)")
+    return value
+
+
+def _check_board_types(value):
+    # játéktípusok: [mode, size_or_rows, win_cond]
+    # - "amoeba": size x size tábla, 5 kell
+    # - "connect4": 6x7 tábla fix, 4 kell
+    if not value:
+        raise ConfigError("legalább egy táblatípus kell")
+    for item in value:
+        if (not isinstance(item, (list, tuple)) or len(item) != 3 or item[0] not in ("amoeba", "connect4")
+                or not all(isinstance(v, int) for v in item[1:]) or not 3 <= item[2] <= item[1] <= 26):
+            raise ConfigError(f"hibás táblatípus: {item!r} (pl. [\"amoeba\", 13, 5])")
+    return value
+
+
+CONFIG_SCHEMA = {
+    "CHALLENGE_TIMEOUT": Field(int, 180, 10),       # kihívás érvényessége (mp)
+    "AI_REPLY_WINDOW": Field(int, 30, 5),           # kihívás lejárta után ennyi ideig írhat a kihívó: !igen (mp)
+    "MOVE_TIMEOUT": Field(int, 60, 10),             # egy játékos ennyi ideig léphet (mp) – utána automatikus lépés
+    "OVERLAY_CLEAR_DELAY": Field(int, 8, 0),        # játék vége után ennyi idővel ürítjük az overlay-t (mp)
+    "AI_THINK_DELAY": Field(list, [1.0, 2.0], check=_check_think_delay),   # AI "gondolkodási" idő min/max
+    "BOARD_TYPES": Field(list, [["amoeba", 13, 5], ["amoeba", 19, 5], ["connect4", 6, 4]],
+                         check=_check_board_types),
+}
 
 # ===============================
 # Tábla és játékmenet
@@ -69,6 +64,8 @@ class GameBoard:
         self.active = False
         self.is_ai = False
         self.last_move_ts = 0.0
+        self.started_at = 0.0
+        self.moves = 0
 
     def start(self, p1, p2, ai=False):
         self.player1 = p1
@@ -77,12 +74,27 @@ class GameBoard:
         self.winner = ""
         self.is_ai = ai
         self.active = True
-        self.last_move_ts = time.time()
-        self._save()
-        _ws_send("new_game")
-
-    def _save(self):
-        _overlay_write(self.to_dict())
+        self.last_move_ts = self.started_at = time.time()
+
+    # a pillanatképben a tábla soronként egy rövid szöveg ('.', 'x', 'o') – ez megy
+    # minden lépés után a journalba, így a 19x19-es tábla sem drága
+    _CODE_CELLS = {".": " ", "x": "☠️", "o": "🩸"}
+
+    def snapshot(self) -> dict:
+        """A tábla teljes állapota (átadáshoz, journalhoz)."""
+        state = dict(self.__dict__)
+        state["board"] = ["".join(row).replace(" ", ".").replace("☠️", "x").replace("🩸", "o")
+                          for row in self.board]
+        return state
+
+    @classmethod
+    def from_snapshot(cls, state: dict):
+        board = cls.__new__(cls)
+        board.started_at = state.get("last_move_ts", 0.0)   # régebbi pillanatképben nincs
+        board.__dict__.update(state)
+        cells = cls._CODE_CELLS
+        board.board = [[cells[ch] for ch in row] for row in state["board"]]
+        return board
 
     def to_dict(self):
         return {
@@ -124,27 +136,23 @@ class GameBoard:
 
         # beírjuk a lépést
         self.board[row][col] = mark
+        self.moves += 1
 
         # győzelem?
         if self._check_victory(row, col, mark):
             self.active = False
             self.winner = player
-            self._save()
-            asyncio.create_task(self._auto_clear_overlay())
             return f"🏆 {player} nyert! ({mark})"
 
         # döntetlen?
         if all(cell != " " for r in self.board for cell in r):
             self.active = False
             self.winner = "Döntetlen"
-            self._save()
-            asyncio.create_task(self._auto_clear_overlay())
             return "🤝 Döntetlen!"
 
         # következő játékos
         self.current_player = self.player2 if self.current_player == self.player1 else self.player1
         self.last_move_ts = time.time()
-        self._save()
         return f"✅ {mark} — {self.current_player} következik."
 
     # --------- győzelem ellenőrzés ----------
@@ -164,10 +172,6 @@ class GameBoard:
                 return True
         return False
 
-    async def _auto_clear_overlay(self):
-        await asyncio.sleep(OVERLAY_CLEAR_DELAY)
-        _clear_overlay()
-
     # --------- AI (heurisztikus) ----------
     def _count_dir(self, r, c, dr, dc, mark):
         cnt = 0
@@ -178,15 +182,19 @@ class GameBoard:
                 rr += dr*d; cc += dc*d
         return cnt
 
-    def smart_ai_move(self):
-        """Amoeba: támadás+védekezés; Connect4: egyszerű pontozás oszlopokra."""
+    def smart_ai_move(self, mark="🩸", defense=1.5):
+        """Amoeba: támadás+védekezés; Connect4: egyszerű pontozás oszlopokra.
+
+        `mark` a lépő jele (a bot AI-ja mindig a 2. játékos), `defense` az ellenfél
+        soraira adott súly (a self-play bajnokság hangolja).
+        """
         if self.mode == "connect4":
             return self._connect4_best_column()
 
         best_score = -1
         best_moves = []
-        mark_ai = "🩸"
-        mark_pl = "☠️"
+        mark_ai = mark
+        mark_pl = "☠️" if mark == "🩸" else "🩸"
 
         for r in range(self.rows):
             for c in range(self.cols):
@@ -197,7 +205,7 @@ class GameBoard:
                     ai_cnt = self._count_dir(r, c, dr, dc, mark_ai)
                     pl_cnt = self._count_dir(r, c, dr, dc, mark_pl)
                     score += ai_cnt ** 2
-                    score += (pl_cnt ** 2) * 1.5
+                    score += (pl_cnt ** 2) * defense
                 if score > best_score:
                     best_score = score
                     best_moves = [(r, c)]
@@ -230,221 +238,315 @@ class GameBoard:
         return scores[0][1]
 
 # ===============================
-# Twitch Cog
+# Játékmenet (egy csatorna egy példánya)
 # ===============================
-class AmoebaCog(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
+AI_NAME = "🤖 AI_BOT"
+
+
+def format_coord(mode: str, move) -> str:
+    if mode == "connect4":
+        return f"oszlop {move+1}"
+    r, c = move
+    return f"{chr(65+c)}{r+1}"
+
+
+def parse_coord(mode: str, coord: str):
+    """Chat-koordináta → lépés. Connect4: oszlopindex, amoeba: (sor, oszlop). Hibánál None."""
+    token = coord.strip()
+    if not token:
+        return None
+    if mode == "connect4":
+        # engedjük: szám (1..7) vagy betű (A..G)
+        if token.isdigit():
+            return int(token) - 1
+        return ord(token[0].upper()) - 65
+    try:
+        return int(token[1:]) - 1, ord(token[0].upper()) - 65
+    except ValueError:
+        return None
+
+
+class AmoebaGame(BaseGame):
+    """Kihívás, AI-ajánlat és a futó tábla állapota, szinkron átmenetekkel.
+
+    Minden I/O (chat, overlay, időzítők) effektként megy vissza a GameActor-nak.
+    """
+
+    name = "amoeba"
+
+    def __init__(self, channel: str, runtime):
+        super().__init__(channel, runtime)
         self.challenge = None             # {"type":"open"|"direct","challenger":str,"target":str|None,"since":ts}
         self.ai_offer_for = None          # kihívó neve, ha AI felajánlás aktív
         self.ai_offer_deadline = 0.0
         self.game: GameBoard | None = None
-        self._move_timer_task = None
-
-    # --------- segéd: jogosultság ---------
-    def is_streamer_or_mod(self, ctx):
-        badges = getattr(ctx.author, "badges", {}) or {}
-        channel_name = self.bot.connected_channels[0].name.lower() if self.bot.connected_channels else ""
-        return ("moderator" in badges) or ("broadcaster" in badges) or (ctx.author.name.lower() == channel_name)
-
-    # --------- lépésidő figyelő ---------
-    async def _move_timer(self, ctx):
-        while self.game and self.game.active:
-            await asyncio.sleep(2)
-            if time.time() - self.game.last_move_ts >= MOVE_TIMEOUT:
-                # automatikus (okos) lépés a soron következő játékosnak
-                who = self.game.current_player
-                if self.game.mode == "connect4":
-                    col = self.game._connect4_best_column()
-                    if col is None:
-                        # minden oszlop tele – döntetlen felé, de próbálunk még egy randomot
-                        free_cols = [c for c in range(self.game.cols) if self.game.board[0][c] == " "]
-                        if not free_cols:
-                            return
-                        col = random.choice(free_cols)
-                    await ctx.send(f"⏰ {who} nem lépett időben — automatikus lépés: oszlop {col+1}")
-                    res = self.game.make_move(who, col)
-                    if res:
-                        await ctx.send(res)
-                else:
-                    mv = self.game.smart_ai_move()
-                    if not mv:
-                        return
-                    r, c = mv
-                    await ctx.send(f"⏰ {who} nem lépett időben — automatikus lépés: {chr(65+c)}{r+1}")
-                    res = self.game.make_move(who, (r, c))
-                    if res:
-                        await ctx.send(res)
-
-    def _restart_move_timer(self, ctx):
-        if self._move_timer_task and not self._move_timer_task.done():
-            self._move_timer_task.cancel()
-        self._move_timer_task = asyncio.create_task(self._move_timer(ctx))
-
-    # --------- parancsok ---------
-    @commands.command(name="kihívás", aliases=["kihivas","kihív","kihiv"])
-    async def kihivas(self, ctx, target: str = None):
+        self.game_no = 0                  # minden új táblánál nő – az elavult időzítők kiszűrésére
+
+        # parancstáblák állapotonként, előre felépítve
+        challenge = Route(lambda ctx: self.challenge_cmd(ctx.user, ctx.first_arg()), self)
+        self._idle_routes = {name: challenge for name in ("kihívás", "kihivas", "kihív", "kihiv")}
+        accept = Route(lambda ctx: self.accept(ctx.user), self)
+        self._challenge_routes = {**self._idle_routes, "elfogad": accept, "accept": accept}
+        self._offer_routes = {**self._idle_routes, "igen": Route(lambda ctx: self.ai_yes(ctx.user), self)}
+        move = Route(lambda ctx: self.move(ctx.user, ctx.first_arg()), self)
+        self._play_routes = {**self._idle_routes, "lép": move, "lep": move}
+        self._all_routes = {**self._challenge_routes, **self._offer_routes, **self._play_routes}
+
+    def start(self):
+        self.actor.start()
+
+    def routes(self):
+        if self.game and self.game.active:
+            return self._play_routes
+        if self.challenge:
+            return self._challenge_routes
+        if self.ai_offer_for:
+            return self._offer_routes
+        return self._idle_routes
+
+    def armed_routes(self):
+        return self._all_routes
+
+    def _transitioned(self):
+        self.active = self.routes() is not self._idle_routes
+        super()._transitioned()
+
+    # --------- segédek ---------
+    def is_active_player(self, user: str) -> bool:
+        g = self.game
+        return bool(g and g.active and user in (g.player1.lower(), g.player2.lower()))
+
+    def _overlay(self):
+        return Overlay(self.game.to_dict())
+
+    def _start_board(self, p1: str, p2: str, ai: bool) -> list:
+        mode, size_or_rows, win = random.choice(self.config["BOARD_TYPES"])
+        self.challenge = None
+        self.ai_offer_for = None
+        self.ai_offer_deadline = 0.0
+        self.game_no += 1
+
+        self.game = GameBoard(mode, size_or_rows, win)
+        self.game.start(p1, p2, ai=ai)
+        return [
+            Track("start", id=self.game_no, mode=mode, size=f"{self.game.rows}x{self.game.cols}",
+                  win=win, ai=ai),
+            self._overlay(),
+            Emit("new_game"),
+            Cancel("challenge"),
+            Cancel("ai_offer"),
+        ]
+
+    def _after_move(self, effects: list, result: str) -> list:
+        """Sikeres lépés utáni közös teendők: overlay, chat, időzítők, AI."""
+        g = self.game
+        effects.append(self._overlay())
+        if result:
+            effects.append(Say(result))
+        if not g.active:
+            effects.extend(self._result_stats())
+            effects.append(Track("end", id=self.game_no, mode=g.mode, size=f"{g.rows}x{g.cols}",
+                                 ai=g.is_ai, result="draw" if g.winner == "Döntetlen" else "win",
+                                 winner_ai=g.winner == AI_NAME, moves=g.moves,
+                                 duration=round(time.time() - g.started_at, 1)))
+            effects.append(Cancel("move"))
+            effects.append(Cancel("ai"))
+            effects.append(After(self.config["OVERLAY_CLEAR_DELAY"], self.clear_overlay, self.game_no, key="clear"))
+            return effects
+
+        # újraindítjuk a lépésidő-figyelőt
+        effects.append(After(self.config["MOVE_TIMEOUT"], self.move_timeout, self.game_no, g.moves, key="move"))
+
+        # AI lép, ha ő következik
+        if g.is_ai and g.current_player == AI_NAME:
+            effects.append(After(random.uniform(*self.config["AI_THINK_DELAY"]), self.ai_move, self.game_no, g.moves, key="ai"))
+        return effects
+
+    def _result_stats(self) -> list:
+        """Meccs végi statisztika (az AI nem kerül a toplistára)."""
+        g = self.game
+        players = [p for p in (g.player1, g.player2) if p and p != AI_NAME]
+        if g.winner == "Döntetlen":
+            return [Stat(p, "draw") for p in players]
+        return [Stat(p, "win" if p == g.winner else "loss") for p in players]
+
+    def _best_move(self):
+        """AI / automatikus lépés választása (az időt a bot_ai_think_seconds metrika méri)."""
+        t0 = time.perf_counter()
+        mv = self._choose_move()
+        AI_THINK_SECONDS.observe(time.perf_counter() - t0, (self.game.mode,))
+        return mv
+
+    def _choose_move(self):
+        g = self.game
+        if g.mode == "connect4":
+            col = g._connect4_best_column()
+            if col is None:
+                # fallback: bármelyik nem tele oszlop
+                free_cols = [c for c in range(g.cols) if g.board[0][c] == " "]
+                if not free_cols:
+                    return None
+                col = random.choice(free_cols)
+            return col
+        return g.smart_ai_move()
+
+    # --------- állapot átadása ---------
+    def snapshot(self):
+        return {
+            "challenge": self.challenge,
+            "ai_offer_for": self.ai_offer_for,
+            "ai_offer_deadline": self.ai_offer_deadline,
+            "game_no": self.game_no,
+            "game": self.game.snapshot() if self.game else None,
+        }
+
+    def restore(self, state: dict):
+        self.challenge = state.get("challenge")
+        self.ai_offer_for = state.get("ai_offer_for")
+        self.ai_offer_deadline = state.get("ai_offer_deadline", 0.0)
+        self.game_no = state.get("game_no", 0)
+        board = state.get("game")
+        self.game = GameBoard.from_snapshot(board) if board else None
+
+    # --------- kihívás ---------
+    def challenge_cmd(self, user: str, target: str = None):
         if self.challenge:
-            await ctx.send("⚠️ Már van függőben lévő kihívás!")
-            return
+            return [Say("⚠️ Már van függőben lévő kihívás!", LOW)]
         if self.game and self.game.active:
-            await ctx.send("❌ Már fut egy játék.")
-            return
+            return [Say("❌ Már fut egy játék.")]
         if target is not None and not target.strip():
-            await ctx.send("❌ Adj meg érvényes játékosnevet, vagy használd: !kihívás nyílt")
-            return
+            return [Say("❌ Adj meg érvényes játékosnevet, vagy használd: !kihívás nyílt")]
 
+        now = time.time()
         if not target or target.lower() == "nyílt":
-            self.challenge = {"type": "open", "challenger": ctx.author.name, "target": None, "since": time.time()}
-            await ctx.send("📢 Nyílt kihívás indítva! Használd: !elfogad")
+            self.challenge = {"type": "open", "challenger": user, "target": None, "since": now}
+            effects = [Say("📢 Nyílt kihívás indítva! Használd: !elfogad")]
         else:
-            self.challenge = {"type": "direct", "challenger": ctx.author.name, "target": target, "since": time.time()}
-            await ctx.send(f"🎯 {ctx.author.name} kihívta {target}-ot egy játékra! Elfogadod? (!elfogad)")
-
-        async def expire():
-            await asyncio.sleep(CHALLENGE_TIMEOUT)
-            if self.challenge and (time.time() - self.challenge["since"]) >= CHALLENGE_TIMEOUT:
-                challenger = self.challenge["challenger"]
-                self.challenge = None
-                self.ai_offer_for = challenger
-                self.ai_offer_deadline = time.time() + AI_REPLY_WINDOW
-                await ctx.send("⏳ Senki sem fogadta el a kihívást. Szeretnél AI ellen játszani? Írd: !igen")
-                await asyncio.sleep(AI_REPLY_WINDOW)
-                if self.ai_offer_for and time.time() > self.ai_offer_deadline:
-                    await ctx.send("⌛ Az AI-ajánlat lejárt.")
-                    self.ai_offer_for = None
-                    self.ai_offer_deadline = 0.0
-        asyncio.create_task(expire())
-
-    @commands.command(name="elfogad", aliases=["accept"])
-    async def elfogad(self, ctx):
-        if not self.challenge:
-            await ctx.send("❌ Nincs függőben kihívás.")
-            return
-        ch = self.challenge
-        if ch["type"] == "direct" and ctx.author.name.lower() != ch["target"].lower():
-            await ctx.send("❌ Ezt a kihívást nem neked szánták.")
-            return
+            self.challenge = {"type": "direct", "challenger": user, "target": target, "since": now}
+            effects = [Say(f"🎯 {user} kihívta {target}-ot egy játékra! Elfogadod? (!elfogad)")]
+        effects.append(After(self.config["CHALLENGE_TIMEOUT"], self.challenge_expired, now, key="challenge"))
+        return effects
 
-        mode, size_or_rows, win = random.choice(BOARD_TYPES)
-        p1 = ch["challenger"]
-        p2 = ctx.author.name
+    def challenge_expired(self, since: float):
+        if not self.challenge or self.challenge["since"] != since:
+            return None
+        challenger = self.challenge["challenger"]
         self.challenge = None
+        self.ai_offer_for = challenger
+        self.ai_offer_deadline = time.time() + self.config["AI_REPLY_WINDOW"]
+        return [
+            Say("⏳ Senki sem fogadta el a kihívást. Szeretnél AI ellen játszani? Írd: !igen"),
+            After(self.config["AI_REPLY_WINDOW"], self.ai_offer_expired, challenger, key="ai_offer"),
+        ]
+
+    def ai_offer_expired(self, challenger: str):
+        if self.ai_offer_for != challenger or time.time() < self.ai_offer_deadline:
+            return None
         self.ai_offer_for = None
         self.ai_offer_deadline = 0.0
+        return [Say("⌛ Az AI-ajánlat lejárt.")]
 
-        self.game = GameBoard(mode, size_or_rows, win)
-        self.game.start(p1, p2, ai=False)
-        await ctx.send(f"🎮 Játék indult: {p1} ☠️ vs {p2} 🩸 — {p1} kezd!")
-        self._restart_move_timer(ctx)
-
-    @commands.command(name="igen")
-    async def igen(self, ctx):
-        if not self.ai_offer_for or ctx.author.name != self.ai_offer_for:
-            return
+    def accept(self, user: str):
+        if not self.challenge:
+            return [Say("❌ Nincs függőben kihívás.", LOW)]
+        ch = self.challenge
+        if ch["type"] == "direct" and user.lower() != ch["target"].lower():
+            return [Say("❌ Ezt a kihívást nem neked szánták.", LOW)]
+
+        p1 = ch["challenger"]
+        effects = self._start_board(p1, user, ai=False)
+        effects.append(Say(f"🎮 Játék indult: {p1} ☠️ vs {user} 🩸 — {p1} kezd!"))
+        effects.append(After(self.config["MOVE_TIMEOUT"], self.move_timeout, self.game_no, 0, key="move"))
+        return effects
+
+    def ai_yes(self, user: str):
+        if not self.ai_offer_for or user != self.ai_offer_for:
+            return None
         if time.time() > self.ai_offer_deadline:
-            await ctx.send("⌛ Az AI-ajánlat lejárt.")
             self.ai_offer_for = None
             self.ai_offer_deadline = 0.0
-            return
+            return [Say("⌛ Az AI-ajánlat lejárt.")]
 
-        mode, size_or_rows, win = random.choice(BOARD_TYPES)
         p1 = self.ai_offer_for
-        p2 = "🤖 AI_BOT"
-        self.ai_offer_for = None
-        self.ai_offer_deadline = 0.0
-
-        self.game = GameBoard(mode, size_or_rows, win)
-        self.game.start(p1, p2, ai=True)
-        await ctx.send(f"🎮 Játék indult: {p1} ☠️ vs 🤖 AI_BOT 🩸 — {p1} kezd!")
-        self._restart_move_timer(ctx)
-
-    @commands.command(name="lép", aliases=["lep"])
-    async def lep(self, ctx, coord: str = None):
-        if not self.game or not self.game.active:
-            await ctx.send("❌ Nincs aktív játék.")
-            return
+        effects = self._start_board(p1, AI_NAME, ai=True)
+        effects.append(Say(f"🎮 Játék indult: {p1} ☠️ vs 🤖 AI_BOT 🩸 — {p1} kezd!"))
+        effects.append(After(self.config["MOVE_TIMEOUT"], self.move_timeout, self.game_no, 0, key="move"))
+        return effects
+
+    # --------- lépések ---------
+    def move(self, user: str, coord: str = None):
+        g = self.game
+        if not g or not g.active:
+            return [Say("❌ Nincs aktív játék.", LOW)]
         if not coord:
-            await ctx.send("Használat: !lép A1 (amoeba) vagy !lép 3 / !lép C (negyedelő)")
-            return
-
-        # játékos lépése
-        if self.game.mode == "connect4":
-            token = coord.strip()
-            # engedjük: szám (1..7) vagy betű (A..G)
-            if token.isdigit():
-                col = int(token) - 1
-            else:
-                col = ord(token[0].upper()) - 65
-            result = self.game.make_move(ctx.author.name, col)
-            if result:
-                await ctx.send(result)
+            return [Say("Használat: !lép A1 (amoeba) vagy !lép 3 / !lép C (negyedelő)", LOW)]
+
+        mv = parse_coord(g.mode, coord)
+        if mv is None:
+            return [Say("❌ Érvénytelen koordináta! Pl: A1, B7, H12")]
+
+        before = g.moves
+        result = g.make_move(user, mv)
+        if g.moves == before:
+            # nem ő jön, vagy érvénytelen lépés – az állapot nem változott
+            return [Say(result)] if result else None
+        return self._after_move([Track("move", id=self.game_no, user=user, n=g.moves)], result)
+
+    def move_timeout(self, game_no: int, moves: int):
+        """Lépésidő lejárt: automatikus (okos) lépés a soron következő játékosnak."""
+        g = self.game
+        if not g or not g.active or game_no != self.game_no or g.moves != moves:
+            return None
+        who = g.current_player
+        mv = self._best_move()
+        if mv is None:
+            return None
+        effects = [Say(f"⏰ {who} nem lépett időben — automatikus lépés: {format_coord(g.mode, mv)}")]
+        result = g.make_move(who, mv)
+        effects.append(Track("timeout", id=self.game_no, user=who, n=g.moves, mode=g.mode,
+                             size=f"{g.rows}x{g.cols}"))
+        return self._after_move(effects, result)
+
+    def ai_move(self, game_no: int, moves: int):
+        g = self.game
+        if not g or not g.active or game_no != self.game_no or g.moves != moves:
+            return None
+        if g.current_player != AI_NAME:
+            return None
+        mv = self._best_move()
+        if mv is None:
+            return None
+        result = g.make_move(AI_NAME, mv)
+        if g.mode == "connect4":
+            effects = [Say(f"🤖 AI lép oszlop: {mv+1}")]
         else:
-            try:
-                col = ord(coord[0].upper()) - 65
-                row = int(coord[1:]) - 1
-            except Exception:
-                await ctx.send("❌ Érvénytelen koordináta! Pl: A1, B7, H12")
-                return
-            result = self.game.make_move(ctx.author.name, (row, col))
-            if result:
-                await ctx.send(result)
+            effects = [Say(f"🤖 AI lép: {format_coord(g.mode, mv)}")]
+        effects.append(Track("move", id=self.game_no, user=AI_NAME, ai=True, n=g.moves))
+        return self._after_move(effects, result)
 
-        # újraindítjuk a lépésidő-figyelőt
-        self._restart_move_timer(ctx)
+    def clear_overlay(self, game_no: int):
+        if game_no != self.game_no or (self.game and self.game.active):
+            return None
+        return [Overlay(None)]
 
-        # AI lép, ha ő következik
-        if self.game and self.game.active and self.game.is_ai and self.game.current_player == "🤖 AI_BOT":
-            await asyncio.sleep(random.uniform(*AI_THINK_DELAY))
-            if self.game.mode == "connect4":
-                col = self.game._connect4_best_column()
-                if col is None:
-                    # fallback: bármelyik nem tele oszlop
-                    free_cols = [c for c in range(self.game.cols) if self.game.board[0][c] == " "]
-                    if not free_cols:
-                        return
-                    col = random.choice(free_cols)
-                ai_res = self.game.make_move("🤖 AI_BOT", col)
-                await ctx.send(f"🤖 AI lép oszlop: {col+1}")
-                if ai_res:
-                    await ctx.send(ai_res)
-            else:
-                mv = self.game.smart_ai_move()
-                if mv:
-                    r, c = mv
-                    ai_res = self.game.make_move("🤖 AI_BOT", (r, c))
-                    await ctx.send(f"🤖 AI lép: {chr(65+c)}{r+1}")
-                    if ai_res:
-                        await ctx.send(ai_res)
-            # AI után is indítjuk a lépésidő-figyelőt
-            self._restart_move_timer(ctx)
-
-    @commands.command(name="stop", aliases=["leallit","leállít"])
-    async def stop_cmd(self, ctx):
-        """Modul leállítása – csak streamer/mod."""
-        if not self.is_streamer_or_mod(ctx):
-            return
-        # állapot nullázás
+    def stop(self):
+        """Állapot nullázás modul-leállításkor."""
+        was_active = self.active
         self.challenge = None
         self.ai_offer_for = None
         self.ai_offer_deadline = 0.0
-        if self._move_timer_task and not self._move_timer_task.done():
-            self._move_timer_task.cancel()
-        self._move_timer_task = None
         self.game = None
-        # overlay ürítés
-        _clear_overlay()
-        await ctx.send("⚙️ Az Amoeba modul leállítva.")
-        try:
-            self.bot.remove_cog("AmoebaCog")
-        except Exception:
-            pass
+        self.game_no += 1
+        effects = [Overlay(None), Cancel("challenge"), Cancel("ai_offer"), Cancel("move"), Cancel("ai")]
+        if was_active:
+            effects.append(Say("⚙️ Az Amoeba játék leállítva.", HIGH))
+        return effects
+
 
 # ===============================
 # Modul belépési pont
 # ===============================
-def prepare(bot):
-    global _host_api
-    _host_api = getattr(bot, "host", None)
-    bot.add_cog(AmoebaCog(bot))
-    print("[✅] Amoeba modul csatlakoztatva a főbothoz.")
+def prepare(runtime):
+    runtime.config.register("amoeba", CONFIG_SCHEMA)
+    runtime.register("amoeba", lambda channel: AmoebaGame(channel, runtime))
+    log.info("[✅] Amoeba modul csatlakoztatva a főbothoz.")
@@ -1,84 +1,367 @@
+import time
+_T0 = time.perf_counter()   # indulási idő mérése (a startup benchmark olvassa)
+
 import os
 import asyncio
+import hmac
 import threading
-from twitchio.ext import commands
-from flask import Flask
-import socketio
+
+from core import log as logging_setup
+from core.config import ConfigService
+from core.host import HostAPI
+from core import metrics
+from core.inbound import InboundScheduler
+from core.outbound import ChatOutbox
+from core.runtime import GameRuntime
+from core.state import open_store
 
 # =========================
 #  Beállítások
 # =========================
 TOKEN = os.getenv("TOKEN")
 CHANNEL = os.getenv("CHANNEL")
+# Több csatorna egy folyamatban: CHANNELS=a,b,c (ha nincs megadva, csak CHANNEL)
+CHANNELS = [c.strip().lower() for c in (os.getenv("CHANNELS") or CHANNEL or "").split(",") if c.strip()]
+BOT_NICK = os.getenv("BOT_NICK") or CHANNEL or (CHANNELS[0] if CHANNELS else None)
+# az elsődleges csatorna overlay-e marad a megszokott overlay/<játék>.json, és a csatorna nélküli
+# overlay oldalak is ezt kapják (shardoknál a supervisor adja meg)
+PRIMARY_CHANNEL = os.getenv("PRIMARY_CHANNEL") or (CHANNELS[0] if CHANNELS else None)
+# Shardolás: SHARDS=auto|<szám> esetén supervisor mód (magonként egy worker folyamat);
+# a workereket a supervisor SHARD_ID/SHARD_CONTROL környezettel indítja
+SHARDS = os.getenv("SHARDS")
+SHARD_ID = int(os.getenv("SHARD_ID", "0"))
+SHARD_CONTROL = os.getenv("SHARD_CONTROL")
+SHARD_COUNT = max(1, int(os.getenv("SHARD_COUNT", "1")))
+if SHARD_CONTROL:
+    CHANNELS = []   # a csatornákat a supervisor osztja ki
 CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+STARTUP_BENCH = os.getenv("STARTUP_BENCH") == "1"   # csatlakozás után kilép (tools/startup_bench.py)
+# Helyi IRC stand-in (tools/twitch_standin.py, tools/chat_load.py), pl. ws://127.0.0.1:6680
+TWITCH_IRC_URL = os.getenv("TWITCH_IRC_URL")
+
+# Központi konfiguráció: egyszer töltődik be, a játékok pillanatképet kapnak belőle,
+# a fájl kézi módosítását futás közben is átveszi (CONFIG.watch)
+# Naplózás: háttérszálas kimenet, a szint a general.DEBUG-ot követi (újratöltéskor is)
+logging_setup.setup()
+log = logging_setup.get_logger("main")
+
+CONFIG = ConfigService(os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"))
+CONFIG.load()
+GENERAL = CONFIG.section("general")
+logging_setup.set_debug(GENERAL["DEBUG"])
+CONFIG.subscribe(lambda: logging_setup.set_debug(CONFIG.section("general")["DEBUG"]))
 
 loop = asyncio.get_event_loop()
-HTTP_PORT = 8000
+HTTP_PORT = GENERAL["HTTP_PORT"]
+WS_PORT = GENERAL["WS_PORT"]
+GAME_IDLE_UNLOAD = GENERAL["GAME_IDLE_UNLOAD"]
+# csatornák, ahol a bot moderátor (nagyobb üzenetkeret); a környezeti változó felülírja
+MOD_CHANNELS = ([c.strip().lower() for c in os.getenv("MOD_CHANNELS").split(",") if c.strip()]
+                if os.getenv("MOD_CHANNELS") else GENERAL["MOD_CHANNELS"])
+# Közös állapottár: "memory" vagy "redis://host:port/db" (több node közös állapota)
+STATE_STORE = os.getenv("STATE_STORE") or GENERAL["STATE_STORE"]
+# Journal: a futó játékok állapota minden átmenet után lemezre kerül, újraindításkor onnan folytatódnak
+# (üres érték kikapcsolja)
+JOURNAL_DIR = GENERAL["JOURNAL_DIR"]
+# Játékos-statisztikák (!top, !stats) SQLite fájlja (üres érték kikapcsolja)
+STATS_DB = GENERAL["STATS_DB"]
+# Játékesemény-napló offline elemzéshez (tools/event_stats.py); üres érték kikapcsolja
+EVENT_LOG_DIR = GENERAL["EVENT_LOG_DIR"]
+EVENT_LOG_ROTATE_MB = GENERAL["EVENT_LOG_ROTATE_MB"]
+# Fejlesztői mód: a játékmodul fájljának mentésekor automatikus újratöltés (!reload nélkül)
+MODULE_WATCH = GENERAL["MODULE_WATCH"] or os.getenv("MODULE_WATCH") == "1"
+# !profile / /debug/profile kimenete; a HTTP végpont csak PROFILE_TOKEN megadásával él
+PROFILE_DIR = GENERAL["PROFILE_DIR"]
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+# Shadow (canary) mód: játék -> jelölt modul; a jelölt a valódi forgalmon fut, kimenet nélkül,
+# az eltérések és az átmenetidők a /debug/shadow végponton (env: SHADOW=amoeba=games.amoeba.bot_next,...)
+SHADOW = (dict(item.strip().split("=", 1) for item in os.getenv("SHADOW").split(",") if "=" in item)
+          if os.getenv("SHADOW") else dict(GENERAL["SHADOW"]))
+# Külön küldőkapcsolatok (core/irc.py): a twitchio kapcsolata csak olvas; a fiók kerete a
+# shardok között egyenlően oszlik (mindegyik worker saját kapcsolatokkal küld)
+SEND_CONNECTIONS = int(os.getenv("SEND_CONNECTIONS", GENERAL["SEND_CONNECTIONS"]))
+ACCOUNT_RATE = max(1, GENERAL["ACCOUNT_RATE"] // SHARD_COUNT)
+OVERLAY_ONLY = os.getenv("OVERLAY_ONLY") == "1"   # Twitch nélkül, csak a közös tár overlay eseményeit szolgálja ki
+
+
+BOT = None     # a futó bot (a HTTP végpontoknak; supervisor módban a workereké, itt None)
+
+
+def _elapsed_ms() -> float:
+    return round((time.perf_counter() - _T0) * 1000, 1)
 
 # =========================
-#  Flask + SocketIO
+#  Flask + SocketIO (külön szálon, lustán importálva)
 # =========================
-app = Flask(__name__)
-sio = socketio.Server(async_mode="threading", cors_allowed_origins="*")
-app.wsgi_app = socketio.WSGIApp(sio, app.wsgi_app)
+def start_http():
+    from flask import Flask, Response, abort, jsonify, request
+    import socketio
+
+    app = Flask(__name__)
+    sio = socketio.Server(async_mode="threading", cors_allowed_origins="*")
+    app.wsgi_app = socketio.WSGIApp(sio, app.wsgi_app)
 
-@app.route("/")
-def home():
-    return "Bot online és fut a Renderen!"
+    @app.route("/")
+    def home():
+        return "Bot online és fut a Renderen!"
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+    def authorize():
+        # Authorization: Bearer <PROFILE_TOKEN>; token nélkül a /debug végpontok nem léteznek
+        if not PROFILE_TOKEN:
+            abort(404)
+        given = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(given.encode(), PROFILE_TOKEN.encode()):
+            abort(403)
+        if BOT is None:
+            abort(503)
+
+    @app.route("/debug/profile", methods=["GET", "POST"])
+    def debug_profile():
+        authorize()
+        try:
+            seconds = float(request.args.get("seconds", 0)) or None
+        except ValueError:
+            abort(400)
+        future = asyncio.run_coroutine_threadsafe(BOT.runtime.profile(seconds), loop)
+        try:
+            summary = future.result()
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 409
+        if request.args.get("format") == "folded":
+            # közvetlenül flamegraph.pl-be / speedscope-ba tölthető
+            with open(summary["folded"], encoding="utf-8") as f:
+                return Response(f.read(), content_type="text/plain; charset=utf-8")
+        return jsonify(summary)
+
+    @app.route("/debug/shadow")
+    def debug_shadow():
+        # a shadow futás összesítője (eltérések, átmenetidők élő vs. jelölt)
+        authorize()
+        if BOT.runtime.shadow is None:
+            abort(404)
+
+        async def report():     # az eseményhurokban olvassuk, ne menet közben
+            return BOT.runtime.shadow.report()
+        return jsonify(asyncio.run_coroutine_threadsafe(report(), loop).result(timeout=5))
+
+    threading.Thread(
+        target=lambda: app.run(host="0.0.0.0", port=HTTP_PORT, threaded=True, use_reloader=False),
+        daemon=True
+    ).start()
+    return app
 
 # =========================
 #  Twitch Bot
 # =========================
-bot = commands.Bot(
-    token=TOKEN,
-    client_id=CLIENT_ID,
-    nick=CHANNEL,
-    prefix="!",
-    initial_channels=[CHANNEL]
-)
+def create_bot():
+    from twitchio.ext import commands
+
+    bot = commands.Bot(
+        token=TOKEN,
+        client_id=CLIENT_ID,
+        nick=BOT_NICK,
+        prefix="!",
+        initial_channels=CHANNELS
+    )
+    if TWITCH_IRC_URL:
+        # a twitchio a stand-inhez csatlakozik; ismert nick mellett a token ellenőrzése
+        # (id.twitch.tv) elmarad, így hálózat nélkül is indul (a HTTP sessiont main() nyitja)
+        import twitchio.websocket
+        twitchio.websocket.HOST = TWITCH_IRC_URL
+        bot._http.nick = BOT_NICK
+
+    # Kimenő chat-sor: minden játék ezen keresztül ír a chatbe (csatornánként külön keret),
+    # küldőkészlettel a saját kapcsolatain (a twitchio csak olvas)
+    pool = None
+    if SEND_CONNECTIONS and TOKEN and not STARTUP_BENCH:
+        from core.irc import DEFAULT_URL, SendPool
+        pool = SendPool(TOKEN, BOT_NICK, url=TWITCH_IRC_URL or DEFAULT_URL, size=SEND_CONNECTIONS,
+                        account_rate=ACCOUNT_RATE)
+    bot.outbox = ChatOutbox(bot, nick=BOT_NICK, mod_channels=MOD_CHANNELS, pool=pool)
+
+    # Overlay WebSocket + játék-futtatókörnyezet (router a parancsokhoz).
+    # A játékmodulok csak első használatkor töltődnek be (!indit <játék> / !akasztás / !kihívás).
+    # Shard workerként az overlay események a supervisor front szerverén át mennek ki.
+    if SHARD_CONTROL:
+        from core.shard import ShardClient
+        bot.host = ShardClient(SHARD_CONTROL, SHARD_ID, bot)
+    else:
+        bot.host = HostAPI(port=WS_PORT, primary_channel=PRIMARY_CHANNEL)
+    journal = None
+    if JOURNAL_DIR:
+        from core.journal import Journal
+        journal = Journal(os.path.join(os.path.dirname(os.path.abspath(__file__)), JOURNAL_DIR))
+    stats = None
+    if STATS_DB:
+        from core.stats import StatsStore
+        stats = StatsStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), STATS_DB))
+    events = None
+    if EVENT_LOG_DIR:
+        from core.events import EventLog
+        events = EventLog(os.path.join(os.path.dirname(os.path.abspath(__file__)), EVENT_LOG_DIR),
+                          rotate_bytes=int(EVENT_LOG_ROTATE_MB * 1024 * 1024),
+                          tag=f"shard{SHARD_ID}" if SHARD_CONTROL else "")
+        events.start()
+    bot.runtime = GameRuntime(bot, bot.outbox, bot.host, idle_unload=GAME_IDLE_UNLOAD,
+                              store=open_store(STATE_STORE), journal=journal, stats=stats,
+                              events=events, config=CONFIG,
+                              profile_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), PROFILE_DIR))
+    bot.runtime.primary_channel = PRIMARY_CHANNEL
+    for channel in CHANNELS:
+        bot.runtime.join(channel)
+
+    # Bejövő ütemező: a moderátori parancsok terhelés alatt is előre kerülnek
+    bot.inbound = InboundScheduler(bot.runtime.dispatch)
+    bot.inbound.add_player_probe(bot.runtime.is_active_player)
+    bot.inbound.monitor.histogram = metrics.LOOP_LAG_SECONDS
+    if SHADOW:
+        from core.shadow import ShadowRunner
+        bot.runtime.shadow = ShadowRunner(bot.runtime, SHADOW, monitor=bot.inbound.monitor)
+
+    @bot.event()
+    async def event_ready():
+        if SHARD_CONTROL:
+            bot.host.twitch_ready()
+
+    @bot.event()
+    async def event_channel_joined(channel):
+        bot.outbox.bind(channel)
+        log.info("[⏱️] Csatlakozva: #%s — %s ms az indulás óta", channel.name, _elapsed_ms())
+        if STARTUP_BENCH and len(bot.outbox._channels) >= len(CHANNELS):
+            logging_setup.shutdown()
+            os._exit(0)
+
+    async def event_message(message):
+        if message.echo:
+            return
+        # a küldőkapcsolatok üzenetei a Twitchtől visszajönnek az olvasó kapcsolatra
+        pool = bot.outbox.pool
+        if (pool is not None and message.author is not None and message.channel is not None
+                and pool.is_echo(message.author.name, message.channel.name, message.content or "")):
+            return
+        bot.inbound.submit(message)
+
+    # A twitchio alap event_message-e (handle_commands) helyett, nem mellette: a parancsokat a
+    # runtime routere kezeli – így nem fut le minden parancsra a twitchio saját feldolgozása
+    # sem, ami ismeretlen parancsnál CommandNotFound tracebacket írna a stdout-ra.
+    bot.event_message = event_message
+
+    return bot
 
 # =========================
-#  Modulok betöltése
+#  Metrikák (/metrics)
 # =========================
-try:
-    for folder in os.listdir("games"):
-        if os.path.exists(f"games/{folder}/bot.py"):
-            bot.load_module(f"games.{folder}.bot")
-            print(f"[✅] {folder} betöltve.")
-except Exception as e:
-    print(f"[⚠️] Hiba a modulok betöltésénél: {e}")
+def collect_metrics(bot):
+    """Sorhosszak és összesítések átvétele a metrikákba (másodpercenként, a loop szálán)."""
+    outbox = bot.outbox.stats()
+    metrics.OUTBOUND_QUEUE_DEPTH.replace({(name,): s["depth"] for name, s in outbox.items()})
+    totals = {}
+    for s in outbox.values():
+        for key in ("sent", "coalesced", "dropped", "dropped_low", "errors"):
+            totals[(key,)] = totals.get((key,), 0) + s[key]
+    metrics.OUTBOUND_MESSAGES.replace(totals)
+    inbound = bot.inbound.stats()
+    metrics.INBOUND_QUEUE_DEPTH.replace({(k,): v for k, v in inbound["depth"].items()})
+    metrics.INBOUND_SHED.replace({(k,): v for k, v in inbound["shed"].items()})
+    bot.runtime.collect_metrics()
 
 # =========================
 #  Heartbeat
 # =========================
-async def heartbeat():
+async def heartbeat(bot):
     while True:
-        print("💓 Bot él és fut Renderen...")
+        log.info("💓 Bot él és fut Renderen... (kimenő sor: %s%s, bejövő: %s, állapottár: %s%s%s, napló: %s)",
+                 bot.outbox.stats(),
+                 f", küldőkapcsolatok: {bot.outbox.pool.stats()}" if bot.outbox.pool else "",
+                 bot.inbound.stats(), bot.runtime.store.stats(),
+                 f", statisztika: {bot.runtime.stats.stats()}" if bot.runtime.stats else "",
+                 f", eseménynapló: {bot.runtime.events.stats()}" if bot.runtime.events else "",
+                 logging_setup.stats())
         await asyncio.sleep(15)
 
 # =========================
 #  Indítás
 # =========================
 async def main():
-    print("✅ main_bot.py elindult Renderen")
+    log.info("✅ main_bot.py elindult Renderen")
 
-    # Flask külön szálon (a működő rész!)
-    threading.Thread(
-        target=lambda: sio.run(app, host="0.0.0.0", port=HTTP_PORT, allow_unsafe_werkzeug=True),
-        daemon=True
-    ).start()
+    # Flask külön szálon (a működő rész!) – shard workernél a supervisor futtatja
+    if not STARTUP_BENCH and not SHARD_CONTROL:
+        start_http()
+
+    global BOT
+    bot = BOT = create_bot()
+
+    # Journal / közös állapottár: a csatornák az utoljára mentett állapotból folytatódnak
+    await bot.runtime.store.connect()
+    if bot.runtime.stats is not None:
+        await bot.runtime.stats.open()
+        bot.runtime.stats.start()
+    for channel in CHANNELS:
+        await bot.runtime.resume(channel)
 
-    # Heartbeat
-    loop.create_task(heartbeat())
+    # Overlay WebSocket
+    await bot.host.start()
+    if not SHARD_CONTROL:
+        await bot.host.attach(bot.runtime.store)
 
-    print("🚀 Bot indul, Twitch kapcsolat kezdeményezése...")
+    # Heartbeat + bejövő ütemező + tétlen modulok kiürítése
+    loop.create_task(heartbeat(bot))
+    metrics.REGISTRY.add_collector(lambda: collect_metrics(bot))
+    metrics.REGISTRY.start_sampler()
+    bot.inbound.start()
+    if bot.outbox.pool is not None:
+        bot.outbox.pool.start()
+    bot.runtime.start_reaper()
+    bot.runtime.start_state_sync()
+    if bot.runtime.shadow is not None:
+        bot.runtime.shadow.start()
+    CONFIG.watch()
+    if MODULE_WATCH:
+        bot.runtime.start_module_watch()
+
+    log.info("🚀 Bot indul, Twitch kapcsolat kezdeményezése... (%s ms)", _elapsed_ms())
+    if TWITCH_IRC_URL:
+        import aiohttp
+        bot._http.session = aiohttp.ClientSession()
     await bot.start()
 
+async def supervise():
+    """Supervisor mód: front HTTP/WebSocket szerver + magonként egy worker folyamat."""
+    from core.supervisor import Supervisor
+
+    shards = (os.cpu_count() or 1) if SHARDS == "auto" else int(SHARDS)
+    log.info("✅ Supervisor indul: %s shard, %s csatorna", shards, len(CHANNELS))
+    start_http()
+    await Supervisor(CHANNELS, shards, WS_PORT, script=os.path.abspath(__file__),
+                     primary_channel=PRIMARY_CHANNEL).run()
+
+async def serve_overlays():
+    """Csak overlay node: a közös állapottár overlay eseményeit szolgálja ki, Twitch nélkül."""
+    log.info("✅ Overlay node indul (Twitch kapcsolat nélkül)")
+    start_http()
+    store = open_store(STATE_STORE)
+    await store.connect()
+    host = HostAPI(port=WS_PORT, primary_channel=PRIMARY_CHANNEL)
+    await host.start()
+    await host.attach(store)
+    await asyncio.Event().wait()
+
 if __name__ == "__main__":
+    if OVERLAY_ONLY:
+        entry = serve_overlays()
+    elif SHARDS and not SHARD_CONTROL:
+        entry = supervise()
+    else:
+        entry = main()
     try:
-        loop.run_until_complete(main())
+        loop.run_until_complete(entry)
     except KeyboardInterrupt:
-        print("🛑 Leállítás...")
+        log.info("🛑 Leállítás...")
     except Exception as e:
-        print(f"❌ Hiba a főindítás során: {e}")
+        log.exception("❌ Hiba a főindítás során: %s", e)
@@ -0,0 +1,61 @@
+// Tömör bináris overlay üzenetek dekódolása (?format=bin) – a core/wire.py párja.
+// Az eredmény ugyanolyan objektum, mint a JSON üzenet: {event, game, channel[, state]}.
+// A kódtáblák sorrendje egyezzen a core/wire.py tábláival.
+const OverlayWire = (function(){
+  const VERSION = 1;
+  const EVENTS = ["", "refresh", "new_game", "victory", "devil", "angel", "game_over"];
+  const GAMES = ["", "akasztofa", "amoeba"];
+  const THEMES = ["", "temeto", "gyertya", "akasztofa", "szorny", "zombik"];
+  const HANGMAN_STATES = ["normal", "angel"];
+  const BOARD_MODES = ["", "amoeba", "connect4"];
+  const CELLS = [" ", "☠️", "🩸"];
+  const DRAW = "Döntetlen";
+  const utf8 = new TextDecoder("utf-8");
+
+  function decode(buffer){
+    const bytes = new Uint8Array(buffer);
+    let pos = 0;
+    const u8 = () => bytes[pos++];
+    const str = () => { const n = u8(); pos += n; return utf8.decode(bytes.subarray(pos - n, pos)); };
+    const code = (table) => { const c = u8(); return c ? table[c] : str(); };
+    const player = (p1, p2) => { const c = u8(); return c === 4 ? str() : ["", p1, p2, DRAW][c]; };
+
+    const version = u8();
+    if (version !== VERSION) throw new Error(`ismeretlen overlay formátum verzió: ${version}`);
+    const msg = { event: code(EVENTS), game: code(GAMES), channel: str() };
+    const kind = u8();
+    if (kind === 1) {
+      msg.state = null;
+    } else if (kind === 2) {
+      const theme = THEMES[u8()];
+      const category = str(), word = str();
+      const wrong = [];
+      for (let n = u8(); n > 0; n--) wrong.push(str());
+      const lives = u8(), max = u8();
+      msg.state = { theme, category, word, wrong, lives_status: `${lives}/${max}`, state: HANGMAN_STATES[u8()] };
+    } else if (kind === 3) {
+      const mode = BOARD_MODES[u8()], rows = u8(), cols = u8();
+      const board = [];
+      for (let i = 0; i < rows * cols; i++) {
+        if (i % cols === 0) board.push([]);
+        board[board.length - 1].push(CELLS[(bytes[pos + (i >> 2)] >> (6 - 2 * (i & 3))) & 3]);
+      }
+      pos += (rows * cols + 3) >> 2;
+      const player1 = str(), player2 = str();
+      const current_player = player(player1, player2);
+      const winner = player(player1, player2);
+      msg.state = { game: "amoeba", mode, board, player1, player2, current_player, winner };
+    } else if (kind === 4) {
+      const n = new DataView(bytes.buffer, bytes.byteOffset + pos, 4).getUint32(0);
+      msg.state = JSON.parse(utf8.decode(bytes.subarray(pos + 4, pos + 4 + n)));
+    }
+    return msg;
+  }
+
+  // Üzenet a WebSocketről: szöveg = JSON, bináris = tömör formátum
+  function parse(data){
+    return typeof data === "string" ? JSON.parse(data) : decode(data);
+  }
+
+  return { decode, parse };
+})();
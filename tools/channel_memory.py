@@ -0,0 +1,118 @@
+"""Csatornánkénti memóriaköltség mérése (tracemalloc).
+
+Egy GameRuntime-ot N csatornára csatlakoztat (Twitch kapcsolat nélkül, a chat
+egy nyelő felé megy), és megméri:
+  1. tétlen csatornák: csak router-bejegyzések, játékpéldány nélkül
+  2. minden csatornán betöltött játékpéldányok
+  3. minden csatornán futó akasztófa-játék
+
+Használat:
+    python tools/channel_memory.py [--channels 100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.runtime import GameRuntime   # noqa: E402
+
+
+class _SinkOutbox:
+    """Chat nélküli kimenet: az üzeneteket csak megszámolja."""
+
+    def __init__(self):
+        self.count = 0
+
+    def send(self, channel, text, priority=None):
+        self.count += 1
+        return True
+
+
+class _Author:
+    def __init__(self, name):
+        self.name = name
+        self.badges = {"broadcaster": "1"}
+
+
+class _Channel:
+    def __init__(self, name):
+        self.name = name
+
+
+class _Message:
+    def __init__(self, channel, user, content):
+        self.channel = _Channel(channel)
+        self.author = _Author(user)
+        self.content = content
+
+
+def _snapshot() -> int:
+    current, _ = tracemalloc.get_traced_memory()
+    return current
+
+
+async def _settle(runtime):
+    # az actorok kiürítik a postafiókjukat
+    for _ in range(50):
+        await asyncio.sleep(0)
+        if not any(g.actor.depth() for games in runtime.channels.values() for g in games.values()):
+            break
+
+
+async def measure(n: int):
+    runtime = GameRuntime(None, _SinkOutbox(), host=None)
+    # a modulok (és a szókatalógus) egyszeri költsége ne torzítsa a csatornánkénti számot
+    runtime.load_modules()
+    runtime.join("bench_primary")
+    names = [f"bench_{i:05d}" for i in range(n)]
+
+    tracemalloc.start()
+    base = _snapshot()
+    for ch in names:
+        runtime.join(ch)
+    idle = _snapshot()
+
+    for ch in names:
+        for game in runtime.manifest:
+            runtime.spawn(ch, game)
+    await _settle(runtime)
+    spawned = _snapshot()
+
+    for ch in names:
+        await runtime.dispatch(_Message(ch, ch, "!akasztás"))
+    await _settle(runtime)
+    active = _snapshot()
+    tracemalloc.stop()
+
+    for ch in names:
+        runtime.part(ch)
+    return {
+        "idle": (idle - base) / n,
+        "spawned": (spawned - base) / n,
+        "active": (active - base) / n,
+        "router": len(runtime.router),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--channels", type=int, default=100)
+    args = ap.parse_args()
+
+    # a játékok overlay-t írnak: a mérés ne írja felül a valódi overlay fájlokat
+    import game_interface
+    game_interface.BaseGame.write_overlay = lambda self, payload, refresh=True: None
+
+    res = asyncio.get_event_loop().run_until_complete(measure(args.channels))
+    print(f"== {args.channels} csatorna, csatornánkénti többletmemória ==")
+    print(f"  tétlen (csak router):      {res['idle'] / 1024:8.1f} KiB")
+    print(f"  játékpéldányokkal:         {res['spawned'] / 1024:8.1f} KiB")
+    print(f"  futó akasztófával:         {res['active'] / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
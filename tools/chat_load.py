@@ -0,0 +1,420 @@
+"""Terheléses teszt élő csatorna nélkül: helyi IRC stand-in + a bot + chatforgalom.
+
+Elindítja a tools/twitch_standin.py szerverét, a main_bot.py-t ráállítja
+(TWITCH_IRC_URL), majd a megadott ütemben chatforgalmat küld a csatornákba:
+  - szkriptelt (alapértelmezés, --seed-del reprodukálható): köznapi chat, !akasztás
+    és !tipp sorozatok (--burst-every / --burst-size tipp-lökésekkel), !kihívás /
+    !elfogad / !lép párbajok, valamint !stats próbák
+  - visszajátszott (--replay chat.jsonl): {"t": mp, "ch": csatorna, "user": név,
+    "text": üzenet, "mod": false} soronként; --speed-del gyorsítható. A --record
+    ugyanebben a formátumban menti a generált forgalmat.
+
+Mér: parancstól a bot válaszáig eltelt idő (p50/p90/p99/max, parancsfajtánként –
+a választ a szövege alapján párosítja, pl. "Jó tipp: A", "probe17"), megválaszolatlan
+parancsok, kimenő üzenetráta (átlag / csúcs), overlay események száma (a bot overlay
+WebSocketjére csatlakozva), a végén pedig a bot /metrics végpontjából az eldobott
+bejövő / kimenő üzenetek száma.
+
+A terhelt csatornák nem az elsődlegesek (az overlay/<játék>.json érintetlen marad), és
+alapból a bot moderátorként kezeli őket (100 üzenet / 30 mp; --no-mod: 20 / 30 mp).
+
+A bot a config.json SEND_CONNECTIONS-nyi külön küldőkapcsolaton válaszol
+(--send-connections-szel felülírható; 0 = a twitchio olvasó kapcsolata küld). A
+riport kapcsolatonként mutatja, hány üzenet jött; --kick-every ennyi mp-enként egy
+küldőkapcsolatot bont RECONNECT-tel (újracsatlakozás terhelés alatt).
+
+Használat:
+    python tools/chat_load.py [--channels 4] [--rate 500] [--duration 30] [--seed 1]
+                              [--burst-every 5 --burst-size 200] [--replay chat.jsonl]
+                              [--record chat.jsonl] [--send-connections 2] [--kick-every 10]
+                              [--no-spawn] [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from twitch_standin import DEFAULT_PORT, TwitchStandIn   # noqa: E402
+
+BOT_NICK = "loadbot"
+TICK = 0.01             # ennyi mp-enként megy ki egy adag
+REPLY_TIMEOUT = 10.0    # ennyi mp után a parancs megválaszolatlannak számít
+MAX_PENDING = 500       # csatornánként ennyi válaszra váró parancsot követünk
+JOINER = " | "          # a kimenő sor így fűzi össze az összevont üzeneteket
+LETTERS = "AÁBCDEÉFGHIÍJKLMNOÓÖŐPQRSTUÚÜŰVWXYZ"
+CHATTER = ["szia", "jó estét", "lol", "ez nagyon jó", "KEKW", "mi a kategória?", "gg", "hahaha",
+           "ma mit játszunk?", "PogChamp", "ki nyer?", "most jöttem", "👋", "na ez izgi"]
+# parancsfajta -> súly a szkriptelt forgalomban
+MIX = {"chat": 55, "hangman": 28, "duel": 12, "probe": 5}
+
+
+def classify(text: str):
+    """Egy chatsor parancsfajtája és a bot válaszát felismerő szövegrészek."""
+    if not text.startswith("!"):
+        return "chat", ()
+    cmd, _, arg = text[1:].partition(" ")
+    cmd, arg = cmd.lower(), arg.strip()
+    if cmd == "stats" and arg:
+        return "probe", (arg.lstrip("@"),)
+    if cmd == "akasztás":
+        return "start", ("Új játék", "Már fut", "várj még")
+    if cmd == "tipp" and arg:
+        return "tipp", (f"tipp: {arg.upper()}", f"volt: {arg.upper()}")
+    if cmd in ("kihívás", "kihivas", "kihív", "kihiv"):
+        return "challenge", ("kihívta", "kihívás indítva", "Már van függőben", "Már fut")
+    if cmd in ("elfogad", "accept"):
+        return "accept", ("Játék indult", "Nincs függőben", "nem neked szánták")
+    if cmd in ("lép", "lep"):
+        return "move", ()
+    return "other", ()
+
+
+class Channel:
+    """Egy csatorna szkriptjének állapota (amit a bot válaszaiból tudunk)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hangman = False
+        self.duel = None        # None | "challenged" | [játékos1, játékos2, lépésszám]
+        self.duel_players = None
+
+
+class Recorder:
+    def __init__(self):
+        self.latency = {}       # fajta -> [mp, ...]
+        self.sent = {}          # fajta -> darab
+        self.unanswered = {}    # fajta -> darab
+        self.pending = {}       # csatorna -> [(elvárt szövegek, küldés ideje, fajta), ...]
+        self.replies = 0
+        self.per_second = {}    # egész mp -> a bot üzenetei
+        self.overlay = {}       # esemény -> darab
+
+    def expect(self, channel: str, kind: str, texts: tuple):
+        self.sent[kind] = self.sent.get(kind, 0) + 1
+        if not texts:
+            return
+        pending = self.pending.setdefault(channel, [])
+        if len(pending) >= MAX_PENDING:
+            self._miss(pending.pop(0)[2])
+        pending.append((texts, time.perf_counter(), kind))
+
+    def reply(self, channel: str, text: str):
+        now = time.perf_counter()
+        self.replies += 1
+        sec = int(time.monotonic())
+        self.per_second[sec] = self.per_second.get(sec, 0) + 1
+        pending = self.pending.get(channel)
+        if not pending:
+            return
+        for part in text.split(JOINER):
+            for i, (texts, t0, kind) in enumerate(pending):
+                if any(t in part for t in texts):
+                    self.latency.setdefault(kind, []).append(now - t0)
+                    del pending[i]
+                    break
+
+    def expire(self, timeout: float = REPLY_TIMEOUT):
+        limit = time.perf_counter() - timeout
+        for pending in self.pending.values():
+            while pending and pending[0][1] < limit:
+                self._miss(pending.pop(0)[2])
+
+    def _miss(self, kind: str):
+        self.unanswered[kind] = self.unanswered.get(kind, 0) + 1
+
+
+class Script:
+    """Szkriptelt forgalom: minden hívás egy (csatorna, user, szöveg, mod) négyest ad."""
+
+    def __init__(self, channels: list, rng: random.Random, users: int = 300):
+        self.channels = [Channel(c) for c in channels]
+        self.by_name = {c.name: c for c in self.channels}
+        self.rng = rng
+        self.users = [f"user{i:03d}" for i in range(users)]
+        self.kinds = list(MIX)
+        self.weights = list(MIX.values())
+        self.probes = 0
+
+    def next(self, kind: str = None):
+        rng = self.rng
+        ch = rng.choice(self.channels)
+        user = rng.choice(self.users)
+        kind = kind or rng.choices(self.kinds, self.weights)[0]
+        if kind == "chat":
+            return ch.name, user, rng.choice(CHATTER), False
+        if kind == "probe":
+            self.probes += 1
+            return ch.name, user, f"!stats probe{self.probes}", False
+        if kind == "hangman":
+            if not ch.hangman:
+                ch.hangman = True
+                return ch.name, user, "!akasztás", False
+            return ch.name, user, f"!tipp {rng.choice(LETTERS).lower()}", False
+        return self._duel(ch, user)
+
+    def _duel(self, ch: Channel, user: str):
+        rng = self.rng
+        if ch.duel is None:
+            opponent = rng.choice(self.users)
+            ch.duel = "challenged"
+            ch.duel_players = [user, opponent, 0]
+            return ch.name, user, f"!kihívás @{opponent}", False
+        if ch.duel == "challenged":
+            ch.duel = "playing"
+            return ch.name, ch.duel_players[1], "!elfogad", False
+        p1, p2, n = ch.duel_players
+        ch.duel_players[2] += 1
+        if n >= 60:
+            ch.duel = None
+        who = p1 if n % 2 == 0 else p2
+        return ch.name, who, f"!lép {rng.choice('ABCDEFG')}{rng.randint(1, 13)}", False
+
+    def observe(self, channel: str, text: str):
+        """A bot válaszaiból a szkript állapotának igazítása (játék vége, elutasítás ...)."""
+        ch = self.by_name.get(channel)
+        if ch is None:
+            return
+        if "Nyertetek" in text or "Vesztettetek" in text or "Nincs aktív játék!" in text:
+            ch.hangman = False
+        if "Nincs aktív játék." in text or "Nincs függőben" in text or "nyert" in text:
+            ch.duel = None
+
+
+def load_replay(path: str) -> list:
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                ev = json.loads(line)
+                events.append((float(ev["t"]), ev["ch"].lower(), ev["user"], ev["text"], bool(ev.get("mod"))))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def q(p):
+        return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 1)
+    return {"n": len(values), "p50_ms": q(0.5), "p90_ms": q(0.9), "p99_ms": q(0.99),
+            "max_ms": round(values[-1] * 1000, 1)}
+
+
+def spawn_bot(channels: list, port: int, mod: bool, log_path: str, send_connections: int = None):
+    env = dict(os.environ, TWITCH_IRC_URL=f"ws://127.0.0.1:{port}", TOKEN="standin", BOT_NICK=BOT_NICK,
+               CHANNELS=",".join(channels), PRIMARY_CHANNEL="chat-load-primary", PYTHONUNBUFFERED="1")
+    env.pop("SHARDS", None)
+    if send_connections is not None:
+        env["SEND_CONNECTIONS"] = str(send_connections)
+    if mod:
+        env["MOD_CHANNELS"] = ",".join(channels)
+    out = open(log_path, "w") if log_path else subprocess.DEVNULL
+    return subprocess.Popen([sys.executable, "main_bot.py"], cwd=ROOT, env=env, stdout=out, stderr=subprocess.STDOUT)
+
+
+async def watch_overlay(port: int, recorder: Recorder, channel: str):
+    """Egy csatorna overlay eseményeinek számolása (a bot overlay WebSocketjére csatlakozva;
+    csatorna nélkül a host csak az elsődleges csatornát küldené, a terheltek nem azok)."""
+    try:
+        import websockets
+    except ImportError:
+        return
+    for _ in range(50):
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{port}/?channel={channel}") as ws:
+                async for msg in ws:
+                    try:
+                        event = json.loads(msg).get("event", "?")
+                    except ValueError:
+                        event = "?"
+                    recorder.overlay[event] = recorder.overlay.get(event, 0) + 1
+        except (OSError, Exception):
+            await asyncio.sleep(0.2)
+
+
+def scrape_metrics(http_port: int) -> dict:
+    """A bot /metrics végpontjából az eldobások (best effort)."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{http_port}/metrics", timeout=2) as resp:
+            text = resp.read().decode()
+    except OSError:
+        return {}
+    out = {}
+    for line in text.splitlines():
+        if line.startswith(("bot_inbound_shed_total", "bot_outbound_messages_total",
+                            "bot_irc_send_messages_total", "bot_irc_send_reconnects_total")):
+            name, value = line.rsplit(" ", 1)
+            out[name] = float(value)
+    return out
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    replay = load_replay(args.replay) if args.replay else None
+    channels = sorted({e[1] for e in replay}) if replay else [f"load{i}" for i in range(1, args.channels + 1)]
+    script = Script(channels, rng)
+    recorder = Recorder()
+    record = open(args.record, "w", encoding="utf-8") if args.record else None
+
+    standin = TwitchStandIn()
+    standin.listeners.append(recorder.reply)
+    standin.listeners.append(script.observe)
+    await standin.start("127.0.0.1", args.port)
+    general = _general_config()
+    proc = None if args.no_spawn else spawn_bot(channels, args.port, not args.no_mod, args.bot_log,
+                                                args.send_connections)
+    try:
+        deadline = time.monotonic() + 60
+        while any(not standin.channels.get(c) for c in channels):
+            if time.monotonic() > deadline or (proc is not None and proc.poll() is not None):
+                raise SystemExit("❌ A bot nem csatlakozott a stand-inhez (--bot-log a részletekhez).")
+            await asyncio.sleep(0.1)
+        overlay = [asyncio.get_event_loop().create_task(watch_overlay(general.get("WS_PORT", 8765), recorder, c))
+                   for c in channels]
+        await asyncio.sleep(0.5)
+
+        t0 = time.monotonic()
+        sent = 0
+        budget = 0.0
+        next_burst = t0 + args.burst_every if args.burst_every else None
+        next_kick = t0 + args.kick_every if args.kick_every else None
+        cursor = 0
+        duration = args.duration
+        while True:
+            now = time.monotonic()
+            elapsed = now - t0
+            if (cursor >= len(replay)) if replay else elapsed >= duration:
+                break
+            batch = []
+            if replay:
+                while cursor < len(replay) and replay[cursor][0] / args.speed <= elapsed:
+                    batch.append(replay[cursor][1:])
+                    cursor += 1
+            else:
+                budget += args.rate * TICK
+                while budget >= 1.0:
+                    batch.append(script.next())
+                    budget -= 1.0
+                if next_burst is not None and now >= next_burst:
+                    batch.extend(script.next("hangman") for _ in range(args.burst_size))
+                    next_burst += args.burst_every
+            if next_kick is not None and now >= next_kick:
+                # a bot küldő kapcsolatai közül egy (aki eddig PRIVMSG-et küldött, és még él)
+                senders = [n for n in standin.by_client if n in standin.clients.values()]
+                if senders:
+                    await standin.kick(rng.choice(sorted(senders)))
+                next_kick += args.kick_every
+            for ch, user, text, mod in batch:
+                if standin.inject(ch, user, text, mod):
+                    recorder.expect(ch, *classify(text))
+                    sent += 1
+                    if record is not None:
+                        record.write(json.dumps({"t": round(elapsed, 3), "ch": ch, "user": user, "text": text,
+                                                 "mod": mod}, ensure_ascii=False) + "\n")
+            await standin.flush()
+            recorder.expire()
+            await asyncio.sleep(max(0.0, TICK - (time.monotonic() - now)))
+        elapsed = time.monotonic() - t0
+
+        await asyncio.sleep(min(REPLY_TIMEOUT, args.drain))    # a késő válaszok még beérhetnek
+        recorder.expire(0.0)
+        for task in overlay:
+            task.cancel()
+        server = scrape_metrics(general.get("HTTP_PORT", 8000))
+    finally:
+        if record is not None:
+            record.close()
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        await standin.close()
+
+    seconds = sorted(recorder.per_second.values())
+    return {
+        "channels": len(channels),
+        "seed": args.seed,
+        "duration_s": round(elapsed, 2),
+        "sent": sent,
+        "sent_per_s": round(sent / elapsed, 1) if elapsed else None,
+        "sent_by_kind": recorder.sent,
+        "bot_messages": recorder.replies,
+        "bot_messages_per_s": {"avg": round(recorder.replies / elapsed, 2) if elapsed else None,
+                               "peak": seconds[-1] if seconds else 0},
+        "latency": {kind: percentiles(v) for kind, v in sorted(recorder.latency.items())},
+        "unanswered": recorder.unanswered,
+        "overlay_events": recorder.overlay,
+        "by_connection": dict(sorted(standin.by_client.items())),
+        "unjoined": standin.unjoined,
+        "kicks": standin.kicks,
+        "server": server,
+    }
+
+
+def _general_config() -> dict:
+    try:
+        with open(os.path.join(ROOT, "config.json"), encoding="utf-8") as f:
+            return json.load(f).get("general", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--channels", type=int, default=4)
+    ap.add_argument("--rate", type=float, default=500, help="üzenet / mp (összesen)")
+    ap.add_argument("--duration", type=float, default=30)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--burst-every", type=float, default=0, help="ennyi mp-enként egy !tipp-lökés (0 = nincs)")
+    ap.add_argument("--burst-size", type=int, default=200)
+    ap.add_argument("--replay", help="felvett forgalom (JSON-sorok)")
+    ap.add_argument("--speed", type=float, default=1.0, help="visszajátszás gyorsítása")
+    ap.add_argument("--record", help="a generált forgalom mentése (visszajátszható)")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--drain", type=float, default=3.0, help="ennyit várunk a késő válaszokra")
+    ap.add_argument("--send-connections", type=int, help="a bot küldőkapcsolatai (alapból a config.json)")
+    ap.add_argument("--kick-every", type=float, default=0,
+                    help="ennyi mp-enként egy küldőkapcsolat bontása (0 = nincs)")
+    ap.add_argument("--no-spawn", action="store_true", help="a botot kézzel indítod (TWITCH_IRC_URL-lel)")
+    ap.add_argument("--no-mod", action="store_true", help="a bot nem moderátor (20 üzenet / 30 mp)")
+    ap.add_argument("--bot-log", help="a bot kimenete ide kerül")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    print(f"{report['channels']} csatorna, {report['duration_s']} mp, seed {report['seed']}")
+    print(f"  elküldve: {report['sent']} ({report['sent_per_s']}/mp)  {report['sent_by_kind']}")
+    print(f"  bot üzenetei: {report['bot_messages']} (átlag {report['bot_messages_per_s']['avg']}/mp, "
+          f"csúcs {report['bot_messages_per_s']['peak']}/mp)")
+    print("  válaszidő parancsfajtánként:")
+    for kind, p in report["latency"].items():
+        print(f"    {kind:<10} n={p['n']:<6} p50 {p['p50_ms']:>8} ms  p90 {p['p90_ms']:>8} ms  "
+              f"p99 {p['p99_ms']:>8} ms  max {p['max_ms']:>8} ms")
+    print(f"  megválaszolatlan: {report['unanswered'] or '-'}")
+    print(f"  overlay események: {report['overlay_events'] or '-'}")
+    print(f"  kapcsolatonként: {report['by_connection'] or '-'}  (JOIN nélkül: {report['unjoined']}, "
+          f"bontva: {report['kicks']})")
+    if report["server"]:
+        print("  a bot szerint:")
+        for name, value in report["server"].items():
+            print(f"    {name} {value:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Offline elemzés a játékesemény-naplóból (events/*.jsonl.gz).
+
+A fájlokon időrendben, soronként megy végig – a memóriahasználat a naplók
+méretétől független (csak kategóriánként / táblaméretenként tart összesítést).
+Kiírja:
+  - akasztófa, kategóriánként: játékok, nyerési arány, tippek és hibák átlaga,
+    megfejtési idő (átlag / medián / p90), hint, angyal, ördög, timeout
+  - amőba, mód és táblaméret szerint: játékok, AI elleni meccsek és az AI
+    nyerési aránya, döntetlenek, lépésszám és játékidő átlaga, timeoutok
+
+Használat:
+    python tools/event_stats.py [events] [--since 2025-01-01] [--until 2025-02-01]
+                                [--channel gixing] [--json]
+"""
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.events import FILE_PREFIX, log_files, read_events   # noqa: E402
+
+HIST_BUCKET = 5.0       # mp – a medián/p90 ennyi pontos (rögzített méretű hisztogram)
+
+
+class Histogram:
+    """Kvantilisek állandó memóriában: HIST_BUCKET széles vödrök."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        b = int(value // HIST_BUCKET)
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        self.count += 1
+        self.total += value
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= target:
+                return (b + 0.5) * HIST_BUCKET
+        return None
+
+
+class Agg:
+    """Egy csoport (kategória / mód+méret) összesítése."""
+
+    def __init__(self):
+        self.counts = {}
+        self.sums = {}
+        self.solve = Histogram()
+
+    def inc(self, key: str, n: int = 1):
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def add(self, key: str, value: float):
+        self.sums[key] = self.sums.get(key, 0.0) + value
+
+    def avg(self, key: str, base: str):
+        n = self.counts.get(base, 0)
+        return self.sums.get(key, 0.0) / n if n else None
+
+    def rate(self, key: str, base: str):
+        n = self.counts.get(base, 0)
+        return self.counts.get(key, 0) / n if n else None
+
+
+class Analyzer:
+    def __init__(self):
+        self.hangman = {}       # kategória -> Agg
+        self.amoeba = {}        # "mód méret" -> Agg
+        self.events = 0
+        self.first = None
+        self.last = None
+
+    def feed(self, ev: dict):
+        self.events += 1
+        t = ev.get("t", 0.0)
+        self.first = t if self.first is None else min(self.first, t)
+        self.last = t if self.last is None else max(self.last, t)
+        game, kind = ev.get("g"), ev.get("e")
+        if game == "akasztofa":
+            self._hangman(kind, ev)
+        elif game == "amoeba":
+            self._amoeba(kind, ev)
+
+    def _hangman(self, kind: str, ev: dict):
+        if kind == "timeout":
+            self.hangman.setdefault(ev.get("category", "?"), Agg()).inc("timeouts")
+            return
+        if kind != "end":
+            return
+        a = self.hangman.setdefault(ev.get("category", "?"), Agg())
+        a.inc("games")
+        a.add("guesses", ev.get("guesses", 0))
+        a.add("wrong", ev.get("wrong", 0))
+        a.add("length", ev.get("length", 0))
+        a.inc("devils", ev.get("devils", 0))
+        if ev.get("hint"):
+            a.inc("hints")
+        if ev.get("bonus_life"):
+            a.inc("angels")
+        if ev.get("result") == "win":
+            a.inc("wins")
+            a.solve.add(ev.get("duration", 0.0))
+
+    def _amoeba(self, kind: str, ev: dict):
+        key = f"{ev.get('mode', '?')} {ev.get('size', '?')}"
+        if kind == "timeout":
+            self.amoeba.setdefault(key, Agg()).inc("timeouts")
+            return
+        if kind != "end":
+            return
+        a = self.amoeba.setdefault(key, Agg())
+        a.inc("games")
+        a.add("moves", ev.get("moves", 0))
+        a.add("duration", ev.get("duration", 0.0))
+        if ev.get("result") == "draw":
+            a.inc("draws")
+        if ev.get("ai"):
+            a.inc("ai_games")
+            if ev.get("winner_ai"):
+                a.inc("ai_wins")
+
+    # --------- kimenet ---------
+    def report(self) -> dict:
+        out = {"events": self.events, "from": _fmt_ts(self.first), "to": _fmt_ts(self.last),
+               "akasztofa": {}, "amoeba": {}}
+        for cat, a in sorted(self.hangman.items()):
+            out["akasztofa"][cat] = {
+                "games": a.counts.get("games", 0),
+                "win_rate": _r(a.rate("wins", "games")),
+                "avg_guesses": _r(a.avg("guesses", "games")),
+                "avg_wrong": _r(a.avg("wrong", "games")),
+                "avg_length": _r(a.avg("length", "games")),
+                "solve_avg_s": _r(a.solve.mean()),
+                "solve_p50_s": _r(a.solve.quantile(0.5)),
+                "solve_p90_s": _r(a.solve.quantile(0.9)),
+                "hint_rate": _r(a.rate("hints", "games")),
+                "angel_rate": _r(a.rate("angels", "games")),
+                "devils_per_game": _r(a.rate("devils", "games")),
+                "timeouts": a.counts.get("timeouts", 0),
+            }
+        for key, a in sorted(self.amoeba.items()):
+            out["amoeba"][key] = {
+                "games": a.counts.get("games", 0),
+                "ai_games": a.counts.get("ai_games", 0),
+                "ai_win_rate": _r(a.rate("ai_wins", "ai_games")),
+                "draw_rate": _r(a.rate("draws", "games")),
+                "avg_moves": _r(a.avg("moves", "games")),
+                "avg_duration_s": _r(a.avg("duration", "games")),
+                "timeouts": a.counts.get("timeouts", 0),
+            }
+        return out
+
+
+def _r(value, digits: int = 3):
+    return None if value is None else round(value, digits)
+
+
+def _fmt_ts(ts):
+    return None if ts is None else time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))
+
+
+def _parse_day(text: str) -> float:
+    return calendar.timegm(time.strptime(text, "%Y-%m-%d"))
+
+
+def _file_start(path: str) -> float:
+    """A fájlnévből az első írás ideje (events-20250101T120000123[-tag].jsonl.gz)."""
+    stamp = os.path.basename(path)[len(FILE_PREFIX):len(FILE_PREFIX) + 15]
+    try:
+        return calendar.timegm(time.strptime(stamp, "%Y%m%dT%H%M%S"))
+    except ValueError:
+        return 0.0
+
+
+def print_table(title: str, columns: list, rows: dict):
+    print(f"\n== {title} ==")
+    if not rows:
+        print("  (nincs adat)")
+        return
+    width = max(len(k) for k in rows) + 2
+    widths = [max(10, len(c)) + 2 for c in columns]
+    print(" " * width + "".join(f"{c:>{w}}" for c, w in zip(columns, widths)))
+    for key, values in rows.items():
+        cells = "".join(f"{'-' if values[c] is None else values[c]:>{w}}" for c, w in zip(columns, widths))
+        print(f"{key:<{width}}" + cells)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("directory", nargs="?", default=os.path.join(ROOT, "events"))
+    ap.add_argument("--since", help="YYYY-MM-DD (UTC, beleértve)")
+    ap.add_argument("--until", help="YYYY-MM-DD (UTC, kizárva)")
+    ap.add_argument("--channel")
+    ap.add_argument("--json", action="store_true", help="JSON kimenet (pl. további feldolgozáshoz)")
+    args = ap.parse_args()
+
+    since = _parse_day(args.since) if args.since else None
+    until = _parse_day(args.until) if args.until else None
+    channel = args.channel.lower() if args.channel else None
+
+    files = log_files(args.directory)
+    if until is not None:
+        files = [f for f in files if _file_start(f) < until]
+
+    analyzer = Analyzer()
+    for path in files:
+        for ev in read_events(path):
+            t = ev.get("t", 0.0)
+            if since is not None and t < since:
+                continue
+            if until is not None and t >= until:
+                continue
+            if channel and ev.get("ch") != channel:
+                continue
+            analyzer.feed(ev)
+
+    report = analyzer.report()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    print(f"{len(files)} fájl, {report['events']} esemény ({report['from']} – {report['to']})")
+    print_table("Akasztófa kategóriánként", ["games", "win_rate", "avg_guesses", "avg_wrong",
+                                             "solve_p50_s", "solve_p90_s", "angel_rate",
+                                             "devils_per_game", "timeouts"], report["akasztofa"])
+    print_table("Amőba mód és méret szerint", ["games", "ai_games", "ai_win_rate", "draw_rate",
+                                               "avg_moves", "avg_duration_s", "timeouts"], report["amoeba"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""A journal költsége lépésenként, és a visszatöltés ideje.
+
+Ugyanazt a lépéssorozatot futtatja journal nélkül és journallal (ideiglenes
+könyvtárban, valódi fsync-kel), és kiírja:
+  - µs / lépés mindkét esetben és a különbséget
+  - bájt / lépés, fsync-ek száma (kötegelés hatása)
+  - a journal visszajátszásának idejét (újraindítás utáni folytatás)
+
+Két forgatókönyv:
+  - amőba-lépések két játékos között (minden lépés valódi állapotváltozás)
+  - akasztófa !tipp-roham (raid): --viewers különböző néző tippel az alapértelmezett
+    cooldownokkal, így a tippek nagy része elutasított vagy már volt; a játék előtte
+    --history korábbi tippelőt látott (régóta futó stream)
+
+Használat:
+    python tools/journal_bench.py [--moves 2000] [--tipps 2000] [--viewers 1000] [--history 2000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import game_interface                   # noqa: E402
+from core.journal import Journal        # noqa: E402
+from core.runtime import GameRuntime    # noqa: E402
+
+
+class _SinkOutbox:
+    def send(self, channel, text, priority=None):
+        return True
+
+
+def _no_overlay(self, payload, refresh=True):
+    pass
+
+
+async def _drain(game):
+    await game.actor.ask(lambda: None)
+
+
+async def play(moves: int, journal=None):
+    """Amőba-lépések két játékos között (a tábla betelésekor új meccs); µs/lépés.
+
+    Csak a lépés átmenetét mérjük (a lépésválasztó heurisztika kimarad), és fix
+    seed-del, hogy a két futás ugyanazt a lépéssorozatot játssza.
+    """
+    random.seed(1)
+    runtime = GameRuntime(None, _SinkOutbox(), journal=journal)
+    runtime.join("bench")
+    game = runtime.spawn("bench", "amoeba")
+    await _drain(game)
+
+    done = 0
+    elapsed = 0.0
+    while done < moves:
+        if not (game.game and game.game.active):
+            await game.actor.ask(game.challenge_cmd, "p1", "p2")
+            await game.actor.ask(game.accept, "p2")
+        g = game.game
+        coord = _coord(g.mode, game._best_move())
+        t0 = time.perf_counter()
+        await game.actor.ask(game.move, g.current_player, coord)
+        elapsed += time.perf_counter() - t0
+        done += 1
+    runtime.part("bench")
+    if journal is not None:
+        await journal.flush()
+    return elapsed / moves * 1e6
+
+
+async def tipp_burst(tipps: int, viewers: int, history: int, journal=None):
+    """Akasztófa !tipp-roham fix seed-del; µs/tipp."""
+    random.seed(1)
+    runtime = GameRuntime(None, _SinkOutbox(), journal=journal)
+    runtime.join("bench")
+    game = runtime.spawn("bench", "akasztofa")
+    await _drain(game)
+    game.config = runtime.config.set(game.name, "NEW_GAME_COOLDOWN", 0, "bench")
+    long_ago = time.time() - 3600
+    game.last_user_tip = {f"regi{i}": long_ago + i for i in range(history)}
+
+    letters = "aábcdeéfghiíjklmnoóöőpqrstuúüűvz"
+    elapsed = 0.0
+    for i in range(tipps):
+        if not game.active:
+            await game.actor.ask(game.new_game, "starter")
+        user = f"viewer{random.randrange(viewers)}"
+        letter = random.choice(letters)
+        t0 = time.perf_counter()
+        await game.actor.ask(game.tipp, user, letter)
+        elapsed += time.perf_counter() - t0
+    runtime.part("bench")
+    if journal is not None:
+        await journal.flush()
+    return elapsed / tipps * 1e6
+
+
+def _coord(mode, mv):
+    if mode == "connect4":
+        return str(mv + 1)
+    r, c = mv
+    return f"{chr(65 + c)}{r + 1}"
+
+
+async def bench(moves: int, tipps: int, viewers: int, history: int):
+    game_interface.BaseGame.write_overlay = _no_overlay
+    base = await play(moves)
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Journal(tmp)
+        with_journal = await play(moves, journal)
+        stats = journal.stats()
+
+        # újraindítás: új runtime ugyanabból a könyvtárból
+        restarted = Journal(tmp)
+        runtime = GameRuntime(None, _SinkOutbox(), journal=restarted)
+        t0 = time.perf_counter()
+        await runtime.resume("bench")
+        recover_ms = (time.perf_counter() - t0) * 1000
+        runtime.part("bench")
+        await restarted.flush()
+
+    print(f"== {moves} amőba-lépés ==")
+    print(f"  journal nélkül:   {base:8.1f} µs/lépés")
+    print(f"  journallal:       {with_journal:8.1f} µs/lépés  (+{with_journal - base:.1f} µs)")
+    print(f"  bájt/lépés:       {stats['bytes'] / max(1, stats['records']):8.0f}")
+    print(f"  fsync:            {stats['fsyncs']:8d}  ({stats['records']} bejegyzés, "
+          f"{stats['compactions']} tömörítés)")
+    print(f"  visszatöltés:     {recover_ms:8.2f} ms")
+
+    base = await tipp_burst(tipps, viewers, history)
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Journal(tmp)
+        with_journal = await tipp_burst(tipps, viewers, history, journal)
+        stats = journal.stats()
+    print(f"\n== {tipps} akasztófa-tipp ({viewers} néző, {history} korábbi tippelő) ==")
+    print(f"  journal nélkül:   {base:8.1f} µs/tipp")
+    print(f"  journallal:       {with_journal:8.1f} µs/tipp  (+{with_journal - base:.1f} µs)")
+    print(f"  bejegyzés:        {stats['records']:8d}  ({stats['unchanged']} változatlan kihagyva)")
+    print(f"  bájt összesen:    {stats['bytes']:8d}  ({stats['bytes'] / max(1, stats['records']):.0f} / bejegyzés)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--moves", type=int, default=2000)
+    ap.add_argument("--tipps", type=int, default=2000)
+    ap.add_argument("--viewers", type=int, default=1000)
+    ap.add_argument("--history", type=int, default=2000, help="korábbi tippelők a játék cooldown-nyilvántartásában")
+    args = ap.parse_args()
+    asyncio.get_event_loop().run_until_complete(bench(args.moves, args.tipps, args.viewers, args.history))
+
+
+if __name__ == "__main__":
+    main()
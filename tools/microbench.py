@@ -0,0 +1,385 @@
+"""Mikrobenchmarkok a játékok forró útvonalaira, alapvonallal és regresszió-figyeléssel.
+
+Minden mérés fix seed-del előállított állásokon fut (ugyanaz a szó, ugyanazok a
+táblák minden futásban), így két futás ugyanazt a munkát méri:
+  - akasztofa: mask_word, lives_status, a !tipp döntési útja (betű/szó, talált,
+    rossz, már volt), load_catalog
+  - amoeba: GameBoard.make_move, _check_victory, smart_ai_move 13x13 és 19x19
+    táblán, _connect4_best_column
+  - overlay: to_dict / overlay_payload + json.dump (ahogy a write_overlay írja)
+
+Esetenként több ismétlés közül a leggyorsabb számít (ns / művelet). Az eredmény
+összevethető a tools/microbench_baseline.json alapvonallal: ha egy eset a küszöbnél
+(alapból 25%) többet lassult – egy megismételt mérés után is –, a kilépési kód 1.
+A --save felülírja az alapvonalat (szűrővel csak a lefutott eseteket, több kör
+legjobbjával). Az alapvonal gépfüggő: ugyanazon a gépen érdemes menteni és összevetni.
+
+Használat:
+    python tools/microbench.py [-k amoeba] [--repeat 7] [--threshold 0.25]
+                               [--baseline tools/microbench_baseline.json] [--save] [--json]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import wire                                       # noqa: E402
+from core.runtime import GameRuntime                        # noqa: E402
+from games.akasztofa import bot as akasztofa                # noqa: E402
+from games.amoeba.bot import GameBoard                      # noqa: E402
+
+SEED = 1
+DEFAULT_BASELINE = os.path.join(ROOT, "tools", "microbench_baseline.json")
+DEFAULT_THRESHOLD = 0.25    # ennyi relatív lassulás felett regresszió
+MIN_RUN_TIME = 0.02         # egy ismétlés legalább ennyi mp-ig fusson (ebből jön a hívásszám)
+SAVE_ROUNDS = 3             # mentéskor ennyi teljes kör legjobbja kerül az alapvonalba
+
+
+class _SinkOutbox:
+    def send(self, channel, text, priority=None):
+        return True
+
+
+# ===============================
+# Fix állások
+# ===============================
+def _position(mode: str, size: int, win: int, stones: int, seed: int = SEED):
+    """Seedelt, még nyitott állás: felváltva lerakott kövek, nyerő lerakás nélkül.
+
+    Visszaadja a táblát és a lerakás sorrendjét (a make_move ezt játssza vissza).
+    """
+    g = GameBoard(mode, size, win)
+    g.start("p1", "p2")
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(g.rows) for c in range(g.cols)]
+    rng.shuffle(cells)
+    marks = ("☠️", "🩸")
+    moves = []
+    for cell in cells:
+        if len(moves) >= stones:
+            break
+        if mode == "connect4":
+            col = cell[1]
+            row = next((r for r in range(g.rows - 1, -1, -1) if g.board[r][col] == " "), None)
+            if row is None:
+                continue
+            cell, move = (row, col), col
+        else:
+            move = cell
+        mark = marks[len(moves) % 2]
+        g.board[cell[0]][cell[1]] = mark
+        if g._check_victory(cell[0], cell[1], mark):
+            g.board[cell[0]][cell[1]] = " "
+            continue
+        moves.append((cell, move))
+    g.moves = len(moves)
+    return g, moves
+
+
+def _hangman():
+    """Akasztófa-példány a valódi modulból, cooldownok és véletlen események nélkül."""
+    runtime = GameRuntime(None, _SinkOutbox())
+    akasztofa.prepare(runtime)
+    game = runtime.factories["akasztofa"]("bench")
+    game.config = {**game.config, "PERSONAL_TIPP_COOLDOWN": 0, "GLOBAL_TIPP_COOLDOWN": 0,
+                   "ANGEL_CHANCE": 0, "DEVIL_CHANCE": 0}
+    random.seed(SEED)
+    game.active = True
+    game.game_id = "bench"
+    game._roll_theme_and_word()
+    return game
+
+
+# ===============================
+# Esetek: név -> előkészítő, ami (hívható, műveletek száma hívásonként) párt ad
+# ===============================
+def case_mask_word():
+    catalog = akasztofa.load_catalog()
+    rng = random.Random(SEED)
+    words = [rng.choice(catalog[rng.choice(sorted(catalog))]).lower() for _ in range(100)]
+    revealed = [set(rng.sample(w, k=len(w) // 2)) for w in words]
+    pairs = list(zip(words, revealed))
+    mask_word = akasztofa.mask_word
+
+    def run():
+        for word, letters in pairs:
+            mask_word(word, letters)
+    return run, len(pairs)
+
+
+def case_lives_status():
+    rng = random.Random(SEED)
+    items = [(["X"] * rng.randint(0, 6), rng.choice((4, 5, 6, 7, 8)), rng.randint(0, 1)) for _ in range(100)]
+    lives_status = akasztofa.lives_status
+
+    def run():
+        for wrong, stages, bonus in items:
+            lives_status(wrong, stages, bonus)
+    return run, len(items)
+
+
+def case_tipp():
+    game = _hangman()
+    word = game.secret_word
+    hits = sorted({c for c in word if c.isalpha()})[:3]
+    misses = [c for c in "qxwyzjvkf" if c not in word][:2]
+    # talált, rossz, már volt, rossz szó, egyéb input – a nyerés/vesztés nélküli ág
+    guesses = [*hits, *misses, hits[0], misses[0], "nemaszo", "?"]
+    users = [f"user{i}" for i in range(len(guesses))]
+    tipp = game.tipp
+
+    def run():
+        game.active = True
+        game.guessed_letters = set()
+        game.wrong_items = []
+        game.guesses = 0
+        for user, guess in zip(users, guesses):
+            tipp(user, guess)
+    return run, len(guesses)
+
+
+def case_load_catalog():
+    return akasztofa.load_catalog, 1
+
+
+def _case_make_move(size: int, stones: int):
+    def setup():
+        g, moves = _position("amoeba", size, 5, stones)
+        for (r, c), _ in moves:
+            g.board[r][c] = " "
+        seq = [move for _, move in moves]
+
+        def run():
+            g.active = True
+            g.winner = ""
+            g.current_player = "p1"
+            g.moves = 0
+            for move in seq:
+                g.make_move(g.current_player, move)
+            for r, c in seq:
+                g.board[r][c] = " "
+        return run, len(seq)
+    return setup
+
+
+def _case_check_victory(size: int, stones: int):
+    def setup():
+        g, moves = _position("amoeba", size, 5, stones)
+        cells = [(r, c, g.board[r][c]) for (r, c), _ in moves]
+        check = g._check_victory
+
+        def run():
+            for r, c, mark in cells:
+                check(r, c, mark)
+        return run, len(cells)
+    return setup
+
+
+def _case_smart_ai(size: int, stones: int):
+    def setup():
+        g, _ = _position("amoeba", size, 5, stones)
+
+        def run():
+            random.seed(SEED)
+            g.smart_ai_move()
+        return run, 1
+    return setup
+
+
+def case_connect4():
+    g, _ = _position("connect4", 6, 4, 16)
+
+    def run():
+        random.seed(SEED)
+        g._connect4_best_column()
+    return run, 1
+
+
+def case_overlay_amoeba():
+    g, _ = _position("amoeba", 19, 5, 90)
+
+    def run():
+        json.dump(g.to_dict(), io.StringIO(), ensure_ascii=False, indent=2)
+    return run, 1
+
+
+def case_overlay_akasztofa():
+    game = _hangman()
+    game.guessed_letters = set(game.secret_word[:3])
+    game.wrong_items = ["Q", "X", "🧩"]
+
+    def run():
+        json.dump(game.overlay_payload(), io.StringIO(), ensure_ascii=False, indent=2)
+    return run, 1
+
+
+def _case_wire(fmt: str, game: str):
+    def setup():
+        if game == "amoeba":
+            g, _ = _position("amoeba", 19, 5, 90)
+            state = g.to_dict()
+        else:
+            g = _hangman()
+            g.wrong_items = ["Q", "X", "🧩"]
+            state = g.overlay_payload()
+        payload = {"event": "refresh", "game": game, "channel": "bench", "state": state}
+
+        def run():
+            wire.encode(payload, fmt)
+        return run, 1
+    return setup
+
+
+CASES = {
+    "akasztofa.mask_word": case_mask_word,
+    "akasztofa.lives_status": case_lives_status,
+    "akasztofa.tipp": case_tipp,
+    "akasztofa.load_catalog": case_load_catalog,
+    "amoeba.make_move[13]": _case_make_move(13, 40),
+    "amoeba.make_move[19]": _case_make_move(19, 90),
+    "amoeba.check_victory[13]": _case_check_victory(13, 40),
+    "amoeba.check_victory[19]": _case_check_victory(19, 90),
+    "amoeba.smart_ai_move[13]": _case_smart_ai(13, 40),
+    "amoeba.smart_ai_move[19]": _case_smart_ai(19, 90),
+    "amoeba.connect4_best_column": case_connect4,
+    "overlay.amoeba[19]": case_overlay_amoeba,
+    "overlay.akasztofa": case_overlay_akasztofa,
+    "wire.json[amoeba19]": _case_wire("json", "amoeba"),
+    "wire.bin[amoeba19]": _case_wire("bin", "amoeba"),
+    "wire.json[akasztofa]": _case_wire("json", "akasztofa"),
+    "wire.bin[akasztofa]": _case_wire("bin", "akasztofa"),
+}
+
+
+# ===============================
+# Mérés
+# ===============================
+def measure(fn, ops: int, repeat: int) -> dict:
+    """ns / művelet: a legjobb és a medián ismétlés (egy ismétlés >= MIN_RUN_TIME)."""
+    fn()    # bemelegítés
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= MIN_RUN_TIME:
+            break
+        number *= 2
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter_ns() - t0) / (number * ops))
+    runs.sort()
+    return {"ns": round(runs[0], 1), "median_ns": round(runs[len(runs) // 2], 1), "loops": number * ops}
+
+
+def run_cases(pattern: str = None, repeat: int = 7, names=None) -> dict:
+    results = {}
+    for name, setup in CASES.items():
+        if (pattern and pattern not in name) or (names is not None and name not in names):
+            continue
+        fn, ops = setup()
+        results[name] = measure(fn, ops, repeat)
+    return results
+
+
+def best_of(results: dict, more: dict) -> dict:
+    return {name: min(r, more.get(name, r), key=lambda x: x["ns"]) for name, r in results.items()}
+
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "system": platform.system(), "processor": platform.processor()}
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """Eset -> {"baseline_ns", "change", "regressed"}; ami nincs az alapvonalban, kimarad."""
+    base = baseline.get("results", {})
+    out = {}
+    for name, r in results.items():
+        if name not in base:
+            continue
+        ref = base[name]["ns"]
+        change = r["ns"] / ref - 1.0 if ref else 0.0
+        out[name] = {"baseline_ns": ref, "change": round(change, 4), "regressed": change > threshold}
+    return out
+
+
+def save_baseline(path: str, results: dict, baseline: dict):
+    merged = dict(baseline.get("results", {}))
+    merged.update(results)
+    data = {"version": 1, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": SEED,
+            "environment": environment(), "results": dict(sorted(merged.items()))}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-k", dest="pattern", help="csak a nevükben ezt tartalmazó esetek")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="megengedett lassulás (0.25 = 25%%)")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--save", action="store_true", help="az eredmény legyen az új alapvonal")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    results = run_cases(args.pattern, args.repeat)
+    baseline = load_baseline(args.baseline)
+    if args.save:
+        for _ in range(SAVE_ROUNDS - 1):
+            results = best_of(results, run_cases(args.pattern, args.repeat))
+    diff = compare(results, baseline, args.threshold)
+    suspects = [name for name, d in diff.items() if d["regressed"]]
+    if suspects and not args.save:
+        # zajszűrés: a gyanús esetek még egy kört kapnak, és a jobbik eredmény számít
+        results = best_of(results, run_cases(names=suspects, repeat=args.repeat))
+        diff = compare(results, baseline, args.threshold)
+    regressed = sorted(name for name, d in diff.items() if d["regressed"])
+
+    if args.json:
+        print(json.dumps({"environment": environment(), "threshold": args.threshold, "results": results,
+                          "compare": diff, "regressed": regressed}, ensure_ascii=False, indent=2))
+    else:
+        if baseline and baseline.get("environment") != environment():
+            print(f"[⚠️] Az alapvonal más környezetben készült: {baseline.get('environment')}")
+        print(f"{'eset':<30} {'ns/művelet':>12} {'medián':>12} {'alapvonal':>12} {'változás':>9}")
+        for name, r in results.items():
+            d = diff.get(name)
+            ref = f"{d['baseline_ns']:>12.1f} {d['change']:>+8.1%}" if d else f"{'-':>12} {'-':>9}"
+            flag = "  ❌" if d and d["regressed"] else ""
+            print(f"{name:<30} {r['ns']:>12.1f} {r['median_ns']:>12.1f} {ref}{flag}")
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        if not args.json:
+            print(f"[💾] Alapvonal mentve: {args.baseline}")
+        return
+    if regressed:
+        if not args.json:
+            print(f"[❌] {len(regressed)} eset lassult {args.threshold:.0%}-nál többet: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
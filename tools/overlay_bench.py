@@ -0,0 +1,225 @@
+"""Overlay szétosztás mérése sok klienssel: gyors, lassú és megakadt böngészőforrások.
+
+Elindít egy HostAPI-t, rácsatlakoztat --clients WebSocket klienst (alapból 500), és
+--rate esemény / mp ütemben szór: 80% állapotfrissítés (refresh, --channels csatorna
+között), 20% különálló esemény (victory / devil / angel / game_over). A kliensek:
+  - gyors: mindent azonnal olvas – tőlük mérjük a kézbesítési időt (p50/p99/max)
+  - lassú (--slow): kis fogadópufferrel --slow-delay mp-enként 1 KB-ot olvas
+  - megakadt (--stalled): a kézfogás után semmit sem olvas
+
+Elvárt eredmény: a gyors kliensek késése nem nő a lassúak miatt, a lassúak minden
+különálló eseményt megkapnak (a refresh-ekből kevesebbet, összevonva), a megakadtakat
+a szerver bontja. A --legacy a korábbi (kliensenként üzenetenként egy task) szórást
+méri összehasonlításként.
+
+Használat:
+    python tools/overlay_bench.py [--clients 500] [--slow 25] [--stalled 5]
+                                  [--rate 20] [--pad 2048] [--duration 20] [--legacy]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import host as host_module    # noqa: E402
+from core.host import HostAPI           # noqa: E402
+
+DISCRETE = ("victory", "devil", "angel", "game_over")
+RECV_BUFFER = 4096      # a lassú / megakadt kliensek fogadópuffere
+
+
+class _LegacyHost(HostAPI):
+    """A korábbi szórás: minden üzenet minden kliensnek külön taskban, sor és korlát nélkül."""
+
+    def _deliver(self, msg: str):
+        for ws in list(self.clients):
+            asyncio.ensure_future(self._send_legacy(ws, msg))
+
+    async def _send_legacy(self, ws, msg):
+        try:
+            await ws.send(msg)
+            self.sent += 1
+        except Exception:
+            self.clients.pop(ws, None)
+
+
+class _Stats:
+    def __init__(self):
+        self.latency = []
+        self.received = {"fast": {}, "slow": {}, "stalled": {}}
+        self.closed = {"fast": 0, "slow": 0, "stalled": 0}
+
+
+EVENT_RE = re.compile(rb'"event": ?"([a-z_]+)"')
+
+
+def _small_socket(port: int):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+    sock.setblocking(False)
+    return sock
+
+
+async def raw_client(kind: str, port: int, stats: _Stats, stop: asyncio.Event, slow_delay: float):
+    """Lassú / megakadt böngésző: nyers TCP, kis fogadópuffer, 1 KB olvasás --slow-delay mp-enként.
+
+    (A websockets kliens könyvtár a háttérben folyamatosan olvas, így nem tartana vissza.)
+    """
+    loop = asyncio.get_running_loop()
+    sock = _small_socket(port)
+    await loop.sock_connect(sock, ("127.0.0.1", port))
+    key = base64.b64encode(os.urandom(16)).decode()
+    await loop.sock_sendall(sock, (f"GET / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n"
+                                   f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                                   f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+    buf = b""
+    while b"\r\n\r\n" not in buf:
+        buf += await loop.sock_recv(sock, 1024)
+    buf = buf.split(b"\r\n\r\n", 1)[1]
+    counts = stats.received[kind]
+    try:
+        if kind == "stalled":
+            await stop.wait()
+            return
+        while not stop.is_set():
+            data = await loop.sock_recv(sock, 1024)
+            if not data:
+                stats.closed[kind] += 1
+                return
+            buf += data
+            end = 0
+            for m in EVENT_RE.finditer(buf):
+                event = m.group(1).decode()
+                counts[event] = counts.get(event, 0) + 1
+                end = m.end()
+            buf = buf[end:] if end else buf[-64:]
+            await asyncio.sleep(slow_delay)
+    finally:
+        sock.close()
+
+
+async def client(kind: str, port: int, stats: _Stats, stop: asyncio.Event, slow_delay: float):
+    if kind != "fast":
+        return await raw_client(kind, port, stats, stop, slow_delay)
+    import websockets
+    ws = await websockets.connect(f"ws://127.0.0.1:{port}/", max_queue=None)
+    counts = stats.received[kind]
+    try:
+        async for msg in ws:
+            now = time.perf_counter()
+            data = json.loads(msg)
+            counts[data["event"]] = counts.get(data["event"], 0) + 1
+            stats.latency.append(now - data["t"])
+            if stop.is_set():
+                return
+    except websockets.ConnectionClosed:
+        stats.closed[kind] += 1
+    finally:
+        await ws.close()
+
+
+def _pct(values: list) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def q(p):
+        return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 2)
+    return {"n": len(values), "p50_ms": q(0.5), "p99_ms": q(0.99), "max_ms": round(values[-1] * 1000, 2)}
+
+
+async def bench(args) -> dict:
+    rng = random.Random(1)
+    hub = (_LegacyHost if args.legacy else HostAPI)(host="127.0.0.1", port=0, max_lag=args.max_lag)
+    await hub.start()
+    port = list(hub._server.sockets)[0].getsockname()[1]
+    stats = _Stats()
+    stop = asyncio.Event()
+    kinds = ["stalled"] * args.stalled + ["slow"] * args.slow
+    kinds += ["fast"] * (args.clients - len(kinds))
+    tasks = []
+    for i in range(0, len(kinds), 50):      # kötegekben, hogy a kézfogások ne torlódjanak
+        tasks += [asyncio.ensure_future(client(k, port, stats, stop, args.slow_delay)) for k in kinds[i:i + 50]]
+        await asyncio.sleep(0.05)
+    while len(hub.clients) < len(kinds):
+        await asyncio.sleep(0.05)
+
+    pad = "x" * args.pad
+    sent = {}
+    broadcast_cost = []
+    lag = 0.0
+    interval = 1.0 / args.rate
+    t_end = time.monotonic() + args.duration
+    next_at = time.monotonic()
+    while time.monotonic() < t_end:
+        event = rng.choice(DISCRETE) if rng.random() < 0.2 else "refresh"
+        payload = {"event": event, "game": "akasztofa", "channel": f"ch{rng.randrange(args.channels)}",
+                   "t": time.perf_counter(), "pad": pad}
+        t0 = time.perf_counter()
+        hub.ws_broadcast(payload)
+        broadcast_cost.append(time.perf_counter() - t0)
+        sent[event] = sent.get(event, 0) + 1
+        next_at += interval
+        delay = next_at - time.monotonic()
+        lag = max(lag, -delay)
+        await asyncio.sleep(max(0.0, delay))
+
+    await asyncio.sleep(args.drain)
+    pending_tasks = len(asyncio.all_tasks())
+    host_stats = hub.stats()
+    stop.set()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    slow = stats.received["slow"]
+    slow_discrete = {e: slow.get(e, 0) for e in DISCRETE}
+    sent_discrete = sum(sent.get(e, 0) for e in DISCRETE)
+    return {
+        "mode": "legacy" if args.legacy else "hub",
+        "clients": {"fast": kinds.count("fast"), "slow": args.slow, "stalled": args.stalled},
+        "sent": sent,
+        "fast_latency": _pct(stats.latency),
+        "broadcast_call_us": {k.replace("_ms", "_us"): round(v * 1000, 1)
+                              for k, v in _pct(broadcast_cost).items() if k != "n"},
+        "producer_max_lag_ms": round(lag * 1000, 1),
+        "slow_received_per_client": {
+            "refresh": round(slow.get("refresh", 0) / max(1, args.slow), 1),
+            "discrete": round(sum(slow_discrete.values()) / max(1, args.slow), 1),
+            "discrete_sent": sent_discrete,
+        },
+        "closed_by_server": stats.closed,
+        "tasks_after_drain": pending_tasks,
+        "host": host_stats,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, default=500)
+    ap.add_argument("--slow", type=int, default=25)
+    ap.add_argument("--stalled", type=int, default=5)
+    ap.add_argument("--slow-delay", type=float, default=0.1, help="a lassú kliens ennyi mp-enként olvas 1 KB-ot")
+    ap.add_argument("--rate", type=float, default=20, help="esemény / mp")
+    ap.add_argument("--pad", type=int, default=2048, help="ennyi bájttal nagyobb minden üzenet (a pufferek hamarabb telnek)")
+    ap.add_argument("--channels", type=int, default=4)
+    ap.add_argument("--duration", type=float, default=20)
+    ap.add_argument("--drain", type=float, default=2.0)
+    ap.add_argument("--max-lag", type=float, default=host_module.MAX_CLIENT_LAG)
+    ap.add_argument("--legacy", action="store_true", help="a korábbi, task-alapú szórás mérése")
+    args = ap.parse_args()
+    report = asyncio.run(bench(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Helyi Redis stand-in a RESP állapottár kipróbálásához (valódi Redis nélkül).
+
+Csak azt tudja, amit a bot használ: PING, AUTH, SELECT, GET, SET, MGET, MSET,
+DEL, KEYS, DBSIZE, FLUSHDB, PUBLISH, SUBSCRIBE, UNSUBSCRIBE, QUIT.
+Mindent memóriában tart; a --stats kapcsolóval másodpercenként kiírja a
+feldolgozott parancsok számát.
+
+Használat:
+    python tools/resp_standin.py [--port 6379] [--stats]
+    STATE_STORE=redis://127.0.0.1:6379/0 python main_bot.py
+"""
+import argparse
+import asyncio
+import fnmatch
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    data = value if isinstance(value, bytes) else str(value).encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _array(items) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(_bulk(i) for i in items)
+
+
+OK = b"+OK\r\n"
+
+
+class StandInServer:
+    def __init__(self):
+        self.dbs = {}           # db index -> {kulcs: bytes}
+        self.channels = {}      # topic -> set(writer)
+        self.commands = 0
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()   # inline parancs (pl. telnet / redis-cli PING)
+        args = []
+        for _ in range(int(line[1:])):
+            header = await reader.readline()
+            size = int(header[1:])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    async def handle(self, reader, writer):
+        db = 0
+        subscribed = set()
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                self.commands += 1
+                cmd = args[0].decode().upper()
+                data = self.dbs.setdefault(db, {})
+                if cmd == "PING":
+                    writer.write(b"+PONG\r\n")
+                elif cmd == "AUTH":
+                    writer.write(OK)
+                elif cmd == "SELECT":
+                    db = int(args[1])
+                    writer.write(OK)
+                elif cmd == "GET":
+                    writer.write(_bulk(data.get(args[1])))
+                elif cmd == "SET":
+                    data[args[1]] = args[2]
+                    writer.write(OK)
+                elif cmd == "MGET":
+                    writer.write(_array([data.get(k) for k in args[1:]]))
+                elif cmd == "MSET":
+                    for i in range(1, len(args) - 1, 2):
+                        data[args[i]] = args[i + 1]
+                    writer.write(OK)
+                elif cmd == "DEL":
+                    removed = sum(1 for k in args[1:] if data.pop(k, None) is not None)
+                    writer.write(b":%d\r\n" % removed)
+                elif cmd == "KEYS":
+                    pattern = args[1].decode()
+                    writer.write(_array([k for k in data if fnmatch.fnmatchcase(k.decode(), pattern)]))
+                elif cmd == "DBSIZE":
+                    writer.write(b":%d\r\n" % len(data))
+                elif cmd == "FLUSHDB":
+                    data.clear()
+                    writer.write(OK)
+                elif cmd == "PUBLISH":
+                    subs = list(self.channels.get(args[1], ()))
+                    for sub in subs:
+                        sub.write(_array([b"message", args[1], args[2]]))
+                    writer.write(b":%d\r\n" % len(subs))
+                elif cmd == "SUBSCRIBE":
+                    for topic in args[1:]:
+                        self.channels.setdefault(topic, set()).add(writer)
+                        subscribed.add(topic)
+                        writer.write(b"*3\r\n" + _bulk(b"subscribe") + _bulk(topic) + b":%d\r\n" % len(subscribed))
+                elif cmd == "UNSUBSCRIBE":
+                    for topic in args[1:] or list(subscribed):
+                        self.channels.get(topic, set()).discard(writer)
+                        subscribed.discard(topic)
+                        writer.write(b"*3\r\n" + _bulk(b"unsubscribe") + _bulk(topic) + b":%d\r\n" % len(subscribed))
+                elif cmd == "QUIT":
+                    writer.write(OK)
+                    break
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % args[0])
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for topic in subscribed:
+                self.channels.get(topic, set()).discard(writer)
+            writer.close()
+
+    async def report(self):
+        last = 0
+        while True:
+            await asyncio.sleep(1.0)
+            if self.commands != last:
+                print(f"  parancs/s: {self.commands - last:6d}   "
+                      f"kulcsok: {sum(len(d) for d in self.dbs.values())}")
+                last = self.commands
+
+
+async def serve(host: str, port: int, stats: bool = False):
+    server = StandInServer()
+    srv = await asyncio.start_server(server.handle, host, port)
+    print(f"[🗄️] RESP stand-in: redis://{host}:{srv.sockets[0].getsockname()[1]}/0")
+    if stats:
+        asyncio.get_event_loop().create_task(server.report())
+    async with srv:
+        await srv.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6379)
+    ap.add_argument("--stats", action="store_true")
+    args = ap.parse_args()
+    try:
+        asyncio.get_event_loop().run_until_complete(serve(args.host, args.port, args.stats))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""Self-play bajnokság az amőba AI-k között (Twitch és overlay nélkül, minden magon).
+
+Motorok párosával, minden táblatípuson, színcserés párokban játszanak egymás ellen
+a valódi GameBoard szabályaival (make_move, _check_victory). Motorok (--engines,
+`név[:kulcs=érték,...]`):
+  - random                      véletlen szabad mező / oszlop
+  - heuristic[:defense=1.5]     a bot AI-ja (GameBoard.smart_ai_move, connect4-en
+                                _connect4_best_column); defense = az ellenfél sorainak súlya
+  - playout[:candidates=8,depth=40,budget=50]
+                                a heurisztika legjobb jelöltjei közül véletlen
+                                lejátszásokkal választ, lépésenként `budget` ms-ig
+                                (alapból --budget-ms)
+
+Táblatípusok (--boards, `mód:méret:nyeréshez`): alapból az amoeba BOARD_TYPES
+alapértéke. A --opening N véletlen nyitólépést tesz a játszma elejére; egy színcserés
+pár ugyanazzal a nyitással indul.
+
+Táblatípusonként kiírja: Elo (az első motorhoz rögzítve, 95%-os konfidencia-
+intervallummal), pontszázalék, döntetlenarány, átlagos játszmahossz, motoronként
+ms / lépés és csomópont / mp (csomópont: kiértékelt mező vagy lejátszott lépés).
+
+Minden befejezett játszma azonnal a checkpoint fájlba kerül (JSON-sorok); ugyanazzal
+a paranccsal újraindítva a kész játszmák kimaradnak (nagyobb --games-szel a futás
+bővíthető). Más motorokkal / táblákkal / kerettel a régi checkpoint nem folytatható
+(--fresh törli).
+
+Használat:
+    python tools/selfplay.py [--engines random heuristic playout] [--games 100]
+                             [--boards amoeba:13:5 connect4:6:4] [--budget-ms 50]
+                             [--opening 2] [--workers 8] [--seed 1]
+                             [--checkpoint selfplay.jsonl] [--fresh] [--json]
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from games.amoeba.bot import CONFIG_SCHEMA, GameBoard   # noqa: E402
+
+MARKS = ("☠️", "🩸")            # 1. és 2. játékos jele (ahogy a GameBoard rakja)
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_CHECKPOINT = "selfplay.jsonl"
+Z95 = 1.96
+
+
+def _other(mark: str) -> str:
+    return MARKS[1] if mark == MARKS[0] else MARKS[0]
+
+
+def free_moves(g: GameBoard) -> list:
+    if g.mode == "connect4":
+        return [c for c in range(g.cols) if g.board[0][c] == " "]
+    return [(r, c) for r in range(g.rows) for c in range(g.cols) if g.board[r][c] == " "]
+
+
+# ===============================
+# Motorok
+# ===============================
+class Engine:
+    """choose(tábla, saját jel, rng, keret mp) -> (lépés, csomópontok)"""
+
+    def __init__(self, spec: str, **options):
+        self.spec = spec
+        self.options = options
+
+    def opt(self, key: str, default):
+        return type(default)(self.options.get(key, default))
+
+
+class RandomEngine(Engine):
+    def choose(self, g, mark, rng, budget):
+        return rng.choice(free_moves(g)), 1
+
+
+class HeuristicEngine(Engine):
+    def choose(self, g, mark, rng, budget):
+        if g.mode == "connect4":
+            return g._connect4_best_column(), g.cols
+        nodes = sum(row.count(" ") for row in g.board)
+        return g.smart_ai_move(mark, self.opt("defense", 1.5)), nodes
+
+
+class PlayoutEngine(Engine):
+    """Jelöltek a heurisztikából, köztük véletlen lejátszások átlaga dönt (időkeretig)."""
+
+    def choose(self, g, mark, rng, budget):
+        budget = self.opt("budget", budget * 1000) / 1000
+        depth = self.opt("depth", 40)
+        candidates = self._candidates(g, mark, self.opt("candidates", 8))
+        if len(candidates) == 1:
+            return candidates[0], 1
+        totals = [0.0] * len(candidates)
+        counts = [0] * len(candidates)
+        nodes = 0
+        deadline = time.perf_counter() + budget
+        for i in itertools.cycle(range(len(candidates))):
+            if counts[i] and time.perf_counter() >= deadline:
+                break
+            score, plies = self._playout(g, candidates[i], mark, rng, depth)
+            totals[i] += score
+            counts[i] += 1
+            nodes += plies
+        best = max(range(len(candidates)), key=lambda i: totals[i] / counts[i])
+        return candidates[best], nodes
+
+    def _candidates(self, g, mark, k):
+        if g.mode == "connect4":
+            return free_moves(g)
+        other = _other(mark)
+        scored = []
+        for r, c in free_moves(g):
+            score = 0
+            for dr, dc in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                score += g._count_dir(r, c, dr, dc, mark) ** 2 + g._count_dir(r, c, dr, dc, other) ** 2 * 1.5
+            scored.append((score, (r, c)))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [mv for _, mv in scored[:k]]
+
+    @staticmethod
+    def _playout(g, move, mark, rng, depth):
+        """1 = nyer, 0 = veszít, 0.5 = döntetlen vagy a mélységkorlát."""
+        sim = GameBoard.__new__(GameBoard)
+        sim.__dict__.update(g.__dict__)
+        sim.board = [row[:] for row in g.board]
+        empty = [(r, c) for r in range(sim.rows) for c in range(sim.cols) if sim.board[r][c] == " "]
+        turn = mark
+        for ply in range(depth + 1):
+            if sim.mode == "connect4":
+                if ply:
+                    cols = [c for c in range(sim.cols) if sim.board[0][c] == " "]
+                    if not cols:
+                        return 0.5, ply
+                    move = rng.choice(cols)
+                row = next(r for r in range(sim.rows - 1, -1, -1) if sim.board[r][move] == " ")
+                cell = (row, move)
+            else:
+                if ply:
+                    if not empty:
+                        return 0.5, ply
+                    move = empty[rng.randrange(len(empty))]
+                empty.remove(move)
+                cell = move
+            sim.board[cell[0]][cell[1]] = turn
+            if sim._check_victory(cell[0], cell[1], turn):
+                return (1.0 if turn == mark else 0.0), ply + 1
+            turn = _other(turn)
+        return 0.5, depth + 1
+
+
+ENGINES = {"random": RandomEngine, "heuristic": HeuristicEngine, "playout": PlayoutEngine}
+
+
+def make_engine(spec: str) -> Engine:
+    name, _, opts = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"ismeretlen motor: {name} ({', '.join(ENGINES)})")
+    options = dict(kv.split("=", 1) for kv in opts.split(",") if kv)
+    return ENGINES[name](spec, **options)
+
+
+def parse_board(spec: str) -> tuple:
+    mode, size, win = spec.split(":")
+    return mode, int(size), int(win)
+
+
+def board_name(board) -> str:
+    return ":".join(str(x) for x in board)
+
+
+# ===============================
+# Egy játszma (worker folyamatban)
+# ===============================
+_engines = {}
+
+
+def play(task: dict) -> dict:
+    """Egy teljes játszma; az eredmény JSON-ba írható (a checkpointba megy)."""
+    specs = {"A": task["a"], "B": task["b"]}
+    engines = {side: _engines.get(spec) or _engines.setdefault(spec, make_engine(spec)) for side, spec in specs.items()}
+    mode, size, win = task["board"]
+    random.seed(task["seed"])                       # a GameBoard heurisztikái a globális random-ot használják
+    rng = random.Random(task["seed"])
+    opening = random.Random(task["opening_seed"])
+    g = GameBoard(mode, size, win)
+    g.start(*(("A", "B") if task["a_first"] else ("B", "A")))
+
+    for _ in range(task["opening"]):
+        if not g.active:
+            break
+        g.make_move(g.current_player, opening.choice(free_moves(g)))
+
+    budget = task["budget_ms"] / 1000
+    spent = {"A": 0.0, "B": 0.0}
+    nodes = {"A": 0, "B": 0}
+    moves = {"A": 0, "B": 0}
+    while g.active:
+        side = g.current_player
+        mark = MARKS[0] if side == g.player1 else MARKS[1]
+        t0 = time.perf_counter()
+        move, n = engines[side].choose(g, mark, rng, budget)
+        spent[side] += time.perf_counter() - t0
+        nodes[side] += n
+        moves[side] += 1
+        if move is None or g.make_move(side, move).startswith("❌"):
+            g.active = False                        # szabálytalan lépés: vereség
+            g.winner = "B" if side == "A" else "A"
+    winner = g.winner if g.winner in ("A", "B") else None
+    return {"key": task["key"], "board": board_name(task["board"]), "a": task["a"], "b": task["b"],
+            "a_first": task["a_first"], "score_a": 1.0 if winner == "A" else 0.0 if winner == "B" else 0.5,
+            "plies": g.moves, "spent": spent, "nodes": nodes, "moves": moves}
+
+
+# ===============================
+# Ütemezés, checkpoint
+# ===============================
+def schedule(args) -> list:
+    tasks = []
+    for board in args.boards:
+        for a, b in itertools.combinations(args.engines, 2):
+            for i in range(args.games):
+                pair = f"{board_name(board)}|{a}|{b}|{i // 2}"
+                tasks.append({"key": f"{board_name(board)}|{a}|{b}|{i}", "board": board, "a": a, "b": b,
+                              "a_first": i % 2 == 0, "seed": _seed(args.seed, f"{pair}|{i}"),
+                              "opening_seed": _seed(args.seed, pair), "opening": args.opening,
+                              "budget_ms": args.budget_ms})
+    return tasks
+
+
+def _seed(base: int, key: str) -> int:
+    return random.Random(f"{base}|{key}").getrandbits(32)
+
+
+def run_config(args) -> dict:
+    # a játszmák száma nem része: egy kész futás több játszmával bővíthető
+    return {"engines": args.engines, "boards": [board_name(b) for b in args.boards],
+            "opening": args.opening, "budget_ms": args.budget_ms, "seed": args.seed}
+
+
+def load_checkpoint(path: str, config: dict) -> dict:
+    """A már lejátszott játszmák (kulcs -> eredmény); más beállításoknál hiba."""
+    if not os.path.exists(path):
+        return {}
+    done = {}
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue                            # félbeszakadt utolsó sor
+            if n == 0:
+                if rec.get("config") != config:
+                    raise SystemExit(f"❌ A {path} más beállításokkal készült: {rec.get('config')}\n"
+                                     f"   (--fresh törli, vagy adj meg másik --checkpoint fájlt)")
+                continue
+            done[rec["key"]] = rec
+    return done
+
+
+def _worker_init():
+    # Ctrl+C csak a fő folyamatot szakítsa meg: az a függő játszmákat törli, a futók végigmennek
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def execute(tasks: list, workers: int, on_result):
+    if workers <= 1:
+        for task in tasks:
+            on_result(play(task))
+        return
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init)
+    try:
+        futures = [pool.submit(play, task) for task in tasks]
+        for fut in as_completed(futures):
+            on_result(fut.result())
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+# ===============================
+# Kiértékelés
+# ===============================
+def fit_elo(pairs: dict, engines: list, iterations: int = 30):
+    """Bradley–Terry illesztés (Newton) páronkénti (játszmák, pontok) összesítésekből.
+
+    Motoronként egy virtuális döntetlen az első motor ellen (gyenge prior), így a
+    100%-os eredmény is véges Elo-t ad. Az első motor 0-n marad; a szórás a
+    Hesse-mátrix inverzéből jön. Visszaad: ({motor: Elo}, {motor: szórás Elo-ban}).
+    """
+    data = dict(pairs)
+    for e in engines[1:]:
+        n, s = data.get((e, engines[0]), (0, 0.0))
+        data[(e, engines[0])] = (n + 1, s + 0.5)
+    free = engines[1:]
+    idx = {e: i for i, e in enumerate(free)}
+    r = {e: 0.0 for e in engines}
+    cov = [[0.0] * len(free) for _ in free]
+    for _ in range(iterations):
+        grad = [0.0] * len(free)
+        hess = [[0.0] * len(free) for _ in free]
+        for (a, b), (n, s) in data.items():
+            p = 1.0 / (1.0 + math.exp(r[b] - r[a]))
+            g, h = s - n * p, n * p * (1 - p)
+            ia, ib = idx.get(a), idx.get(b)
+            if ia is not None:
+                grad[ia] += g
+                hess[ia][ia] += h
+            if ib is not None:
+                grad[ib] -= g
+                hess[ib][ib] += h
+            if ia is not None and ib is not None:
+                hess[ia][ib] -= h
+                hess[ib][ia] -= h
+        cov = _inverse(hess)
+        step = [sum(cov[i][j] * grad[j] for j in range(len(free))) for i in range(len(free))]
+        for e in free:
+            r[e] += step[idx[e]]
+        if max(map(abs, step), default=0.0) < 1e-9:
+            break
+    scale = 400 / math.log(10)
+    sd = {e: (math.sqrt(max(cov[idx[e]][idx[e]], 0.0)) * scale if e in idx else 0.0) for e in engines}
+    return {e: r[e] * scale for e in engines}, sd
+
+
+def _inverse(m: list) -> list:
+    """Kis szimmetrikus pozitív definit mátrix inverze (Gauss–Jordan)."""
+    n = len(m)
+    a = [row[:] + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(m)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda i: abs(a[i][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        d = a[col][col] or 1e-12
+        a[col] = [v / d for v in a[col]]
+        for i in range(n):
+            if i != col and a[i][col]:
+                f = a[i][col]
+                a[i] = [v - f * w for v, w in zip(a[i], a[col])]
+    return [row[n:] for row in a]
+
+
+def _pairs(results: list) -> dict:
+    pairs = {}
+    for res in results:
+        n, s = pairs.get((res["a"], res["b"]), (0, 0.0))
+        pairs[(res["a"], res["b"])] = (n + 1, s + res["score_a"])
+    return pairs
+
+
+def report(results: list, engines: list) -> dict:
+    out = {}
+    for board in sorted({res["board"] for res in results}):
+        games = [res for res in results if res["board"] == board]
+        elo, sd = fit_elo(_pairs(games), engines)
+
+        per = {e: {"games": 0, "score": 0.0, "spent": 0.0, "nodes": 0, "moves": 0} for e in engines}
+        for res in games:
+            for side, spec, score in (("A", res["a"], res["score_a"]), ("B", res["b"], 1 - res["score_a"])):
+                p = per[spec]
+                p["games"] += 1
+                p["score"] += score
+                p["spent"] += res["spent"][side]
+                p["nodes"] += res["nodes"][side]
+                p["moves"] += res["moves"][side]
+        table = {}
+        for e in engines:
+            p = per[e]
+            table[e] = {"elo": round(elo[e]), "ci95": [round(elo[e] - Z95 * sd[e]), round(elo[e] + Z95 * sd[e])],
+                        "games": p["games"], "score": round(p["score"] / p["games"], 3) if p["games"] else None,
+                        "ms_per_move": round(p["spent"] * 1000 / p["moves"], 3) if p["moves"] else None,
+                        "nodes_per_s": round(p["nodes"] / p["spent"]) if p["spent"] else None}
+        draws = sum(1 for res in games if res["score_a"] == 0.5)
+        out[board] = {"games": len(games), "draw_rate": round(draws / len(games), 3),
+                      "avg_plies": round(sum(res["plies"] for res in games) / len(games), 1), "engines": table}
+    return out
+
+
+def print_report(rep: dict):
+    for board, r in rep.items():
+        print(f"== {board}: {r['games']} játszma, döntetlen {r['draw_rate']:.1%}, átlag {r['avg_plies']} lépés ==")
+        print(f"  {'motor':<32} {'Elo':>6} {'95% CI':>15} {'pont':>7} {'ms/lépés':>10} {'csomópont/mp':>13}")
+        for e, t in sorted(r["engines"].items(), key=lambda kv: -kv[1]["elo"]):
+            ci = f"[{t['ci95'][0]}, {t['ci95'][1]}]" if t["ci95"] else "-"
+            score = f"{t['score']:.1%}" if t["score"] is not None else "-"
+            print(f"  {e:<32} {t['elo']:>6} {ci:>15} {score:>7} {t['ms_per_move'] or 0:>10.3f} "
+                  f"{t['nodes_per_s'] or 0:>13}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--engines", nargs="+", default=["random", "heuristic", "playout"])
+    ap.add_argument("--boards", nargs="+", type=parse_board,
+                    default=[tuple(b) for b in CONFIG_SCHEMA["BOARD_TYPES"].default])
+    ap.add_argument("--games", type=int, default=100, help="játszmák motorpáronként és táblatípusonként")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="gondolkodási idő lépésenként")
+    ap.add_argument("--opening", type=int, default=2, help="véletlen nyitólépések száma")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    ap.add_argument("--fresh", action="store_true", help="a meglévő checkpoint törlése")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    if len(args.engines) < 2:
+        ap.error("legalább két motor kell")
+    for spec in args.engines:
+        try:
+            make_engine(spec)
+        except ValueError as e:
+            ap.error(str(e))
+
+    config = run_config(args)
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    done = load_checkpoint(args.checkpoint, config)
+    tasks = schedule(args)
+    keys = {t["key"] for t in tasks}
+    results = [rec for key, rec in done.items() if key in keys]
+    todo = [t for t in tasks if t["key"] not in done]
+    if not args.json:
+        print(f"[🎲] {len(tasks)} játszma ({len(results)} kész a checkpointból), {args.workers} worker")
+
+    new_file = not os.path.exists(args.checkpoint)
+    t0 = time.monotonic()
+    with open(args.checkpoint, "a", encoding="utf-8") as ckpt:
+        if new_file:
+            ckpt.write(json.dumps({"config": config}, ensure_ascii=False) + "\n")
+            ckpt.flush()
+
+        def on_result(res):
+            results.append(res)
+            ckpt.write(json.dumps(res, ensure_ascii=False) + "\n")
+            ckpt.flush()
+            if not args.json and len(results) % max(1, len(tasks) // 20) == 0:
+                print(f"  {len(results)}/{len(tasks)}  ({time.monotonic() - t0:.0f} mp)", flush=True)
+
+        try:
+            execute(todo, args.workers, on_result)
+        except KeyboardInterrupt:
+            print(f"\n[⏸️] Megszakítva – {len(results)}/{len(tasks)} kész, folytatás ugyanezzel a paranccsal.")
+            sys.exit(130)
+
+    rep = report(results, args.engines)
+    if args.json:
+        print(json.dumps({"config": config, "boards": rep}, ensure_ascii=False, indent=2))
+    else:
+        print_report(rep)
+
+
+if __name__ == "__main__":
+    main()
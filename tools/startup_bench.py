@@ -0,0 +1,115 @@
+"""Indulási idő mérése.
+
+Két mérés:
+  1. modulonkénti import-költség (`python -X importtime`, minden modul friss folyamatban)
+  2. végponttól végpontig: folyamat indítása -> csatlakozás a csatornához
+     (STARTUP_BENCH=1 módban a main_bot csatlakozás után azonnal kilép;
+     ehhez TOKEN/CHANNEL kell, vagy egy helyi IRC stand-in)
+
+Használat:
+    python tools/startup_bench.py [--runs 3] [--top 15] [--no-join]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# amit külön mérünk: a főbot maga, a nehéz függőségek és a játékmodulok
+MODULES = [
+    "main_bot",
+    "core.runtime",
+    "twitchio.ext.commands",
+    "flask",
+    "socketio",
+    "websockets",
+    "games.akasztofa.bot",
+    "games.amoeba.bot",
+]
+
+
+def import_cost(module: str):
+    """(összes µs, [(kumulatív µs, csomag), ...]) egy friss folyamatban; None, ha nem importálható."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cum_us = int(parts[1])
+        except (IndexError, ValueError):
+            continue   # fejléc
+        rows.append((cum_us, parts[2]))
+    target = next((us for us, name in rows if name.strip() == module), None)
+    if target is None:
+        target = max((us for us, _ in rows), default=0)
+    return target, sorted(rows, reverse=True)
+
+
+def join_time(timeout: float = 60.0):
+    """Folyamatindítástól a '[⏱️] Csatlakozva' sorig eltelt idő (ms); None, ha nem sikerült."""
+    env = dict(os.environ, STARTUP_BENCH="1", PYTHONUNBUFFERED="1")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main_bot.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        deadline = t0 + timeout
+        for line in proc.stdout:
+            if "Csatlakozva" in line:
+                return round((time.perf_counter() - t0) * 1000, 1), line.strip()
+            if time.perf_counter() > deadline:
+                break
+        return None
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=10, help="ennyi legdrágább almodult listáz modulonként")
+    ap.add_argument("--no-join", action="store_true", help="csak import-költség, Twitch csatlakozás nélkül")
+    args = ap.parse_args()
+
+    print("== Import-költség (medián, ms) ==")
+    for module in MODULES:
+        samples, detail = [], None
+        for _ in range(args.runs):
+            res = import_cost(module)
+            if res is None:
+                break
+            samples.append(res[0] / 1000)
+            detail = res[1]
+        if not samples:
+            print(f"  {module:<24} nem importálható (hiányzó függőség?)")
+            continue
+        print(f"  {module:<24} {statistics.median(samples):8.1f} ms")
+        for us, name in detail[1:args.top + 1]:
+            print(f"      {us / 1000:8.1f} ms  {name.strip()}")
+
+    if args.no_join:
+        return
+    print("== Folyamatindítás -> csatornához csatlakozás ==")
+    results = []
+    for _ in range(args.runs):
+        res = join_time()
+        if res is None:
+            print("  nem sikerült csatlakozni (TOKEN/CHANNEL beállítva?)")
+            return
+        results.append(res[0])
+        print(f"  {res[0]:8.1f} ms  ({res[1]})")
+    print(f"  medián: {statistics.median(results):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
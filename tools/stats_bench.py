@@ -0,0 +1,122 @@
+"""A statisztika-rögzítés költsége !tipp / !lép átmenetenként, raid-terhelés mellett.
+
+Ugyanazt a tipp- és lépéssorozatot futtatja stats tár nélkül és egy ideiglenes
+SQLite (WAL) tárral, miközben a háttér-flush a szokásosnál sűrűbben fut, és kiírja:
+  - µs / átmenet mindkét esetben és a különbséget
+  - a leghosszabb event loop kiesést (a flush nem a loopon fut)
+  - a kötegek számát és az utolsó köteg idejét
+  - egy !top lekérdezés idejét a végén
+
+Használat:
+    python tools/stats_bench.py [--rounds 3000] [--flush 0.05]
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import game_interface                   # noqa: E402
+from core.runtime import GameRuntime    # noqa: E402
+from core.stats import StatsStore       # noqa: E402
+
+
+class _SinkOutbox:
+    def send(self, channel, text, priority=None):
+        return True
+
+
+def _no_overlay(self, payload, refresh=True):
+    pass
+
+
+def _coord(mode, mv):
+    if mode == "connect4":
+        return str(mv + 1)
+    r, c = mv
+    return f"{chr(65 + c)}{r + 1}"
+
+
+async def _ticker(stalls: list):
+    """A loop késését méri 1 ms-os alvásokkal (a legnagyobb kiesés számít)."""
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - t0 - 0.001)
+
+
+async def play(rounds: int, stats=None):
+    """Felváltva egy akasztófa-tipp és egy amőba-lépés, 50 különböző felhasználótól."""
+    random.seed(1)
+    runtime = GameRuntime(None, _SinkOutbox(), stats=stats)
+    runtime.join("bench")
+    hangman = runtime.spawn("bench", "akasztofa")
+    amoeba = runtime.spawn("bench", "amoeba")
+    hangman.config = dict(hangman.config, GLOBAL_TIPP_COOLDOWN=0, PERSONAL_TIPP_COOLDOWN=0,
+                          NEW_GAME_COOLDOWN=0)
+    users = [f"user{i}" for i in range(50)]
+    stalls = []
+    ticker = asyncio.ensure_future(_ticker(stalls))
+
+    elapsed = 0.0
+    for i in range(rounds):
+        if not hangman.active:
+            await hangman.actor.ask(hangman.new_game, "bench")
+        if not (amoeba.game and amoeba.game.active):
+            await amoeba.actor.ask(amoeba.challenge_cmd, "p1", random.choice(users))
+            await amoeba.actor.ask(amoeba.accept, amoeba.challenge["target"])
+        g = amoeba.game
+        coord = _coord(g.mode, amoeba._best_move())
+        user = users[i % len(users)]
+
+        t0 = time.perf_counter()
+        await hangman.actor.ask(hangman.tipp, user, random.choice(string.ascii_lowercase))
+        await amoeba.actor.ask(amoeba.move, g.current_player, coord)
+        elapsed += time.perf_counter() - t0
+        if i % 50 == 0:
+            await asyncio.sleep(0)   # a ticker és a flush is szóhoz jut
+
+    ticker.cancel()
+    runtime.part("bench")
+    return elapsed / (2 * rounds) * 1e6, max(stalls or [0.0]) * 1000
+
+
+async def bench(rounds: int, flush: float):
+    game_interface.BaseGame.write_overlay = _no_overlay
+    base, base_stall = await play(rounds)
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = StatsStore(os.path.join(tmp, "stats.db"), flush_interval=flush)
+        await stats.open()
+        stats.start()
+        with_stats, stall = await play(rounds, stats)
+        await stats.flush()
+        t0 = time.perf_counter()
+        top = await stats.top("bench", "amoeba")
+        top_ms = (time.perf_counter() - t0) * 1000
+        info = stats.stats()
+        await stats.close()
+
+    print(f"== {rounds} kör (tipp + lépés) ==")
+    print(f"  stats nélkül:     {base:8.1f} µs/átmenet  (max loop kiesés {base_stall:.2f} ms)")
+    print(f"  stats-szal:       {with_stats:8.1f} µs/átmenet  (+{with_stats - base:.1f} µs, "
+          f"max loop kiesés {stall:.2f} ms)")
+    print(f"  események:        {info['written']:8d}  ({info['batches']} köteg, utolsó {info['last_batch_ms']} ms)")
+    print(f"  !top lekérdezés:  {top_ms:8.2f} ms  ({top[:3]})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=3000)
+    ap.add_argument("--flush", type=float, default=0.05)
+    args = ap.parse_args()
+    asyncio.get_event_loop().run_until_complete(bench(args.rounds, args.flush))
+
+
+if __name__ == "__main__":
+    main()
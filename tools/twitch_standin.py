@@ -0,0 +1,222 @@
+"""Helyi Twitch IRC stand-in a bot kipróbálásához és terheléses teszteléséhez.
+
+A twitchio WebSocketen beszél IRC-t (wss://irc-ws.chat.twitch.tv) – ez a stand-in
+ugyanezt a dialektust szolgálja ki ws://-n: PASS/NICK/CAP REQ, JOIN (353/366,
+USERSTATE, ROOMSTATE), PRIVMSG tagekkel (badges, display-name, id, tmi-sent-ts ...),
+PING/PONG. Mindent memóriában tart; a bot üzeneteit a feliratkozók kapják meg.
+
+Több kapcsolattal (a bot olvasó kapcsolata + a core/irc.py küldőkapcsolatai) is úgy
+viselkedik, mint a Twitch: egy kapcsolat PRIVMSG-ét a csatorna többi tagja is
+megkapja (így az olvasó kapcsolat is látja a küldőkapcsolatok üzeneteit), a
+kapcsolatonként kapott üzenetek száma a `by_client`-ben van, a JOIN nélkül küldöttek
+az `unjoined`-ban. A `kick()` egy kapcsolatnak RECONNECT-et küld és bontja
+(újracsatlakozás próbája).
+
+A botot a TWITCH_IRC_URL környezeti változóval lehet ráállítani (a token
+ellenőrzése ilyenkor elmarad, bármilyen TOKEN megfelel):
+
+    python tools/twitch_standin.py [--port 6680]
+    TWITCH_IRC_URL=ws://127.0.0.1:6680 TOKEN=x BOT_NICK=tesztbot CHANNELS=teszt python main_bot.py
+
+Kézi módban a stand-in a bot üzeneteit kiírja, a standard bemenetről pedig
+`#csatorna felhasználó üzenet` sorokat küld a botnak (a `*felhasználó` moderátor).
+Terheléses teszthez: tools/chat_load.py.
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+import zlib
+
+DEFAULT_PORT = 6680
+SERVER = "tmi.twitch.tv"
+
+
+class TwitchStandIn:
+    def __init__(self):
+        self.channels = {}      # csatorna -> {ws, ...} (aki csatlakozott)
+        self.nicks = {}         # ws -> nick
+        self.listeners = []     # callback(csatorna, szöveg) – a bot minden PRIVMSG-ére
+        self.joined = asyncio.Event()
+        self.received = 0       # a bottól kapott PRIVMSG-ek
+        self.by_client = {}     # kapcsolat neve -> tőle kapott PRIVMSG-ek
+        self.unjoined = 0       # JOIN nélkül küldött PRIVMSG-ek (a Twitch ezeket eldobja)
+        self.kicks = 0
+        self.clients = {}       # ws -> kapcsolat neve ("nick/sorszám")
+        self.injected = 0       # a botnak küldött PRIVMSG-ek
+        self._pending = {}      # ws -> [sor, ...] – a következő flush egy keretben küldi
+        self._ids = itertools.count(1)
+        self._conn_ids = itertools.count(1)
+        self._flush_task = None
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        import websockets
+        self._server = await websockets.serve(self._handler, host, port, max_size=None)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # --------- a bot felől ---------
+    async def _handler(self, ws, path=None):
+        try:
+            async for frame in ws:
+                for line in frame.split("\r\n"):
+                    if line:
+                        await self._line(ws, line)
+        except Exception:
+            pass
+        finally:
+            self.nicks.pop(ws, None)
+            self.clients.pop(ws, None)
+            self._pending.pop(ws, None)
+            for members in self.channels.values():
+                members.discard(ws)
+
+    async def _line(self, ws, line: str):
+        if line.startswith("@"):
+            line = line.split(" ", 1)[1]        # reply-parent tagek
+        cmd, _, rest = line.partition(" ")
+        cmd = cmd.upper()
+        if cmd == "PRIVMSG":
+            target, _, text = rest.partition(" :")
+            channel = target.lstrip("#").lower()
+            self.received += 1
+            name = self.clients.get(ws, "?")
+            self.by_client[name] = self.by_client.get(name, 0) + 1
+            members = self.channels.get(channel, set())
+            if ws not in members:
+                self.unjoined += 1
+            else:
+                self._relay(ws, channel, text)
+            for callback in self.listeners:
+                callback(channel, text)
+        elif cmd == "PING":
+            await ws.send(f":{SERVER} PONG {SERVER} :{rest.lstrip(':')}\r\n")
+        elif cmd == "NICK":
+            nick = self.nicks[ws] = rest.strip().lower()
+            self.clients[ws] = f"{nick}/{next(self._conn_ids)}"
+            await ws.send("".join(f":{SERVER} {code} {nick} :{text}\r\n" for code, text in (
+                ("001", "Welcome, GLHF!"), ("002", f"Your host is {SERVER}"), ("003", "This server is rather new"),
+                ("004", "-"), ("375", "-"), ("372", "You are in a maze of twisty passages."), ("376", ">"))))
+        elif cmd == "CAP":
+            await ws.send(f":{SERVER} CAP * ACK :{rest.split(':', 1)[-1]}\r\n")
+        elif cmd == "JOIN":
+            nick = self.nicks.get(ws, "justinfan")
+            out = []
+            for channel in rest.split(","):
+                channel = channel.strip().lstrip("#").lower()
+                self.channels.setdefault(channel, set()).add(ws)
+                # a Twitch sorrendje: JOIN, NAMES (353/366), majd USERSTATE – a twitchio a NAMES
+                # feldolgozásakor tagek nélkül írja felül a bot bejegyzését, a moderátori jogot
+                # (és vele a 100 üzenet / 30 mp keretet) csak az utána jövő USERSTATE-ből látja
+                out += [f":{nick}!{nick}@{nick}.{SERVER} JOIN #{channel}",
+                        f":{nick}.{SERVER} 353 {nick} = #{channel} :{nick}",
+                        f":{nick}.{SERVER} 366 {nick} #{channel} :End of /NAMES list",
+                        f"@badge-info=;badges=moderator/1;color=;display-name={nick};emote-sets=0;mod=1;"
+                        f"subscriber=0;user-type=mod :{SERVER} USERSTATE #{channel}",
+                        f"@emote-only=0;followers-only=-1;r9k=0;room-id=1;slow=0;subs-only=0 :{SERVER} ROOMSTATE #{channel}"]
+            await ws.send("\r\n".join(out) + "\r\n")
+            self.joined.set()
+        elif cmd == "PART":
+            for channel in rest.split(","):
+                self.channels.get(channel.strip().lstrip("#").lower(), set()).discard(ws)
+
+    # --------- a bot felé ---------
+    def inject(self, channel: str, user: str, text: str, mod: bool = False):
+        """Chat üzenet a csatornába (a következő `flush`-sal megy ki)."""
+        members = self.channels.get(channel)
+        if not members:
+            return False
+        badges = "moderator/1" if mod else ""
+        line = (f"@badge-info=;badges={badges};color=;display-name={user};emotes=;first-msg=0;flags=;"
+                f"id=standin-{next(self._ids)};mod={int(mod)};room-id=1;subscriber=0;"
+                f"tmi-sent-ts={int(time.time() * 1000)};turbo=0;user-id={zlib.crc32(user.encode())};user-type= "
+                f":{user}!{user}@{user}.{SERVER} PRIVMSG #{channel} :{text}\r\n")
+        for ws in members:
+            self._pending.setdefault(ws, []).append(line)
+        self.injected += 1
+        return True
+
+    def _relay(self, sender, channel: str, text: str):
+        """Egy kapcsolat üzenete a csatorna többi tagjának (mint a Twitch: az olvasó kapcsolat is látja)."""
+        nick = self.nicks.get(sender, "justinfan")
+        line = (f"@badge-info=;badges=moderator/1;color=;display-name={nick};emotes=;first-msg=0;flags=;"
+                f"id=standin-{next(self._ids)};mod=1;room-id=1;subscriber=0;"
+                f"tmi-sent-ts={int(time.time() * 1000)};turbo=0;user-id={zlib.crc32(nick.encode())};user-type=mod "
+                f":{nick}!{nick}@{nick}.{SERVER} PRIVMSG #{channel} :{text}\r\n")
+        relayed = False
+        for ws in self.channels.get(channel, ()):
+            if ws is not sender:
+                self._pending.setdefault(ws, []).append(line)
+                relayed = True
+        if relayed and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_event_loop().create_task(self.flush())
+
+    async def kick(self, name: str, reconnect: bool = True) -> bool:
+        """Egy kapcsolat bontása (előtte RECONNECT, ahogy a Twitch karbantartáskor teszi)."""
+        ws = next((w for w, n in self.clients.items() if n == name), None)
+        if ws is None:
+            return False
+        self.kicks += 1
+        try:
+            if reconnect:
+                await ws.send(f":{SERVER} RECONNECT\r\n")
+            await ws.close()
+        except Exception:
+            pass
+        return True
+
+    async def flush(self):
+        """A függő sorok kiküldése – kliensenként egy WebSocket keretben."""
+        pending, self._pending = self._pending, {}
+        for ws, lines in pending.items():
+            try:
+                await ws.send("".join(lines))
+            except Exception:
+                pass
+
+
+async def _console(standin: TwitchStandIn):
+    loop = asyncio.get_event_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            return
+        parts = line.strip().split(" ", 2)
+        if len(parts) < 3 or not parts[0].startswith("#"):
+            print("  formátum: #csatorna felhasználó üzenet  (*felhasználó = moderátor)")
+            continue
+        channel, user, text = parts[0][1:].lower(), parts[1], parts[2]
+        mod = user.startswith("*")
+        if not standin.inject(channel, user.lstrip("*"), text, mod):
+            print(f"  a bot nincs a #{channel} csatornán")
+        await standin.flush()
+
+
+async def serve(host: str, port: int):
+    standin = TwitchStandIn()
+    standin.listeners.append(lambda channel, text: print(f"  #{channel} <bot> {text}"))
+    await standin.start(host, port)
+    print(f"[💬] Twitch IRC stand-in: ws://{host}:{port}  (TWITCH_IRC_URL=ws://{host}:{port})")
+    await _console(standin)
+    await asyncio.Event().wait()    # bemenet nélkül (háttérben) is fut tovább
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Akasztófa szónehézség-kalibráció: szimulált tippelő a teljes katalógusra, minden magon.
+
+A választás eddig egyenletes volt: egy rövid szó a 4 életes szorny témán szinte
+nyerhetetlen, egy hosszú kifejezés a 8 életes zombik témán ajándék. Ez az eszköz
+minden katalógusszót --runs alkalommal lejátszat egy gyakoriság alapú tippelővel:
+  - a chat betűket tippel, a katalógus betűgyakorisága szerint súlyozott véletlen
+    sorrendben (súly = gyakoriság ^ --sharpness; nagyobb érték = "okosabb" chat)
+  - ha a betűk --recognize része már látszik, a szót kitalálják (jó szótipp)
+  - nem betű karakterek (szóköz, kötőjel, szám) eleve látszanak, mint a játékban
+Egy lejátszás eredménye a megfejtésig elkövetett hibás tippek száma; ebből
+témánként (THEMES életszám) a várható hibák száma (az életeknél elvágva) és a
+nyerési arány. Angyal, ördög és segítség nincs a modellben.
+
+Az eredmény a games/akasztofa/data/words.compiled.json-ba kerül (a words.json
+hash-ével és a THEMES-szel együtt – ha bármelyik változik, a bot elavultnak tekinti,
+és egyenletesen választ). A bot ebből a DIFFICULTY beállítás (%) szerinti téma–szó
+párt választ. A végén összesítő: témánként a nyerhetetlen / triviális szavak
+aránya, és a várható nyerési arány egyenletes és célzott választással.
+
+Használat:
+    python tools/word_difficulty.py [--runs 400] [--sharpness 3.0] [--recognize 0.6]
+                                    [--workers 8] [--seed 1] [--target 60]
+                                    [--out games/akasztofa/data/words.compiled.json]
+                                    [--dry-run] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from games.akasztofa.bot import (COMPILED_CATALOG, COMPILED_VERSION, THEMES, DifficultyIndex,  # noqa: E402
+                                 catalog_fingerprint, load_catalog)
+
+DEFAULT_RUNS = 400
+DEFAULT_SHARPNESS = 3.0
+DEFAULT_RECOGNIZE = 0.6
+UNWINNABLE = 0.2        # e nyerési arány alatt nyerhetetlen
+TRIVIAL = 0.95          # e fölött triviális
+
+
+# ===============================
+# Szimuláció (workerben)
+# ===============================
+def letter_weights(catalog: dict, sharpness: float) -> dict:
+    """Betű -> tippelési súly a teljes katalógus betűgyakoriságából."""
+    counts = Counter(c for words in catalog.values() for word in words for c in word.lower() if c.isalpha())
+    return {letter: n ** sharpness for letter, n in counts.items()}
+
+
+def _seed(base: int, key: str) -> int:
+    return random.Random(f"{base}|{key}").getrandbits(32)
+
+
+def simulate(task: dict) -> dict:
+    """Egy szó --runs lejátszása; eredmény: hibás tippek száma -> lejátszások száma."""
+    word = task["word"].lower()
+    positions = Counter(c for c in word if c.isalpha())
+    total = sum(positions.values())
+    need = total * task["recognize"]
+    alphabet = list(task["weights"].items())
+    rng = random.Random(task["seed"])
+    race = rng.expovariate
+    outcomes = Counter()
+    for _ in range(task["runs"]):
+        # súlyozott, visszatevés nélküli sorrend egy rendezéssel: betűnként exp(súly) idő, aki előbb ér be
+        order = sorted(alphabet, key=lambda item: race(item[1]))
+        revealed = wrong = 0
+        for letter, _ in order:
+            if revealed >= need:
+                break
+            hits = positions.get(letter)
+            if hits:
+                revealed += hits
+            else:
+                wrong += 1
+        outcomes[wrong] += 1
+    return {"category": task["category"], "word": task["word"], "outcomes": dict(outcomes)}
+
+
+def expected(outcomes: dict, lives: int) -> tuple:
+    """(várható hibás tippek az életszámnál elvágva, nyerési arány)."""
+    runs = sum(outcomes.values())
+    wrong = sum(min(w, lives) * n for w, n in outcomes.items()) / runs
+    wins = sum(n for w, n in outcomes.items() if w < lives) / runs
+    return wrong, wins
+
+
+def _worker_init():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def execute(tasks: list, workers: int, on_result):
+    if workers <= 1:
+        for task in tasks:
+            on_result(simulate(task))
+        return
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init)
+    try:
+        futures = [pool.submit(simulate, task) for task in tasks]
+        for fut in as_completed(futures):
+            on_result(fut.result())
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+# ===============================
+# Kalibrált katalógus és összesítő
+# ===============================
+def compile_catalog(results: list, args) -> dict:
+    words = {}
+    for res in sorted(results, key=lambda r: (r["category"], r["word"])):
+        wrong, win = {}, {}
+        for theme, lives in THEMES.items():
+            wrong[theme], win[theme] = (round(x, 3) for x in expected(res["outcomes"], lives))
+        words.setdefault(res["category"], {})[res["word"]] = {"wrong": wrong, "win": win}
+    return {
+        "version": COMPILED_VERSION,
+        "source": catalog_fingerprint(),
+        "themes": THEMES,
+        "guesser": {"runs": args.runs, "sharpness": args.sharpness, "recognize": args.recognize,
+                    "seed": args.seed},
+        "words": words,
+    }
+
+
+def summary(compiled: dict, target: float, samples: int = 20000) -> dict:
+    """Témánként a szavak megoszlása, és a várható nyerési arány egyenletes / célzott választással."""
+    items = [(category, word, data) for category, words in compiled["words"].items()
+             for word, data in words.items()]
+    themes = {}
+    for theme in THEMES:
+        wins = [data["win"][theme] for _, _, data in items]
+        themes[theme] = {
+            "lives": THEMES[theme],
+            "avg_wrong": round(sum(data["wrong"][theme] for _, _, data in items) / len(items), 2),
+            "win_rate": round(sum(wins) / len(wins), 3),
+            "unwinnable": round(sum(w < UNWINNABLE for w in wins) / len(wins), 3),
+            "trivial": round(sum(w > TRIVIAL for w in wins) / len(wins), 3),
+        }
+    # egyenletes: minden téma × szó pár egyforma eséllyel (kategória szerint súlyozva, mint a bot)
+    by_category = {}
+    for category, word, data in items:
+        by_category.setdefault(category, []).append(data)
+    uniform = sum(sum(data["win"][t] for data in group) / len(group)
+                  for group in by_category.values() for t in THEMES) / (len(by_category) * len(THEMES))
+    index = DifficultyIndex((data["wrong"][t] / lives, t, category, word)
+                            for category, word, data in items for t, lives in THEMES.items())
+    lookup = {(category, word): data for category, word, data in items}
+    rng_state = random.getstate()
+    random.seed(0)
+    picks = [index.pick(target) for _ in range(samples)]
+    random.setstate(rng_state)
+    targeted = sum(lookup[(c, w)]["win"][t] for t, c, w in picks) / samples
+    spread = Counter(t for t, _, _ in picks)
+    # változatosság: a mintában előforduló különböző szavak, és a leggyakoribb szó aránya
+    words = Counter((c, w) for _, c, w in picks)
+    return {"words": len(items), "themes": themes,
+            "uniform_win_rate": round(uniform, 3),
+            "targeted": {"difficulty": target, "win_rate": round(targeted, 3),
+                         "distinct_words": len(words), "top_word_share": round(words.most_common(1)[0][1] / samples, 4),
+                         "themes": {t: round(spread[t] / samples, 3) for t in THEMES}}}
+
+
+def print_summary(rep: dict):
+    print(f"\n{rep['words']} szó")
+    print(f"{'téma':<10} {'élet':>4} {'várható hiba':>13} {'nyerés':>7} {'nyerhetetlen':>13} {'triviális':>10}")
+    for theme, row in rep["themes"].items():
+        print(f"{theme:<10} {row['lives']:>4} {row['avg_wrong']:>13} {row['win_rate']:>7.1%} "
+              f"{row['unwinnable']:>13.1%} {row['trivial']:>10.1%}")
+    t = rep["targeted"]
+    print(f"\nvárható nyerési arány – egyenletes választás: {rep['uniform_win_rate']:.1%} "
+          f"({rep['words']} szó), célzott ({t['difficulty']:.0%}): {t['win_rate']:.1%} "
+          f"({t['distinct_words']} különböző szó, a leggyakoribb {t['top_word_share']:.1%})")
+    print("témák a célzott választásban: " + ", ".join(f"{k} {v:.0%}" for k, v in t["themes"].items()))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="lejátszás szavanként")
+    ap.add_argument("--sharpness", type=float, default=DEFAULT_SHARPNESS,
+                    help="a betűgyakoriság kitevője a tippelési súlyban")
+    ap.add_argument("--recognize", type=float, default=DEFAULT_RECOGNIZE,
+                    help="a betűk ekkora része után a chat kitalálja a szót")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--target", type=float, default=60, help="célnehézség (%%) az összesítőhöz")
+    ap.add_argument("--out", default=str(COMPILED_CATALOG))
+    ap.add_argument("--dry-run", action="store_true", help="csak az összesítő, fájlírás nélkül")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+    if not 0 < args.recognize <= 1:
+        ap.error("--recognize 0 és 1 közé essen")
+
+    catalog = load_catalog()
+    if not catalog:
+        sys.exit("❌ Üres a szókatalógus.")
+    weights = letter_weights(catalog, args.sharpness)
+    tasks = [{"category": category, "word": word, "runs": args.runs, "recognize": args.recognize,
+              "weights": weights, "seed": _seed(args.seed, f"{category}|{word}")}
+             for category, words in catalog.items() for word in dict.fromkeys(words)]
+    if not args.json:
+        print(f"[🎲] {len(tasks)} szó × {args.runs} lejátszás, {args.workers} worker")
+
+    results = []
+    t0 = time.monotonic()
+    try:
+        execute(tasks, args.workers, results.append)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    elapsed = time.monotonic() - t0
+
+    compiled = compile_catalog(results, args)
+    if not args.dry_run:
+        tmp = args.out + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(compiled, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        os.replace(tmp, args.out)
+    rep = summary(compiled, args.target / 100.0)
+    if args.json:
+        print(json.dumps({"seconds": round(elapsed, 2), **rep}, ensure_ascii=False, indent=2))
+        return
+    print(f"[✅] {elapsed:.1f} mp" + ("" if args.dry_run else f" → {args.out}"))
+    print_summary(rep)
+
+
+if __name__ == "__main__":
+    main()